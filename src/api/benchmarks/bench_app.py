@@ -0,0 +1,322 @@
+"""
+End-to-end benchmark suite: the real FastAPI app (main.app), served by
+uvicorn in-process and driven over HTTP, against the local stand-ins from
+benchmarks.fakes, so no Pinecone or OpenAI account is needed:
+  index       FakePineconeIndex (in-memory, --index-latency-ms per call)
+              wrapped by services.clients.InstrumentedIndex like a real handle
+  OpenAI      FakeOpenAI (--llm-latency-ms per reason)
+  embeddings  HashingEncoder (--encode-ms per call, --encode-ms-per-text),
+              or a real model with --model
+For each of --sizes a fresh index gets a synthetic glossary of that many
+terms, then:
+  ingest            POST /api/upload-csv (delta=false)        rows/s
+  ingest_unchanged  the same file again (delta=true)           rows/s
+  search            POST /api/search at each --concurrency     req/s, latency percentiles
+  list              GET /api/vectors, --list-pages pages       per-page latency
+  export            GET /api/vectors/export                    terms/s
+  delete_ids        POST /api/vectors/delete, --delete-ids ids
+  delete_filter     POST /api/vectors/delete, one ParentGlossary
+Caches are cleared between runs. Client and server share one process, so
+compare runs made on the same machine with the same settings.
+Results are one JSON document with the settings, for diffing run to run:
+
+    cd src/api
+    python -m benchmarks.bench_app --sizes 1000 10000 --json before.json
+    python -m benchmarks.bench_app --sizes 1000 10000 --json after.json
+    python -m benchmarks.bench_app --compare before.json after.json
+    python -m benchmarks.bench_app --sizes 1000000 --concurrency 32 --list-pages 20 --no-reasons
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+
+import httpx
+
+from benchmarks.load_search import percentile, run_load, summarize
+
+# keep runs off whatever .env points at: nothing persisted, no model warm-up,
+# no real Pinecone client (load_dotenv never overrides variables already set)
+BENCH_ENV = {
+    "VECTOR_BACKEND": "local",
+    "LOCAL_INDEX_PATH": "",
+    "LEXICAL_INDEX_PATH": "",
+    "EMBEDDING_CACHE_PATH": "",
+    "EMBEDDING_STORE_PATH": "",
+    "EMBEDDING_WORKERS": "0",
+    "WARMUP_MODE": "lazy",
+    "RERANK_ENABLED": "false",
+}
+
+# the number compare() reports per scenario, and whether higher is better
+HEADLINE = {
+    "ingest": ("rows_per_s", True),
+    "ingest_unchanged": ("rows_per_s", True),
+    "search": ("p99_ms", False),
+    "list": ("p50_ms", False),
+    "export": ("terms_per_s", True),
+    "delete_ids": ("seconds", False),
+    "delete_filter": ("seconds", False),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 60
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def reset_state(app_module, index):
+    """Install a fresh fake index and empty every cache and the lexical index."""
+    from services.clients import InstrumentedIndex
+    from services.lexical_index import lexical_index
+    from services.resources import resources
+
+    resources.set("index", InstrumentedIndex(index))
+    lexical_index.clear()
+    reset_caches(app_module)
+
+
+def reset_caches(app_module):
+    from services.embedding_cache import embedding_cache
+    from services.semantic_cache import semantic_cache
+    embedding_cache.clear()
+    semantic_cache.invalidate()
+    app_module.reason_cache.clear()
+
+
+def report(result):
+    shown = {k: v for k, v in result.items() if k not in ("scenario", "terms") and not isinstance(v, dict)}
+    print(f"{result['scenario']:<16} | {result['terms']:>8} terms | " + ", ".join(f"{k}={v}" for k, v in shown.items()))
+    return result
+
+
+async def bench_ingest(client, csv_bytes: bytes, terms: int, batch_size: int, delta: bool, fake) -> dict:
+    before = dict(fake.calls)
+    start = time.perf_counter()
+    resp = await client.post(
+        "/api/upload-csv",
+        files={"file": ("bench.csv", csv_bytes, "text/csv")},
+        params={"batch_size": batch_size, "delta": str(delta).lower()},
+        timeout=None,
+    )
+    seconds = time.perf_counter() - start
+    body = resp.json()
+    if resp.status_code != 200 or "error" in body:
+        raise RuntimeError(f"upload failed: {body}")
+    return {
+        "scenario": "ingest_unchanged" if delta else "ingest",
+        "terms": terms,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(terms / seconds, 1),
+        "index_calls": {k: v - before.get(k, 0) for k, v in fake.calls.items() if v - before.get(k, 0)},
+        "message": body.get("message"),
+    }
+
+
+async def bench_list(client, terms: int, page_size: int, pages: int):
+    latencies, ids, cursor = [], [], None
+    for _ in range(pages):
+        params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+        start = time.perf_counter()
+        resp = await client.get("/api/vectors", params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        body = resp.json()
+        ids.extend(r["id"] for r in body["results"])
+        cursor = body.get("next_cursor")
+        if not cursor:
+            break
+    result = {
+        "scenario": "list",
+        "terms": terms,
+        "page_size": page_size,
+        "pages": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "terms_per_s": round(len(ids) / (sum(latencies) / 1000), 1) if latencies else None,
+    }
+    return result, ids
+
+
+async def bench_export(client, terms: int) -> dict:
+    count = 0
+    start = time.perf_counter()
+    async with client.stream("GET", "/api/vectors/export", timeout=None) as resp:
+        async for line in resp.aiter_lines():
+            if line and not line.startswith('{"type"'):
+                count += 1
+    seconds = time.perf_counter() - start
+    return {"scenario": "export", "terms": terms, "exported": count, "seconds": round(seconds, 3),
+            "terms_per_s": round(count / seconds, 1)}
+
+
+async def bench_delete(client, terms: int, scenario: str, body: dict) -> dict:
+    start = time.perf_counter()
+    resp = await client.post("/api/vectors/delete", json=body, timeout=None)
+    seconds = time.perf_counter() - start
+    if resp.status_code != 200:
+        raise RuntimeError(f"delete failed: {resp.text}")
+    deleted = resp.json()["deleted"]
+    return {"scenario": scenario, "terms": terms, "deleted": deleted, "seconds": round(seconds, 3),
+            "deleted_per_s": round(deleted / seconds, 1) if deleted else 0.0}
+
+
+async def run_size(args, app_module, url: str, encoder, terms: int):
+    from benchmarks.fakes import FakeOpenAI, FakePineconeIndex, synthetic_glossary, synthetic_queries
+    from services.resources import resources
+
+    fake = FakePineconeIndex(encoder.get_sentence_embedding_dimension(), args.index_latency_ms / 1000)
+    openai = FakeOpenAI(args.llm_latency_ms / 1000)
+    reset_state(app_module, fake)
+    resources.set("openai", openai)
+
+    df = synthetic_glossary(terms, args.glossaries, args.seed)
+    csv_bytes = df.to_csv(index=False).encode("utf-8")
+    queries = synthetic_queries(df, args.queries, args.seed)
+    results = []
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout) as client:
+        results.append(report(await bench_ingest(client, csv_bytes, terms, args.batch_size, False, fake)))
+        results.append(report(await bench_ingest(client, csv_bytes, terms, args.batch_size, True, fake)))
+
+        extra = {"include_reason": not args.no_reasons, "mode": args.mode}
+        for concurrency in args.concurrency:
+            reset_caches(app_module)
+            llm_calls = openai.calls
+            latencies, errors, wall = await run_load(url, queries, args.requests, concurrency, args.timeout, extra)
+            result = dict(summarize(args.label, latencies, errors, wall, concurrency), scenario="search", terms=terms,
+                          mode=args.mode, llm_calls=openai.calls - llm_calls)
+            del result["label"]
+            results.append(report(result))
+
+        listed, ids = await bench_list(client, terms, args.page_size, args.list_pages)
+        results.append(report(listed))
+        if not args.no_export:
+            results.append(report(await bench_export(client, terms)))
+        if ids and args.delete_ids:
+            results.append(report(await bench_delete(client, terms, "delete_ids", {"ids": ids[:args.delete_ids]})))
+        results.append(report(await bench_delete(
+            client, terms, "delete_filter", {"filter": {"ParentGlossary": f"Glossary {args.glossaries - 1}"}}
+        )))
+    return results
+
+
+def run_suite(args):
+    os.environ.update(BENCH_ENV)
+    import main as app_module
+    from benchmarks.fakes import HashingEncoder
+    from services.resources import resources
+
+    if args.model:
+        from services.embedding_backends import load_embedding_model
+        encoder = load_embedding_model(args.model)
+    else:
+        encoder = HashingEncoder(args.dimension, args.encode_ms / 1000, args.encode_ms_per_text / 1000)
+    resources.set("embedding_model", encoder)
+
+    server, thread = start_server(app_module.app, free_port())
+    url = f"http://127.0.0.1:{server.config.port}"
+    results = []
+    try:
+        for terms in args.sizes:
+            results.extend(asyncio.run(run_size(args, app_module, url, encoder, terms)))
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+    document = {
+        "label": args.label,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.json}")
+
+
+def compare(before_path: str, after_path: str):
+    """Headline number per (scenario, terms, concurrency) of two --json files, with the change."""
+    def load(path):
+        with open(path) as f:
+            document = json.load(f)
+        return document, {(r["scenario"], r["terms"], r.get("concurrency")): r for r in document["results"]}
+
+    before_doc, before = load(before_path)
+    after_doc, after = load(after_path)
+    print(f"{before_doc['label']} -> {after_doc['label']}")
+    print(f"{'scenario':<16} | {'terms':>8} | {'conc':>4} | {'metric':<11} | {'before':>10} | {'after':>10} | change")
+    regressions = []
+    for key in sorted(set(before) & set(after), key=lambda k: (k[1], k[0], k[2] or 0)):
+        scenario, terms, concurrency = key
+        metric, higher_is_better = HEADLINE.get(scenario, ("seconds", False))
+        old, new = before[key].get(metric), after[key].get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = change < 0 if higher_is_better else change > 0
+        flag = " (worse)" if worse and abs(change) >= 0.1 else ""
+        if flag:
+            regressions.append(key)
+        print(f"{scenario:<16} | {terms:>8} | {concurrency or '-':>4} | {metric:<11} | {old:>10} | {new:>10} | "
+              f"{change:+.1%}{flag}")
+    print(f"\n{len(regressions)} headline numbers worse by 10% or more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two --json files and exit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--glossaries", type=int, default=100, help="ParentGlossary values in the synthetic data")
+    parser.add_argument("--batch-size", type=int, default=256, help="upload-csv batch_size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="searches per concurrency level")
+    parser.add_argument("--queries", type=int, default=200, help="distinct search strings")
+    parser.add_argument("--mode", choices=("vector", "hybrid"), default="vector")
+    parser.add_argument("--no-reasons", action="store_true", help="search with include_reason=false")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--list-pages", type=int, default=50)
+    parser.add_argument("--no-export", action="store_true")
+    parser.add_argument("--delete-ids", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--index-latency-ms", type=float, default=20.0, help="fake Pinecone round trip per call")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="fake OpenAI time per reason")
+    parser.add_argument("--model", default=None, help="real embedding model; HashingEncoder if omitted")
+    parser.add_argument("--dimension", type=int, default=384, help="HashingEncoder dimension")
+    parser.add_argument("--encode-ms", type=float, default=2.0, help="HashingEncoder cost per call")
+    parser.add_argument("--encode-ms-per-text", type=float, default=0.2, help="HashingEncoder cost per text")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run_suite(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Accuracy parity and speed of the embedding backends in services.embedding_backends.
+
+Each MODEL@BACKEND config runs in a fresh process and reports load time,
+resident memory after load, corpus encode throughput and single-query
+latency. Parity: glossary Names are the corpus (what ingest embeds) and
+each term's cleaned Definition is a query; mean top-k overlap with the
+fp32 reference model says how often both return the same neighbours.
+
+    cd src/api
+    python -m benchmarks.bench_embedding_backends
+    python -m benchmarks.bench_embedding_backends --configs BAAI/bge-large-en-v1.5@onnx-int8 BAAI/bge-small-en-v1.5@torch --k 6
+"""
+
+import argparse
+import html
+import os
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CSV = os.path.join(API_DIR, "services", "terms.csv")
+REFERENCE = "BAAI/bge-large-en-v1.5@torch"
+DEFAULT_CONFIGS = [
+    "BAAI/bge-large-en-v1.5@onnx",
+    "BAAI/bge-large-en-v1.5@onnx-int8",
+    "BAAI/bge-small-en-v1.5@torch",
+    "BAAI/bge-small-en-v1.5@onnx-int8",
+]
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+def load_sample(csv_path: str, max_words: int = 30):
+    df = pd.read_csv(csv_path).fillna("")
+    names = [str(n).strip() for n in df["Name"] if str(n).strip()]
+    queries = []
+    for name, definition in zip(df["Name"], df["Definition"]):
+        text = " ".join(html.unescape(_TAG.sub(" ", str(definition))).split()[:max_words])
+        if str(name).strip() and text:
+            queries.append(text)
+    return names, queries
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def measure(config: str, corpus, queries, latency_runs: int):
+    """Runs in a child process so each backend's memory is measured on its own."""
+    from services.embedding_backends import load_embedding_model
+
+    model_name, backend = config.rsplit("@", 1)
+    start = time.perf_counter()
+    model = load_embedding_model(model_name, backend)
+    load_s = time.perf_counter() - start
+    rss = rss_mb()
+
+    start = time.perf_counter()
+    corpus_vectors = model.encode(corpus, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+    throughput = len(corpus) / (time.perf_counter() - start)
+    query_vectors = model.encode(queries, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+
+    latencies = []
+    for query in queries[:latency_runs]:
+        start = time.perf_counter()
+        model.encode([query], convert_to_numpy=True)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "load_s": load_s,
+        "rss_mb": max(rss, rss_mb()),
+        "texts_per_s": throughput,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": sorted(latencies)[int(len(latencies) * 0.95)] * 1000,
+        "corpus": corpus_vectors.astype(np.float32),
+        "queries": query_vectors.astype(np.float32),
+    }
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def overlap(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean([len(set(x) & set(y)) / len(x) for x, y in zip(a, b)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--reference", default=REFERENCE)
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--latency-runs", type=int, default=100)
+    parser.add_argument("--min-overlap", type=float, default=None,
+                        help="exit non-zero if any config's top-k overlap falls below this")
+    args = parser.parse_args()
+
+    corpus, queries = load_sample(args.csv)
+    print(f"{len(corpus)} corpus texts, {len(queries)} queries, k={args.k}")
+
+    results = {}
+    ctx = mp.get_context("spawn")
+    for config in [args.reference] + [c for c in args.configs if c != args.reference]:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            results[config] = pool.submit(measure, config, corpus, queries, args.latency_runs).result()
+
+    reference = top_k(results[args.reference]["queries"], results[args.reference]["corpus"], args.k)
+    print(f"{'config':<40} | {'load s':>6} | {'RSS MB':>7} | {'texts/s':>8} | {'p50 ms':>7} | {'p95 ms':>7} | overlap@{args.k}")
+    failed = False
+    for config, r in results.items():
+        score = overlap(top_k(r["queries"], r["corpus"], args.k), reference)
+        failed |= args.min_overlap is not None and score < args.min_overlap
+        print(
+            f"{config:<40} | {r['load_s']:>6.1f} | {r['rss_mb']:>7.0f} | {r['texts_per_s']:>8.1f} | "
+            f"{r['p50_ms']:>7.1f} | {r['p95_ms']:>7.1f} | {score:.3f}"
+        )
+    if failed:
+        raise SystemExit(f"top-{args.k} overlap below {args.min_overlap}")
+
+
+if __name__ == "__main__":
+    main()
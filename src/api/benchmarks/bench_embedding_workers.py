@@ -0,0 +1,126 @@
+"""
+Throughput / latency benchmark for services.embedding_workers.
+
+For each worker count, a bulk thread encodes --bulk-texts texts in
+ingest-sized chunks while --query-threads threads issue single-text
+interactive queries. Reports bulk texts/sec and query latency percentiles;
+"0" workers is the in-process model shared by every thread, as main.py does
+without EMBEDDING_WORKERS.
+
+    cd src/api
+    python -m benchmarks.bench_embedding_workers                 # stub model
+    python -m benchmarks.bench_embedding_workers --workers 0 1 2 4 --model BAAI/bge-large-en-v1.5
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from services.embedding_workers import BULK, INTERACTIVE, EmbeddingPool
+
+DIMENSION = 1024
+STUB_FACTORY = "benchmarks.bench_embedding_workers:StubModel"
+
+
+class StubModel:
+    """
+    CPU-bound stand-in for SentenceTransformer: a fixed cost per call plus a
+    per-text cost spent in pure Python, so it holds the GIL like tokenization
+    and the Python side of a forward pass do.
+    """
+
+    def __init__(self, model_name: str = "stub", call_overhead_s: float = 0.002, per_text_s: float = 0.001):
+        self.call_overhead_s = call_overhead_s
+        self.per_text_s = per_text_s
+
+    def _spin(self, seconds: float):
+        end = time.perf_counter() + seconds
+        x = 0
+        while time.perf_counter() < end:
+            x += 1
+        return x
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else texts
+        self._spin(self.call_overhead_s + self.per_text_s * len(batch))
+        out = np.zeros((len(batch), DIMENSION), dtype=np.float32)
+        return out[0] if single else out
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else float("nan")
+
+
+def run(encode_bulk, encode_query, bulk_texts: int, chunk: int, query_threads: int):
+    latencies, stop = [], threading.Event()
+
+    def query_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            encode_query(["what is a customer id"])
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=query_loop) for _ in range(query_threads)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    texts = [f"Synthetic glossary term {i}" for i in range(bulk_texts)]
+    for i in range(0, bulk_texts, chunk):
+        encode_bulk(texts[i:i + chunk])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in threads:
+        t.join()
+    return bulk_texts / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--model", default=None, help="SentenceTransformer name; stub model if omitted")
+    parser.add_argument("--bulk-texts", type=int, default=4096)
+    parser.add_argument("--chunk", type=int, default=256, help="texts per bulk encode call (EMBED_BATCH_SIZE)")
+    parser.add_argument("--query-threads", type=int, default=4)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    factory = None if args.model else STUB_FACTORY
+    print(f"{'workers':>7} | {'bulk texts/s':>12} | {'queries':>7} | {'q p50 ms':>8} | {'q p95 ms':>8} | {'q max ms':>8}")
+    for workers in args.workers:
+        if workers == 0:
+            if args.model:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(args.model)
+            else:
+                model = StubModel()
+            # one model object shared by every thread, as in the API process
+            encode_bulk = lambda texts: model.encode(texts, batch_size=args.chunk)
+            encode_query = lambda texts: model.encode(texts)
+            pool = None
+        else:
+            pool = EmbeddingPool(args.model or "stub", workers, args.max_batch, args.max_wait_ms, factory=factory)
+            encode_bulk = lambda texts: pool.encode(texts, priority=BULK)
+            encode_query = lambda texts: pool.encode(texts, priority=INTERACTIVE)
+        try:
+            throughput, latencies = run(encode_bulk, encode_query, args.bulk_texts, args.chunk, args.query_threads)
+        finally:
+            if pool is not None:
+                pool.close()
+        ms = lambda s: s * 1000
+        print(
+            f"{workers:>7} | {throughput:>12.1f} | {len(latencies):>7} | {ms(statistics.median(latencies)):>8.1f} | "
+            f"{ms(percentile(latencies, 95)):>8.1f} | {ms(max(latencies)):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Ingest throughput benchmark for the /api/upload-csv pipeline.
+
+Compares the legacy per-row iterrows()/encode() loop with the batched,
+pipelined services.ingest path on synthetic glossaries, using a stub index
+in place of Pinecone.
+
+    cd src/api
+    python -m benchmarks.bench_ingest                      # stub encoder
+    python -m benchmarks.bench_ingest --model BAAI/bge-large-en-v1.5
+    python -m benchmarks.bench_ingest --sizes 1000 10000 --upsert-latency-ms 40
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.ingest import ingest_frames, sentence_transformer_encoder
+
+DIMENSION = 1024
+
+
+class StubIndex:
+    """Stands in for pc.Index(...): counts vectors and sleeps per request."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.count = 0
+
+    def upsert(self, vectors, namespace=None):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self.count += len(vectors)
+
+
+class StubModel:
+    """
+    Mimics SentenceTransformer.encode: a fixed cost per call plus a cost per
+    text, so per-row and batched calls can be compared without the real model.
+    """
+
+    def __init__(self, call_overhead_s: float = 0.002, per_text_s: float = 0.0002):
+        self.call_overhead_s = call_overhead_s
+        self.per_text_s = per_text_s
+        self.rng = np.random.default_rng(0)
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        single = isinstance(texts, str)
+        batch = [texts] if single else texts
+        time.sleep(self.call_overhead_s + self.per_text_s * len(batch))
+        out = self.rng.standard_normal((len(batch), DIMENSION)).astype(np.float32)
+        return out[0] if single else out
+
+
+def synthetic_glossary(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Key": [""] * rows,
+        "Name": [f"Term {i}" for i in range(rows)],
+        "Status": ["Approved"] * rows,
+        "Definition": [f"Definition of synthetic term number {i}." for i in range(rows)],
+        "Abbreviations": [f"T{i}" for i in range(rows)],
+        "Aliases": [""] * rows,
+        "AdditionalNotes": [""] * rows,
+        "Stewards": ["admin"] * rows,
+        "RelatedGlossaries": [""] * rows,
+        "TermEntityType": ["Business Terms"] * rows,
+        "ParentGlossary": [f"Glossary {i % 10}" for i in range(rows)],
+    })
+
+
+def legacy_ingest(df, model, index):
+    vectors = []
+    for _, row in df.iterrows():
+        name = str(row.get("Name", "")).strip()
+        if not name:
+            continue
+        vector = model.encode(name).tolist()
+        metadata = {col: str(row.get(col, "")).strip() for col in df.columns}
+        metadata["source"] = "bench.csv"
+        vectors.append({"id": str(len(vectors)), "values": vector, "metadata": metadata})
+    for i in range(0, len(vectors), 100):
+        index.upsert(vectors=vectors[i:i + 100])
+    return len(vectors)
+
+
+def batched_ingest(df, model, index, batch_size):
+    rows = 0
+    for progress in ingest_frames(
+        [df], "bench.csv", sentence_transformer_encoder(model, batch_size), index, batch_size, delta=False
+    ):
+        rows = progress["rows_processed"]
+    return rows
+
+
+def run(label, fn, rows):
+    start = time.perf_counter()
+    done = fn()
+    elapsed = time.perf_counter() - start
+    assert done == rows, f"{label}: expected {rows} rows, got {done}"
+    print(f"{label:>10} | {rows:>8} rows | {elapsed:8.2f}s | {rows / elapsed:10.1f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--model", default=None, help="SentenceTransformer name; stub encoder if omitted")
+    parser.add_argument("--upsert-latency-ms", type=float, default=20.0)
+    parser.add_argument("--legacy-max-rows", type=int, default=10_000,
+                        help="skip the per-row baseline above this size")
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(args.model)
+    else:
+        model = StubModel()
+
+    for rows in args.sizes:
+        df = synthetic_glossary(rows)
+        if rows <= args.legacy_max_rows:
+            run("legacy", lambda: legacy_ingest(df, model, StubIndex(args.upsert_latency_ms / 1000)), rows)
+        run("batched", lambda: batched_ingest(df, model, StubIndex(args.upsert_latency_ms / 1000), args.batch_size), rows)
+
+
+if __name__ == "__main__":
+    main()
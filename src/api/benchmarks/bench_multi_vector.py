@@ -0,0 +1,97 @@
+"""
+Ingest cost vs recall@k of single- and multi-vector term embeddings.
+
+The glossary is ingested twice into in-memory LocalIndexes: once with the
+Name vector only (INGEST_VECTOR_MODE=single) and once with Name, Definition
+and alias vectors (services.multi_vector). Reports vectors per term, encode
+time and index size for each, then recall@k of the right term for two
+query sets:
+  alias       each Aliases / Abbreviations entry (synonym lookups)
+  definition  a window of each term's Definition (description lookups)
+Multi-vector results are collapsed per term with max and weighted scoring,
+fetching k * --fanout index matches.
+
+    cd src/api
+    python -m benchmarks.bench_multi_vector
+    python -m benchmarks.bench_multi_vector --model BAAI/bge-small-en-v1.5 --k 6 --fanout 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_rerank import load_terms, make_queries
+from benchmarks.bench_embedding_backends import DEFAULT_CSV
+from services.ingest import build_vectors, term_id
+from services.lexical_index import split_entries
+from services.local_index import LocalIndex
+from services.multi_vector import MULTI_VECTOR_WEIGHTS, collapse, expand_terms
+
+
+def ingest(model, terms, multi: bool, batch_size: int):
+    names = [str(t["Name"]) for t in terms]
+    metadata = [dict(t) for t in terms]
+    ids = [term_id(m) for m in metadata]
+    if multi:
+        texts, vector_ids, vector_metadata = expand_terms(names, metadata, ids)
+    else:
+        texts, vector_ids, vector_metadata = names, ids, metadata
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    encode_s = time.perf_counter() - start
+    index = LocalIndex(embeddings.shape[1], ann="brute")
+    index.upsert(build_vectors(embeddings, vector_metadata, vector_ids))
+    return index, ids, {"vectors": len(texts), "encode_s": encode_s, "mb": embeddings.shape[1] * 4 * len(texts) / 2**20}
+
+
+def recall(index, ids, model, queries, k: int, fanout: int, scoring):
+    vectors = model.encode([q for q, _ in queries], batch_size=64, convert_to_numpy=True)
+    hits = 0
+    for vector, (_, target) in zip(vectors, queries):
+        matches = index.query(vector=vector, top_k=k * fanout if scoring else k, include_metadata=True).matches
+        found = [vid for vid, _, _ in collapse(matches, k, scoring, MULTI_VECTOR_WEIGHTS)] if scoring else [m.id for m in matches]
+        hits += ids[target] in found
+    return hits / len(queries) if queries else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--model", default="BAAI/bge-large-en-v1.5")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(args.model)
+    terms = load_terms(args.csv)
+    query_sets = {
+        "alias": [
+            (alias, row) for row, t in enumerate(terms)
+            for alias in split_entries(t.get("Aliases", "")) + split_entries(t.get("Abbreviations", ""))
+        ],
+        "definition": make_queries(terms, args.queries, 8, 20, np.random.default_rng(args.seed)),
+    }
+    print(f"{len(terms)} terms, " + ", ".join(f"{len(q)} {name} queries" for name, q in query_sets.items()))
+
+    single, ids, single_cost = ingest(model, terms, multi=False, batch_size=args.batch_size)
+    multi, _, multi_cost = ingest(model, terms, multi=True, batch_size=args.batch_size)
+    print(f"\n{'ingest':<8} | {'vectors':>7} | {'per term':>8} | {'encode s':>8} | {'index MB':>8}")
+    for name, cost in (("single", single_cost), ("multi", multi_cost)):
+        print(f"{name:<8} | {cost['vectors']:>7} | {cost['vectors'] / len(terms):>8.2f} | "
+              f"{cost['encode_s']:>8.1f} | {cost['mb']:>8.1f}")
+
+    print(f"\n{'search':<16} | " + " | ".join(f"{name + ' R@' + str(args.k):>14}" for name in query_sets))
+    for label, index, scoring in (("single", single, None), ("multi / max", multi, "max"),
+                                  ("multi / weighted", multi, "weighted")):
+        scores = [recall(index, ids, model, q, args.k, args.fanout, scoring) for q in query_sets.values()]
+        print(f"{label:<16} | " + " | ".join(f"{s:>14.3f}" for s in scores))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Memory / recall / latency of LocalIndex quantization (services.quantization).
+
+Builds one brute-force LocalIndex per scheme and rescore factor, flushes and
+reopens it (so float32 rows are memory-mapped, as after a restart) and
+queries it. Reports scan bytes per vector, MB per million vectors, recall@k
+against an exact float32 search, and query latency. Vectors are synthetic
+and clustered, like sentence embeddings, unless --vectors gives an .npy file
+(e.g. saved from a real index); queries are perturbed corpus vectors.
+
+    cd src/api
+    python -m benchmarks.bench_quantization
+    python -m benchmarks.bench_quantization --n 200000 --dim 1024 --schemes none int8 binary --rescore 1 4 10
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from services import quantization as quant
+from services.local_index import LocalIndex
+
+
+def synthetic(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    out = []
+    for q in queries:
+        scores = corpus @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        out.append(top[np.argsort(-scores[top])])
+    return np.array(out)
+
+
+def build(corpus: np.ndarray, scheme: str, rescore: int, path: str) -> LocalIndex:
+    index = LocalIndex(corpus.shape[1], ann="brute", path=path, quantization=scheme, rescore=rescore)
+    for start in range(0, len(corpus), 10000):
+        block = corpus[start:start + 10000]
+        index.upsert([{"id": str(start + i), "values": v} for i, v in enumerate(block)])
+    index.flush()
+    return LocalIndex(corpus.shape[1], ann="brute", path=path, quantization=scheme, rescore=rescore)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default=None, help=".npy (n, dim) float32 corpus; synthetic if omitted")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--schemes", nargs="+", default=list(quant.SCHEMES))
+    parser.add_argument("--rescore", type=int, nargs="+", default=[4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.vectors:
+        corpus = np.load(args.vectors).astype(np.float32)
+        corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    else:
+        corpus = synthetic(args.n, args.dim, args.clusters, rng)
+    picks = rng.integers(0, len(corpus), args.queries)
+    queries = corpus[picks] + 0.3 * rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = exact_top_k(corpus, queries, args.k)
+    print(f"{len(corpus)} vectors x {corpus.shape[1]} dims, {args.queries} queries, k={args.k}")
+
+    print(f"{'scheme':<8} | {'rescore':>7} | {'B/vector':>8} | {'MB/1M':>8} | recall@{args.k} | {'p50 ms':>7} | {'p95 ms':>7}")
+    for scheme in args.schemes:
+        for rescore in (args.rescore if scheme != "none" else [1]):
+            with tempfile.TemporaryDirectory() as path:
+                index = build(corpus, scheme, rescore, path)
+                recalls, latencies = [], []
+                for q, expected in zip(queries, truth):
+                    start = time.perf_counter()
+                    matches = index.query(vector=q, top_k=args.k).matches
+                    latencies.append(time.perf_counter() - start)
+                    found = {int(m.id) for m in matches}
+                    recalls.append(len(found & set(expected.tolist())) / args.k)
+                stats = index.memory_stats()
+            latencies.sort()
+            print(
+                f"{scheme:<8} | {rescore:>7} | {stats['bytes_per_vector']:>8} | {stats['mb_per_million']:>8.1f} | "
+                f"{statistics.mean(recalls):>8.3f} | {statistics.median(latencies) * 1000:>7.2f} | "
+                f"{latencies[int(len(latencies) * 0.95)] * 1000:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Quality and latency of the cross-encoder rerank stage in services.reranker.
+
+Glossary Names are embedded as ingest does and searched by cosine, like
+/api/search; each query is a window of a term's cleaned Definition and the
+term itself is the right answer. For each candidate count N the top N ANN
+matches are reranked in one batched pass. Reports hit@k and MRR@k for ANN
+order vs reranked order, rerank latency percentiles and how often the
+RERANK_BUDGET_MS budget would have forced the ANN fallback.
+
+    cd src/api
+    python -m benchmarks.bench_rerank
+    python -m benchmarks.bench_rerank --candidates 10 25 50 100 --budget-ms 300 --queries 200
+"""
+
+import argparse
+import html
+import re
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_embedding_backends import DEFAULT_CSV
+from services.reranker import RERANK_BUDGET_MS, RERANK_MODEL_NAME, load_reranker, score_pairs
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+def load_terms(csv_path: str):
+    df = pd.read_csv(csv_path).fillna("")
+    df = df[df["Name"].astype(str).str.strip() != ""]
+    return df.to_dict(orient="records")
+
+
+def make_queries(terms, count: int, skip_words: int, words: int, rng):
+    """(query, target row) pairs; the window skips the definition's opening words."""
+    pairs = []
+    for row, term in enumerate(terms):
+        text = html.unescape(_TAG.sub(" ", str(term["Definition"]))).split()
+        if len(text) >= skip_words + words // 2:
+            pairs.append((" ".join(text[skip_words:skip_words + words]), row))
+    picks = rng.permutation(len(pairs))[:count]
+    return [pairs[i] for i in picks]
+
+
+def quality(ranked_rows, target: int, k: int):
+    top = list(ranked_rows[:k])
+    if target not in top:
+        return 0.0, 0.0
+    return 1.0, 1.0 / (top.index(target) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--embedding-model", default="BAAI/bge-large-en-v1.5")
+    parser.add_argument("--rerank-model", default=RERANK_MODEL_NAME)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--skip-words", type=int, default=8)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=RERANK_BUDGET_MS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    terms = load_terms(args.csv)
+    queries = make_queries(terms, args.queries, args.skip_words, args.words, np.random.default_rng(args.seed))
+    embedder = SentenceTransformer(args.embedding_model)
+    reranker = load_reranker(args.rerank_model)
+    corpus = embedder.encode([str(t["Name"]) for t in terms], batch_size=64, normalize_embeddings=True)
+    query_vectors = embedder.encode([q for q, _ in queries], batch_size=64, normalize_embeddings=True)
+    ann_order = np.argsort(-(query_vectors @ corpus.T), axis=1)
+    print(f"{len(terms)} terms, {len(queries)} queries, k={args.k}, budget={args.budget_ms:.0f} ms")
+
+    ann = [quality(order, target, args.k) for order, (_, target) in zip(ann_order, queries)]
+    print(f"{'stage':<14} | {'hit@' + str(args.k):>7} | {'MRR@' + str(args.k):>7} | {'p50 ms':>7} | {'p95 ms':>7} | over budget")
+    print(f"{'ann':<14} | {np.mean([h for h, _ in ann]):>7.3f} | {np.mean([m for _, m in ann]):>7.3f} | "
+          f"{'-':>7} | {'-':>7} | -")
+
+    score_pairs(reranker, "warm up", terms[:8])
+    for n in args.candidates:
+        scores, latencies = [], []
+        for order, (query, target) in zip(ann_order, queries):
+            candidates = order[:n]
+            start = time.perf_counter()
+            ce = score_pairs(reranker, query, [terms[row] for row in candidates])
+            latencies.append(time.perf_counter() - start)
+            scores.append(quality(candidates[np.argsort(-ce, kind="stable")], target, args.k))
+        latencies.sort()
+        over = sum(s * 1000 > args.budget_ms for s in latencies) / len(latencies)
+        print(
+            f"{'rerank@' + str(n):<14} | {np.mean([h for h, _ in scores]):>7.3f} | {np.mean([m for _, m in scores]):>7.3f} | "
+            f"{statistics.median(latencies) * 1000:>7.1f} | {latencies[int(len(latencies) * 0.95)] * 1000:>7.1f} | {over:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
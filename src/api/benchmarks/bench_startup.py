@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark for the API.
+
+Measures, in fresh interpreters:
+  - import time of main.py (nothing should be loaded or called at import)
+  - time until /healthz answers and until /readyz reports ready, with the
+    server started by uvicorn under the chosen WARMUP_MODE
+
+    cd src/api
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --warmup-mode blocking --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(env) -> float:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=API_DIR, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_server(env, port: int, timeout: float):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env=env,
+    )
+    healthy = ready = None
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=2.0) as client:
+            while time.perf_counter() - start < timeout and ready is None:
+                try:
+                    if healthy is None and client.get("/healthz").status_code == 200:
+                        healthy = time.perf_counter() - start
+                    if healthy is not None and client.get("/readyz").status_code == 200:
+                        ready = time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return healthy, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup-mode", default="background", choices=["background", "blocking", "lazy"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args()
+
+    env = dict(os.environ, WARMUP_MODE=args.warmup_mode)
+
+    imports = [time_import(env) for _ in range(args.runs)]
+    print(f"import main: median {statistics.median(imports):.3f}s  (runs: {', '.join(f'{t:.3f}' for t in imports)})")
+
+    if args.skip_server:
+        return
+    for run in range(args.runs):
+        healthy, ready = time_server(env, args.port, args.timeout)
+        fmt = lambda t: f"{t:.2f}s" if t is not None else "timeout"
+        print(f"run {run + 1}: /healthz {fmt(healthy)}  /readyz {fmt(ready)}  ({args.warmup_mode})")
+
+
+if __name__ == "__main__":
+    main()
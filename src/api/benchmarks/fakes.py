@@ -0,0 +1,192 @@
+"""
+Local stand-ins for the external services, so the real app can be
+benchmarked without a Pinecone or OpenAI account.
+
+  FakePineconeIndex  Pinecone's data-plane API over an in-memory LocalIndex,
+                     sleeping a fixed round trip per call; wrap it with
+                     services.clients.InstrumentedIndex like a real handle
+  FakeOpenAI         chat.completions.create (plain and streamed) with a
+                     fixed latency and token usage
+  HashingEncoder     SentenceTransformer.encode lookalike: bag-of-words
+                     vectors from a hashed token table, so texts sharing
+                     words are close; fixed cost per call and per text
+  synthetic_glossary glossary CSV rows with multi-word names
+
+    from benchmarks.fakes import FakeOpenAI, FakePineconeIndex, HashingEncoder
+    resources.set("index", InstrumentedIndex(FakePineconeIndex(384, latency_s=0.02)))
+"""
+
+import threading
+import time
+import zlib
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from services.local_index import LocalIndex
+
+WORDS = (
+    "account address agreement amount annual asset audit balance bank benefit billing branch budget "
+    "business capital card cash category claim client code commission compliance contract cost credit "
+    "currency customer data date debit debt department deposit discount document due employee entity "
+    "equity expense exposure fee filing finance fiscal fund gross holding identifier income insurance "
+    "interest inventory invoice issuer journal ledger legal liability limit loan margin market maturity "
+    "member net number operating order owner partner payment payroll pension period policy portfolio "
+    "position premium price product profit quarter rate ratio record region regulatory report reserve "
+    "retention revenue review risk salary sales segment settlement share statement status supplier tax "
+    "term trade transaction transfer type unit valuation value vendor volume yield"
+).split()
+
+
+class FakePineconeIndex:
+    """
+    The Pinecone data-plane calls main.py makes, answered by an in-memory
+    LocalIndex after latency_s. Only Pinecone's API is exposed (no
+    query_batch / flush / memory_stats), so the app takes its Pinecone paths.
+    """
+
+    def __init__(self, dimension: int, latency_s: float = 0.0, ann: str = "brute"):
+        self.latency_s = latency_s
+        self.calls = Counter()
+        self._calls_lock = threading.Lock()
+        self._index = LocalIndex(dimension, metric="cosine", path=None, ann=ann)
+
+    def _call(self, method: str, *args, **kwargs):
+        kwargs.pop("_request_timeout", None)
+        with self._calls_lock:
+            self.calls[method] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return getattr(self._index, method)(*args, **kwargs)
+
+    def query(self, *args, **kwargs):
+        return self._call("query", *args, **kwargs)
+
+    def fetch(self, *args, **kwargs):
+        return self._call("fetch", *args, **kwargs)
+
+    def upsert(self, *args, **kwargs):
+        return self._call("upsert", *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call("delete", *args, **kwargs)
+
+    def list_paginated(self, *args, **kwargs):
+        return self._call("list_paginated", *args, **kwargs)
+
+    def describe_index_stats(self, *args, **kwargs):
+        return self._call("describe_index_stats", *args, **kwargs)
+
+    def list(self, **kwargs):
+        # one round trip per page, as the Pinecone client pages
+        token = kwargs.pop("pagination_token", None)
+        while True:
+            page = self.list_paginated(pagination_token=token, **kwargs)
+            if page.vectors:
+                yield [v.id for v in page.vectors]
+            if page.pagination is None:
+                return
+            token = page.pagination.next
+
+
+class FakeOpenAI:
+    """client.chat.completions.create: latency_s per completion, spread over the chunks when streamed."""
+
+    def __init__(self, latency_s: float = 0.3, reason: str = "It names the same business concept as the query."):
+        self.latency_s = latency_s
+        self.words = reason.split()
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _usage(self, messages):
+        prompt = sum(len(str(m.get("content", "")).split()) for m in messages)
+        return SimpleNamespace(prompt_tokens=prompt, completion_tokens=len(self.words),
+                               total_tokens=prompt + len(self.words))
+
+    def _create(self, model=None, messages=(), stream=False, stream_options=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        usage = self._usage(messages)
+        if stream:
+            return self._stream(usage, bool(stream_options and stream_options.get("include_usage")))
+        time.sleep(self.latency_s)
+        message = SimpleNamespace(content=" ".join(self.words))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def _stream(self, usage, include_usage: bool):
+        pause = self.latency_s / max(len(self.words), 1)
+        for n, word in enumerate(self.words):
+            time.sleep(pause)
+            delta = SimpleNamespace(content=word if n == 0 else " " + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=usage)
+
+
+class HashingEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer.encode: the normalized sum
+    of a random vector per (hashed) lower-case token, after sleeping
+    call_overhead_s + per_text_s * len(texts).
+    """
+
+    def __init__(self, dimension: int = 384, call_overhead_s: float = 0.002, per_text_s: float = 0.0002,
+                 buckets: int = 1 << 14, seed: int = 0):
+        self.dimension = dimension
+        self.call_overhead_s = call_overhead_s
+        self.per_text_s = per_text_s
+        self.buckets = buckets
+        self.table = np.random.default_rng(seed).standard_normal((buckets, dimension)).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        delay = self.call_overhead_s + self.per_text_s * len(batch)
+        if delay:
+            time.sleep(delay)
+        out = np.zeros((len(batch), self.dimension), dtype=np.float32)
+        for row, text in enumerate(batch):
+            tokens = [zlib.crc32(t.encode("utf-8")) % self.buckets for t in str(text).lower().split()]
+            if tokens:
+                out[row] = self.table[tokens].sum(axis=0)
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+
+def synthetic_glossary(rows: int, glossaries: int = 100, seed: int = 0) -> pd.DataFrame:
+    """Glossary rows with 2-4 word names (unique through a numeric suffix), spread over `glossaries` parents."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(WORDS), size=(rows, 6))
+    lengths = rng.integers(2, 5, size=rows)
+    names = [" ".join(WORDS[w] for w in picks[i, :lengths[i]]).title() + f" {i}" for i in range(rows)]
+    return pd.DataFrame({
+        "Key": [""] * rows,
+        "Name": names,
+        "Status": np.where(rng.random(rows) < 0.9, "Approved", "Draft"),
+        "Definition": [f"The {' '.join(WORDS[w] for w in picks[i])} recorded for term {i}." for i in range(rows)],
+        "Abbreviations": ["".join(WORDS[w][0] for w in picks[i, :lengths[i]]).upper() for i in range(rows)],
+        "Aliases": [""] * rows,
+        "AdditionalNotes": [""] * rows,
+        "Stewards": [f"steward{i % 20}" for i in range(rows)],
+        "RelatedGlossaries": [""] * rows,
+        "TermEntityType": ["Business Terms"] * rows,
+        "ParentGlossary": [f"Glossary {i % glossaries}" for i in range(rows)],
+    })
+
+
+def synthetic_queries(df: pd.DataFrame, count: int, seed: int = 0):
+    """Search strings: a term's name without its suffix, sometimes missing a word."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for name in df["Name"].iloc[rng.integers(0, len(df), size=count)]:
+        words = name.split()[:-1]
+        if len(words) > 2 and rng.random() < 0.5:
+            del words[rng.integers(0, len(words))]
+        queries.append(" ".join(words).lower())
+    return queries
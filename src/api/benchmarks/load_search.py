@@ -0,0 +1,107 @@
+"""
+Concurrent load test for /api/search.
+
+Fires --requests searches at a running server with --concurrency in flight
+and reports latency percentiles. Run it against the server before and after
+a change to compare, e.g.:
+
+    uvicorn main:app --port 8000            # in src/api
+    python -m benchmarks.load_search --url http://localhost:8000 --concurrency 16 --label after
+    python -m benchmarks.load_search --json results.json   # also write raw numbers
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+DEFAULT_QUERIES = [
+    "customer id",
+    "account number",
+    "date of birth",
+    "social security number",
+    "employee retention",
+    "retirement plan",
+    "quarter end filings",
+    "performance review",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+async def run_load(url, queries, total, concurrency, timeout, extra):
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                body = {"query": queries[i % len(queries)], **extra}
+                start = time.perf_counter()
+                try:
+                    resp = await client.post("/api/search", json=body)
+                    resp.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    return latencies, errors, wall
+
+
+def summarize(label, latencies, errors, wall, concurrency):
+    ms = [x * 1000 for x in latencies]
+    return {
+        "label": label,
+        "concurrency": concurrency,
+        "requests": len(ms) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(ms) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(ms, 50), 1) if ms else None,
+        "p95_ms": round(percentile(ms, 95), 1) if ms else None,
+        "p99_ms": round(percentile(ms, 99), 1) if ms else None,
+        "mean_ms": round(statistics.fmean(ms), 1) if ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for concurrency in args.concurrency:
+        latencies, errors, wall = asyncio.run(
+            run_load(args.url, DEFAULT_QUERIES, args.requests, concurrency, args.timeout, {})
+        )
+        summary = summarize(args.label, latencies, errors, wall, concurrency)
+        results.append(summary)
+        print(
+            f"{summary['label']:>8} | c={concurrency:<3} | {summary['throughput_rps']:8.2f} req/s | "
+            f"p50 {summary['p50_ms']} ms | p99 {summary['p99_ms']} ms | errors {errors}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,70 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Body, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from services.upsert_from_csv import upsert_from_csv_file
-from services.vector_engine import get_similar_terms
-from services.fetch_data import delete_vector_by_id, get_all_vectors, get_vector_by_id
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from services.ingest import (
+    CSV_CHUNK_ROWS,
+    EMBED_BATCH_SIZE,
+    ingest_frames,
+    read_csv_chunks,
+    sentence_transformer_encoder,
+)
+from services.executors import run_cpu, run_io, shutdown as shutdown_executors
+from services.cache import TTLCache
+from services.clients import client_stats
+from services.embedding_cache import embedding_cache, encode_cached
+from services.embedding_store import embedding_store
+from services.embedding_workers import BULK, INTERACTIVE, EmbeddingPool
+from services.semantic_cache import SEMANTIC_CACHE_ENABLED, semantic_cache
+from services.vector_store import flush_index
+from services.lexical_index import LEXICAL_INDEX_PATH, lexical_index, reciprocal_rank_fusion
+from services.batch_search import BATCH_SEARCH_MAX_QUERIES, csv_lines, iter_batch_search
+from services.bulk import BULK_MAX_IDS, bulk_delete, bulk_fetch, ids_matching
+from services.facets import build_filter
+from services.local_index import matches_filter
+from services.multi_vector import MULTI_VECTOR_ENABLED, MULTI_VECTOR_FANOUT, collapse, family_ids
+from services.listing import LIST_PAGE_SIZE, MAX_LIST_PAGE_SIZE, iter_pages, load_page, parse_fields
+from services.jobs import cancel_job, get_job, list_jobs, spool_upload, submit_job
+from services.reranker import RERANK_CANDIDATES, RERANK_ENABLED, rerank, rerank_stats
+from services.resources import EMBEDDING_CACHE_KEY, WARMUP_MODE, resources
+from services.telemetry import TracingMiddleware, metrics, record_llm_usage, slow_traces, span
 import shutil
-from pydantic import BaseModel
+import json
+import asyncio
+import threading
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 import os
 import pandas as pd
-from uuid import uuid4
 
-from pinecone import Pinecone, ServerlessSpec
-from langchain_openai import OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from langchain.schema import Document
-from openai import OpenAI
-from sentence_transformers import SentenceTransformer
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
 # Load environment variables
 load_dotenv()
 
+# Clients and models are created by services.resources on first use, never at
+# import time; the lifespan below decides whether to warm them up front.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_MODE == "blocking":
+        await run_in_threadpool(resources.warm)
+    elif WARMUP_MODE == "background":
+        resources.warm_in_background()
+    # without a saved copy the lexical index is built when hybrid search, facets or a bulk filter first needs it
+    if LEXICAL_INDEX_PATH and not lexical_index.load(LEXICAL_INDEX_PATH):
+        ensure_lexical_index()
+    yield
+    if LEXICAL_INDEX_PATH:
+        lexical_index.save_pending(LEXICAL_INDEX_PATH)
+    shutdown_executors()
+    if resources.is_loaded("embedding_model") and isinstance(resources.embedding_model, EmbeddingPool):
+        resources.embedding_model.close()
+    if resources.is_loaded("index"):
+        flush_index(resources.index)
+
 # FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,41 +72,88 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # let the browser read per-stage timings of cross-origin responses
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENV = os.getenv("PINECONE_ENV")  # e.g., "us-east-1"
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
-
-# Initialize Pinecone client
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-# Initialize OpenAI client for reasoning
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-# Create index if it doesn't exist
-if not pc.list_indexes().names().__contains__(PINECONE_INDEX_NAME):
-    pc.create_index(
-        name=PINECONE_INDEX_NAME,
-        dimension=1536,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
-    )
-
-# Connect to index
-index = pc.Index(PINECONE_INDEX_NAME)
-
-# Initialize LangChain components
-embedding = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=OPENAI_API_KEY)
-vectorstore = PineconeVectorStore(index=index, embedding=embedding, namespace="default")
-
-embedding_model = SentenceTransformer("BAAI/bge-large-en-v1.5")
+# per-request spans, Server-Timing header, latency histograms, slow-request log
+app.add_middleware(TracingMiddleware)
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving, nothing is loaded or called."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: the index handle and embedding model used by search are loaded."""
+    status = resources.status()
+    ready = status["index"]["loaded"] and status["embedding_model"]["loaded"]
+    body = {"status": "ready" if ready else "starting", "resources": status, "lexical_terms": len(lexical_index)}
+    return JSONResponse(content=body, status_code=200 if ready else 503)
+
+async def index_op(method: str, **kwargs):
+    """Call resources.index.<method> on the I/O pool; the first call may also create the handle."""
+    return await run_io(lambda: getattr(resources.index, method)(**kwargs))
+
+def encode_texts(texts: List[str], priority: int = INTERACTIVE):
+    """Embeddings through the shared embedding cache (blocking, run on the CPU pool)."""
+    def encode(batch):
+        model = resources.embedding_model
+        with span("encode"):
+            if isinstance(model, EmbeddingPool):
+                # interactive queries jump ahead of queued ingest and batch-search work
+                return model.encode(batch, priority=priority)
+            return model.encode(batch, convert_to_numpy=True)
+    return encode_cached(EMBEDDING_CACHE_KEY, texts, encode)
+
+def encode_query(text: str):
+    return encode_texts([text])[0]
 
 # 📌 Embedding model: llama-text-embed-v2
 # embedding_model = HuggingFaceEmbedding(model_name="meta-llama/Llama-2-7b-hf")
 
-class SearchRequest(BaseModel):
+MAX_SEARCH_TOP_K = int(os.getenv("MAX_SEARCH_TOP_K", "100"))
+
+class FilterRequest(BaseModel):
+    # {"ParentGlossary": ["HR", "Finance"], "Status": "Approved"}: a field's
+    # values are or-ed, fields are and-ed
+    filters: Optional[Dict[str, Union[str, List[str]]]] = None
+    # raw Pinecone metadata filter, and-ed with `filters`
+    filter: Optional[Dict[str, Any]] = None
+
+class SearchRequest(FilterRequest):
     query: str
+    # results returned, after any collapsing and reranking
+    top_k: int = Field(6, ge=1, le=MAX_SEARCH_TOP_K)
+    # also return facet counts (services.facets.FACET_FIELDS) over every term
+    # matching the filters, so a UI can narrow without another request
+    include_facets: bool = False
+    # False returns ranked results straight away with reason=None;
+    # reasons can then be fetched from /api/search/reasons
+    include_reason: bool = True
+    # "vector": dense retrieval only, results exclude exact duplicates of the query
+    # "hybrid": exact Name/alias/abbreviation hits short-circuit, otherwise
+    #           BM25 and vector rankings are fused with reciprocal rank fusion
+    mode: str = "vector"
+    # cross-encoder rerank of the top RERANK_CANDIDATES vector matches
+    # (vector mode); None follows RERANK_ENABLED
+    rerank: Optional[bool] = None
+
+class BatchSearchRequest(FilterRequest):
+    queries: List[str]
+    top_k: int = Field(6, ge=1, le=MAX_SEARCH_TOP_K)
+    # "ndjson": one {"query", "results"} line per query; "csv": one row per result
+    format: str = "ndjson"
+    # one LLM call per result, so off unless asked for
+    include_reason: bool = False
+
+class SearchStreamRequest(SearchRequest):
+    # also push reason_delta events token by token while each reason is generated
+    stream_tokens: bool = False
+
+class ReasonsRequest(BaseModel):
+    query: str
+    ids: List[str]
 
 class SearchResult(BaseModel):
     name: str
@@ -83,8 +171,8 @@ class VectorsRequest(BaseModel):
     limit: int = 100
     cursor: str = None  # for pagination
 
-def generate_reason(user_query: str, metadata: dict) -> str:
-    reasoning_prompt = f"""
+def reason_prompt(user_query: str, metadata: dict) -> str:
+    return f"""
     The user searched for: "{user_query}".
     Candidate match:
     - Name: {metadata.get("Name", "")}
@@ -93,19 +181,82 @@ def generate_reason(user_query: str, metadata: dict) -> str:
 
     Explain briefly in one or two sentences why this result is relevant to the query.
     """
+
+def generate_reason(user_query: str, metadata: dict) -> str:
     try:
-        reasoning_response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": reasoning_prompt}],
-            max_tokens=60,
-            temperature=0.7,
-        )
+        with span("llm"):
+            reasoning_response = resources.openai.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": reason_prompt(user_query, metadata)}],
+                max_tokens=60,
+                temperature=0.7,
+            )
+        record_llm_usage(reasoning_response.usage)
         content = reasoning_response.choices[0].message.content
         return content.strip() if content else "Reason unavailable"
     except Exception as e:
         print(f"OpenAI reasoning error: {e}")
         return "Reason unavailable"
 
+def stream_reason(user_query: str, metadata: dict, on_delta) -> str:
+    """Same as generate_reason, but calls on_delta(text) for every streamed token chunk."""
+    try:
+        parts = []
+        with span("llm"):
+            stream = resources.openai.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": reason_prompt(user_query, metadata)}],
+                max_tokens=60,
+                temperature=0.7,
+                stream=True,
+                # token counts arrive in a final chunk with no choices
+                stream_options={"include_usage": True},
+            )
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    record_llm_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        content = "".join(parts).strip()
+        return content if content else "Reason unavailable"
+    except Exception as e:
+        print(f"OpenAI reasoning error: {e}")
+        return "Reason unavailable"
+
+REASON_CACHE_SIZE = int(os.getenv("REASON_CACHE_SIZE", "4096"))
+REASON_CACHE_TTL = float(os.getenv("REASON_CACHE_TTL", "86400"))
+reason_cache = TTLCache(maxsize=REASON_CACHE_SIZE, ttl=REASON_CACHE_TTL)
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def cached_reason(user_query: str, vector_id: str, metadata: dict, on_delta=None) -> str:
+    key = (normalize_query(user_query), vector_id)
+    reason = reason_cache.get(key)
+    if reason is None:
+        if on_delta is None:
+            reason = generate_reason(user_query, metadata)
+        else:
+            reason = stream_reason(user_query, metadata, on_delta)
+        # don't pin failures in the cache
+        if reason != "Reason unavailable":
+            reason_cache.set(key, reason)
+    return reason
+
+async def generate_reasons(user_query: str, results: List[Dict[str, Any]], metadatas: List[dict]) -> None:
+    """Fill in result["reason"] for every result, all LLM calls in flight at once."""
+    with span("reasons"):
+        reasons = await asyncio.gather(*(
+            run_io(cached_reason, user_query, result["id"], metadata)
+            for result, metadata in zip(results, metadatas)
+        ))
+    for result, reason in zip(results, reasons):
+        result["reason"] = reason
+
 # def generate_reason(query, doc):
 #     """Generate explanation for match."""
 #     prompt = f"""
@@ -251,71 +402,345 @@ def generate_reason(user_query: str, metadata: dict) -> str:
 class FetchRequest(BaseModel):
     limit: int = 100
 
-@app.post("/api/upload-csv")
-async def upload_csv(file: UploadFile):
-    try:
-        df = pd.read_csv(file.file)
-
-        if "Name" not in df.columns:
-            return {"error": "CSV must contain a 'Name' column."}
-
-        vectors = []
-        for _, row in df.iterrows():
-            name = str(row.get("Name", "")).strip()
-            if not name:
-                continue
-            vector = embedding_model.encode(name).tolist()
-            metadata = {col: str(row.get(col, "")).strip() for col in df.columns}
-            metadata["source"] = file.filename
-
-            vectors.append({
-                "id": str(uuid4()),
-                "values": vector,
-                "metadata": metadata
-            })
+class BulkRequest(BaseModel):
+    # exactly one of ids / filter; filter is a Pinecone-style metadata filter,
+    # e.g. {"source": "glossary.csv"} or {"ParentGlossary": {"$in": ["HR", "Finance"]}}
+    ids: Optional[List[str]] = None
+    filter: Optional[Dict[str, Any]] = None
+    namespace: str = ""
 
-        for i in range(0, len(vectors), 100):
-            index.upsert(vectors=vectors[i:i+100])
+class BulkFetchRequest(BulkRequest):
+    fields: Optional[str] = None  # comma-separated subset of TERM_FIELDS
+
+class BulkDeleteRequest(BulkRequest):
+    # resolve and report the matching ids without deleting anything
+    dry_run: bool = False
+
+def index_changed():
+    """Called after anything upserts into or deletes from the index."""
+    semantic_cache.invalidate()
+    flush_index(resources.index)
+    if LEXICAL_INDEX_PATH:
+        lexical_index.save_later(LEXICAL_INDEX_PATH)
+
+_lexical_build_lock = threading.Lock()
+_lexical_building = False
+
+def ensure_lexical_index():
+    """Start building the lexical index in the background unless it is complete or already building."""
+    global _lexical_building
+    with _lexical_build_lock:
+        if lexical_index.complete or _lexical_building:
+            return
+        _lexical_building = True
+
+    def build():
+        global _lexical_building
+        try:
+            rebuild_lexical_index()
+        finally:
+            with _lexical_build_lock:
+                _lexical_building = False
+    threading.Thread(target=build, daemon=True).start()
+
+def rebuild_lexical_index():
+    try:
+        count = lexical_index.build_from_index(resources.index)
+        print(f"Lexical index built with {count} terms")
+        if LEXICAL_INDEX_PATH:
+            lexical_index.save(LEXICAL_INDEX_PATH)
+    except Exception as e:
+        print(f"Lexical index build failed: {e}")
+
+def ingest_options(delta: bool, prune: bool) -> Dict[str, Any]:
+    """ingest_frames() keyword arguments shared by every bge-large ingest path."""
+    return {
+        "on_upsert": lexical_index.add_many,
+        "delta": delta,
+        "prune": prune,
+        "on_delete": lexical_index.remove_many,
+        # the lexical index mirrors the index's metadata, so pruning need not scan it
+        "metadata_snapshot": lambda: lexical_index.snapshot() if lexical_index.complete else None,
+        "multi_vector": MULTI_VECTOR_ENABLED,
+    }
+
+def ingest_csv(csv_file, source: str, progress=None, batch_size: int = EMBED_BATCH_SIZE,
+               delta: bool = True, prune: bool = False) -> str:
+    """bge-large ingest of a CSV path or file object; blocking, run it off the event loop."""
+    counts = {"rows_processed": 0, "rows_upserted": 0, "rows_unchanged": 0}
+    try:
+        for p in ingest_frames(
+            read_csv_chunks(csv_file),
+            source=source,
+            encode=sentence_transformer_encoder(resources.embedding_model, batch_size, EMBEDDING_CACHE_KEY),
+            index=resources.index,
+            batch_size=batch_size,
+            **ingest_options(delta, prune),
+        ):
+            counts.update(p)
+            if progress:
+                progress(counts["rows_processed"])
+    finally:
+        index_changed()
+    message = f"Upserted {counts['rows_upserted']} records from {source}"
+    if MULTI_VECTOR_ENABLED:
+        message += f" as {counts.get('vectors_upserted', 0)} vectors"
+    if delta:
+        message += f", {counts['rows_unchanged']} unchanged"
+    if prune:
+        message += f", deleted {counts.get('rows_deleted', 0)} no longer in the file"
+    return message
 
-        return {"message": f"Upserted {len(vectors)} records from {file.filename}"}
+@app.post("/api/upload-csv")
+async def upload_csv(file: UploadFile, batch_size: int = EMBED_BATCH_SIZE, delta: bool = True, prune: bool = False):
+    """
+    Rows get deterministic ids (from Key, else Name + ParentGlossary). With delta,
+    rows whose content hash is unchanged are skipped; with prune, terms from this
+    file name that the upload no longer contains are deleted.
+    """
+    try:
+        message = await run_io(ingest_csv, file.file, file.filename, None, batch_size, delta, prune)
+        return {"message": message}
 
+    except ValueError as e:
+        return {"error": str(e)}
     except Exception as e:
         import traceback
         traceback.print_exc()
         print(str(e));
         return {"error": str(e)}
 
-@app.post("/api/search")
-async def search(request: SearchRequest):
-    try:
-        query_vector = embedding_model.encode(request.query).tolist()
-        results = index.query(vector=query_vector, top_k=6, include_metadata=True)
-        
-        response = []
-        for match in results.matches:
+@app.post("/api/upload-csv/stream")
+async def upload_csv_stream(
+    file: UploadFile,
+    batch_size: int = EMBED_BATCH_SIZE,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    delta: bool = True,
+    prune: bool = False,
+):
+    """
+    Streaming ingest: the upload is read, embedded and upserted chunk by chunk,
+    and progress is streamed back as NDJSON, one object per line:
+    {"rows_processed": n, "rows_upserted", "rows_unchanged"} ... then
+    {"status": "done", ...} or {"status": "error", ...}. delta / prune as for /api/upload-csv.
+    """
+    def progress_lines():
+        upserted = 0
+        try:
+            frames = read_csv_chunks(file.file, chunk_rows)
+            for progress in ingest_frames(
+                frames,
+                source=file.filename,
+                encode=sentence_transformer_encoder(resources.embedding_model, batch_size, EMBEDDING_CACHE_KEY),
+                index=resources.index,
+                batch_size=batch_size,
+                **ingest_options(delta, prune),
+            ):
+                upserted = progress["rows_upserted"]
+                yield json.dumps(progress) + "\n"
+            yield json.dumps({
+                "status": "done",
+                "rows_upserted": upserted,
+                "message": f"Upserted {upserted} records from {file.filename}",
+            }) + "\n"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield json.dumps({"status": "error", "rows_upserted": upserted, "error": str(e)}) + "\n"
+        finally:
+            index_changed()
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+# ------------------------------- ingest jobs ------------------------
+
+# jobs write into the serving index, so only the pipeline that embeds with the
+# search model may run; the openai / llama scripts need an index of their own
+INGEST_PIPELINES = ("bge",)
+
+def job_runner(pipeline: str, filename: str, delta: bool = True, prune: bool = False):
+    return lambda csv_path, progress: ingest_csv(csv_path, filename, progress, delta=delta, prune=prune)
+
+@app.post("/api/jobs/upload-csv")
+async def create_ingest_job(file: UploadFile, pipeline: str = "bge", delta: bool = True, prune: bool = False):
+    """Spool the upload to disk and ingest it in the background; returns a job id at once. delta / prune as for /api/upload-csv."""
+    if pipeline not in INGEST_PIPELINES:
+        raise HTTPException(status_code=400, detail=f"pipeline must be one of {INGEST_PIPELINES}")
+    path = await run_in_threadpool(spool_upload, file.file, file.filename)
+    job = submit_job(path, file.filename, pipeline, job_runner(pipeline, file.filename, delta, prune))
+    return job.to_dict()
+
+@app.get("/api/jobs")
+async def get_jobs():
+    return {"results": [job.to_dict() for job in list_jobs()]}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with ID {job_id}")
+    return job.to_dict()
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_ingest_job(job_id: str):
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with ID {job_id}")
+    return job.to_dict()
+
+def rank_matches(user_query: str, matches):
+    """Turn index matches into search results (reason unset), skipping exact duplicates of the query."""
+    results, metadatas = [], []
+    with span("filter"):
+        for match in matches:
             metadata = match.metadata or {}
-            
+
             name = metadata.get("Name", "")
             aliases = metadata.get("Aliases", "")
             definition = metadata.get("Definition", "")
 
             # 🚫 skip if exact duplicate of query
-            if request.query.strip().lower() in [
+            if user_query.strip().lower() in [
                 name.strip().lower(),
                 aliases.strip().lower(),
                 definition.strip().lower()
             ]:
                 continue
 
-            response.append({
-                "id": match.id,
-                "score": match.score,
-                "name": metadata.get("Name", ""),
-                "definition": metadata.get("Definition", ""),
-                "aliases": metadata.get("Aliases", ""),
-                "reason": generate_reason(request.query, metadata)
-            })
-        return {"results": response}
+            results.append(result_from_match(match))
+            metadatas.append(metadata)
+    return results, metadatas
+
+class _Match:
+    """Index-match lookalike for hits not taken as-is from index.query: lexical, fused or reranked."""
+    def __init__(self, vector_id: str, score: float, metadata: dict):
+        self.id = vector_id
+        self.score = score
+        self.metadata = metadata
+
+def result_from_match(match) -> Dict[str, Any]:
+    metadata = match.metadata or {}
+    return {
+        "id": match.id,
+        "score": match.score,
+        "name": metadata.get("Name", ""),
+        "definition": metadata.get("Definition", ""),
+        "aliases": metadata.get("Aliases", ""),
+        "reason": None
+    }
+
+async def vector_matches(query_vector, top_k: int = 6, filter: Optional[dict] = None):
+    """
+    Index matches for a query vector, one per term: in multi-vector mode the
+    index is over-fetched and child hits are collapsed onto their parent.
+    The filter is applied by the index itself.
+    """
+    fetch_k = top_k * MULTI_VECTOR_FANOUT if MULTI_VECTOR_ENABLED else top_k
+    kwargs = {"filter": filter} if filter else {}
+    with span("ann"):
+        results = await index_op("query", vector=query_vector, top_k=fetch_k, include_metadata=True, **kwargs)
+    if not any((m.metadata or {}).get("parent_id") for m in results.matches):
+        return list(results.matches[:top_k])
+    return [_Match(vid, score, metadata) for vid, score, metadata in collapse(results.matches, top_k)]
+
+async def hybrid_matches(query: str, top_k: int = 6, filter: Optional[dict] = None):
+    """Exact hits in O(1) without touching the model or the index, else BM25 + vector RRF."""
+    ensure_lexical_index()
+    exact = [vid for vid in lexical_index.exact_lookup(query) if matches_filter(lexical_index.metadata.get(vid), filter)]
+    if exact:
+        return [_Match(vid, 1.0, lexical_index.metadata[vid]) for vid in exact[:top_k]]
+
+    query_vector = (await run_cpu(encode_query, query)).tolist()
+    vector_hits = await vector_matches(query_vector, top_k * 4, filter)
+    with span("lexical"):
+        lexical_hits = lexical_index.search(query, top_k=top_k * 4, filter=filter)
+
+    metadata_by_id = {m.id: m.metadata or {} for m in vector_hits}
+    fused = reciprocal_rank_fusion([
+        [m.id for m in vector_hits],
+        [vid for vid, _ in lexical_hits],
+    ])
+    return [
+        _Match(vid, round(score, 4), metadata_by_id.get(vid) or lexical_index.metadata.get(vid, {}))
+        for vid, score in fused[:top_k]
+    ]
+
+async def rerank_matches(query: str, matches, top_k: int = 6):
+    """
+    (matches, reranked?): the top_k candidates in cross-encoder order, or in
+    ANN order while the reranker is still loading or over its budget.
+    """
+    if not resources.is_loaded("reranker"):
+        # never make a search wait for the model load
+        resources.warm_in_background(("reranker",))
+        rerank_stats.record("not_loaded")
+        return list(matches[:top_k]), False
+    with span("rerank"):
+        ranked, reranked = await rerank(resources.reranker, query, matches, top_k)
+    return [_Match(m.id, score, m.metadata or {}) for m, score in ranked], reranked
+
+def use_rerank(request: SearchRequest) -> bool:
+    return RERANK_ENABLED if request.rerank is None else request.rerank
+
+async def retrieve(request: SearchRequest, query_vector, search_filter: Optional[dict]):
+    """(matches, reranked?) for vector mode: filtered index matches, reranked when asked."""
+    if not use_rerank(request):
+        return await vector_matches(query_vector, request.top_k, search_filter), False
+    candidates = await vector_matches(query_vector, max(RERANK_CANDIDATES, request.top_k), search_filter)
+    # reasons are generated for the final results only
+    return await rerank_matches(request.query, candidates, request.top_k)
+
+def search_body(request: SearchRequest, results, search_filter: Optional[dict]) -> Dict[str, Any]:
+    body = {"results": results}
+    if request.include_facets:
+        ensure_lexical_index()
+        with span("facets"):
+            body["facets"] = lexical_index.facet_counts(search_filter)
+    return body
+
+@app.post("/api/search")
+async def search(request: SearchRequest):
+    try:
+        search_filter = build_filter(request.filters, request.filter)
+        if request.mode == "hybrid":
+            matches = await hybrid_matches(request.query, request.top_k, search_filter)
+            response = [result_from_match(m) for m in matches]
+            if request.include_reason:
+                await generate_reasons(request.query, response, [m.metadata for m in matches])
+            return search_body(request, response, search_filter)
+
+        query_vector = (await run_cpu(encode_query, request.query)).tolist()
+
+        reranking = use_rerank(request)
+        cache_key = (reranking, request.top_k, json.dumps(search_filter, sort_keys=True))
+        # read before the index is queried, so results from before an index change are not stored after it
+        generation = semantic_cache.generation
+        cached = semantic_cache.lookup(query_vector, cache_key) if SEMANTIC_CACHE_ENABLED else None
+        reranked = False
+        if cached is not None:
+            # the cached dict is shared with concurrent requests; new reasons go into a copy
+            matches, reasons = cached[0], dict(cached[1])
+        else:
+            matches, reranked = await retrieve(request, query_vector, search_filter)
+            reasons = {}
+
+        response, metadatas = rank_matches(request.query, matches)
+        if request.include_reason:
+            missing = [(r, m) for r, m in zip(response, metadatas) if r["id"] not in reasons]
+            if missing:
+                await generate_reasons(request.query, [r for r, _ in missing], [m for _, m in missing])
+            for result in response:
+                if result["id"] in reasons:
+                    result["reason"] = reasons[result["id"]]
+                elif result["reason"] != "Reason unavailable":
+                    reasons[result["id"]] = result["reason"]
+
+        # an ANN-order fallback is not worth pinning in place of a reranked answer
+        if SEMANTIC_CACHE_ENABLED and cached is None and (reranked or not reranking):
+            semantic_cache.store(query_vector, (matches, reasons), cache_key, generation)
+        elif cached is not None and len(reasons) > len(cached[1]):
+            semantic_cache.store(query_vector, (matches, reasons), cache_key, generation)
+        return search_body(request, response, search_filter)
 
     except Exception as e:
         # Debug log for your console
@@ -323,43 +748,253 @@ async def search(request: SearchRequest):
         # Return 500 with details
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/vectors")
-async def get_vectors(limit: int = 100):
-    try:
-        # use a zero-vector to pull top-K items
-        zero_vector = [0.0] * 1024  # dimension = 1024
-        query_response = index.query(
-            vector=zero_vector,
-            top_k=limit,
-            include_metadata=True
+@app.post("/api/search/stream")
+async def search_stream(request: SearchStreamRequest):
+    """
+    NDJSON stream: one {"type": "results", "results": [...]} line (with "facets"
+    when include_facets is set) as soon as the index query returns, then {"type": "reason", "id", "reason"} per match in
+    completion order (preceded by {"type": "reason_delta", "id", "delta"} lines
+    when stream_tokens is set), and finally {"type": "done"}.
+    """
+    async def events():
+        tasks = []
+        try:
+            search_filter = build_filter(request.filters, request.filter)
+            query_vector = (await run_cpu(encode_query, request.query)).tolist()
+            matches, _ = await retrieve(request, query_vector, search_filter)
+            response, metadatas = rank_matches(request.query, matches)
+            yield json.dumps(dict(search_body(request, response, search_filter), type="results")) + "\n"
+
+            if request.include_reason and response:
+                loop = asyncio.get_running_loop()
+                queue = asyncio.Queue()
+
+                async def reason_for(result, metadata):
+                    on_delta = None
+                    if request.stream_tokens:
+                        def on_delta(text, vector_id=result["id"]):
+                            loop.call_soon_threadsafe(
+                                queue.put_nowait, {"type": "reason_delta", "id": vector_id, "delta": text}
+                            )
+                    reason = await run_io(cached_reason, request.query, result["id"], metadata, on_delta)
+                    queue.put_nowait({"type": "reason", "id": result["id"], "reason": reason})
+
+                tasks = [asyncio.create_task(reason_for(r, m)) for r, m in zip(response, metadatas)]
+                remaining = len(tasks)
+                while remaining:
+                    event = await queue.get()
+                    if event["type"] == "reason":
+                        remaining -= 1
+                    yield json.dumps(event) + "\n"
+
+            yield json.dumps({"type": "done"}) + "\n"
+
+        except Exception as e:
+            print(f"Error in /api/search/stream: {e}")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+async def batch_search_response(queries: List[str], top_k: int, search_filter: Optional[dict],
+                                fmt: str, include_reason: bool) -> StreamingResponse:
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    if not queries:
+        raise HTTPException(status_code=400, detail="No queries given")
+    if len(queries) > BATCH_SEARCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400, detail=f"{len(queries)} queries exceed BATCH_SEARCH_MAX_QUERIES={BATCH_SEARCH_MAX_QUERIES}"
         )
+    index = await run_io(resources.get, "index")
+
+    async def lines():
+        first = True
+        try:
+            async for query, hits in iter_batch_search(
+                queries, lambda texts: encode_texts(texts, BULK), index, run_cpu, run_io, top_k, search_filter
+            ):
+                results = []
+                for vid, score, metadata in hits:
+                    result = result_from_match(_Match(vid, score, metadata))
+                    result["parentGlossary"] = metadata.get("ParentGlossary", "")
+                    results.append(result)
+                if include_reason:
+                    await generate_reasons(query, results, [metadata for _, _, metadata in hits])
+                if fmt == "csv":
+                    yield csv_lines(query, results, header=first)
+                else:
+                    yield json.dumps({"query": query, "results": results}) + "\n"
+                first = False
+        except Exception as e:
+            print(f"Error in batch search: {e}")
+            if fmt == "ndjson":
+                yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="text/csv" if fmt == "csv" else "application/x-ndjson")
+
+@app.post("/api/search/batch")
+async def search_batch(request: BatchSearchRequest):
+    """
+    Match many queries at once: one batched encode per chunk of queries, no LLM
+    reasons by default, results streamed in input order as NDJSON
+    ({"query", "results"} per line) or CSV (query, rank, id, name, score, parentGlossary).
+    """
+    search_filter = build_filter(request.filters, request.filter)
+    return await batch_search_response(request.queries, request.top_k, search_filter, request.format, request.include_reason)
+
+@app.post("/api/search/batch/csv")
+async def search_batch_csv(
+    file: UploadFile,
+    column: Optional[str] = None,
+    top_k: int = Query(6, ge=1, le=MAX_SEARCH_TOP_K),
+    format: str = "csv",
+    include_reason: bool = False,
+):
+    """/api/search/batch for a CSV upload: queries are the `column` values (default "query", else the first column)."""
+    df = await run_io(pd.read_csv, file.file, dtype=str, keep_default_na=False)
+    column = column or ("query" if "query" in df.columns else df.columns[0])
+    if column not in df.columns:
+        raise HTTPException(status_code=400, detail=f"CSV has no column {column!r}")
+    queries = [q.strip() for q in df[column] if q.strip()]
+    return await batch_search_response(queries, top_k, None, format, include_reason)
+
+@app.post("/api/facets")
+async def facets(request: FilterRequest):
+    """Facet counts over every term matching the filters, from the in-memory metadata index."""
+    ensure_lexical_index()
+    return {"facets": lexical_index.facet_counts(build_filter(request.filters, request.filter))}
+
+@app.post("/api/search/reasons")
+async def search_reasons(request: ReasonsRequest):
+    """Deferred reasons for results returned by /api/search with include_reason=false."""
+    try:
+        fetch_response = await index_op("fetch", ids=request.ids)
+        results, metadatas = [], []
+        for vector_id in request.ids:
+            vec = fetch_response.vectors.get(vector_id)
+            if vec is None:
+                continue
+            results.append({"id": vector_id, "reason": None})
+            metadatas.append(vec.metadata or {})
 
-        response = []
-        for match in query_response.matches:
-            metadata = match.metadata or {}
-            response.append({
-                "id": match.id,
-                "score": match.score,
-                "name": metadata.get("Name", ""),
-                "definition": metadata.get("Definition", ""),
-                "aliases": metadata.get("Aliases", ""),
-                "parentGlossary": metadata.get("ParentGlossary", ""),
-                "stewards": metadata.get("Stewards", ""),
-                "termEntityType": metadata.get("TermEntityType", ""),
-                "source": metadata.get("source", "")
-            })
-
-        return {"results": response}
+        await generate_reasons(request.query, results, metadatas)
+        return {"results": results}
+
+    except Exception as e:
+        print(f"Error in /api/search/reasons: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return {
+        "embeddings": embedding_cache.stats(),
+        "embedding_store": embedding_store.stats(),
+        "embedding_workers": resources.embedding_model.stats()
+        if resources.is_loaded("embedding_model") and isinstance(resources.embedding_model, EmbeddingPool) else None,
+        "reasons": reason_cache.stats(),
+        "semantic": semantic_cache.stats(),
+        "rerank": rerank_stats.stats(),
+        "local_index": resources.index.memory_stats()
+        if resources.is_loaded("index") and hasattr(resources.index, "memory_stats") else None,
+    }
+
+def collected_counters():
+    """Counters the caches and clients already keep, read by /metrics at scrape time."""
+    for cache, stats in (("embedding", embedding_cache.stats()), ("reason", reason_cache.stats()),
+                         ("semantic", semantic_cache.stats())):
+        yield "cache_hits_total", {"cache": cache}, stats["hits"]
+        yield "cache_misses_total", {"cache": cache}, stats["misses"]
+    for service, stats in client_stats.stats().items():
+        yield "client_calls_total", {"service": service}, stats["calls"]
+        yield "client_errors_total", {"service": service}, stats["errors"]
+        yield "client_retries_total", {"service": service}, stats["retries"]
+
+metrics.describe("cache_hits_total", "counter", "Cache hits by cache (embedding, reason, semantic).")
+metrics.describe("cache_misses_total", "counter", "Cache misses by cache (embedding, reason, semantic).")
+metrics.describe("client_calls_total", "counter", "Pinecone / OpenAI calls, retries included.")
+metrics.add_collector(collected_counters)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text format: request and stage latency histograms, cache, client and token counters."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/traces/slow")
+async def recent_slow_traces():
+    """The most recent requests slower than TRACE_SLOW_MS with their spans, newest first."""
+    return {"results": list(reversed(slow_traces))}
+
+@app.get("/api/clients/stats")
+async def clients_stats():
+    """Per-service call counts, retries, latency percentiles and keep-alive connection reuse."""
+    return client_stats.stats()
+
+@app.get("/api/vectors")
+@app.post("/api/vectors")
+async def get_vectors(
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=MAX_LIST_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    prefix: Optional[str] = None,
+):
+    """
+    One page of terms in id order. Pass the returned next_cursor back as
+    `cursor` for the following page (null on the last page); `fields` is a
+    comma-separated subset of TERM_FIELDS to return.
+    """
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        index = await run_io(resources.get, "index")
+        response, next_cursor = await run_io(load_page, index, limit, cursor, projection, prefix=prefix)
+        return {"results": response, "next_cursor": next_cursor}
 
     except Exception as e:
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
 
+@app.get("/api/vectors/export")
+async def export_vectors(
+    page_size: int = Query(MAX_LIST_PAGE_SIZE, ge=1, le=MAX_LIST_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    prefix: Optional[str] = None,
+):
+    """
+    NDJSON export of every term: one JSON object per line, then a final
+    {"type": "done", "count"} line ({"type": "error", "error", "cursor"} on
+    failure, so the export can resume from that cursor).
+    """
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def lines():
+        count, position = 0, cursor
+        try:
+            index = await run_io(resources.get, "index")
+            async for terms, next_cursor in iter_pages(run_io, index, projection, page_size, cursor, prefix=prefix):
+                yield "".join(json.dumps(term) + "\n" for term in terms)
+                count += len(terms)
+                position = next_cursor
+            yield json.dumps({"type": "done", "count": count}) + "\n"
+        except Exception as e:
+            print(f"Error in /api/vectors/export: {e}")
+            yield json.dumps({"type": "error", "error": str(e), "cursor": position}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @app.get("/api/vectors/{vector_id}")
 async def get_vector_by_id(vector_id: str):
     try:
-        fetch_response = index.fetch(ids=[vector_id])
+        fetch_response = await index_op("fetch", ids=[vector_id])
 
         if not fetch_response.vectors:
             return {"error": f"No vector found with ID {vector_id}"}
@@ -383,6 +1018,54 @@ async def get_vector_by_id(vector_id: str):
         traceback.print_exc()
         return {"error": str(e)}
 
+async def bulk_target_ids(request: BulkRequest, index) -> List[str]:
+    """The ids a bulk request addresses; raises 400 unless exactly one of ids / a non-empty filter is given."""
+    if (request.ids is None) == (not request.filter):
+        raise HTTPException(status_code=400, detail="Pass either ids or a non-empty filter")
+    if request.ids is not None:
+        ids = request.ids
+    else:
+        # once complete, the lexical index mirrors the default namespace, so filters resolve without scanning the index
+        known = None
+        if not request.namespace:
+            ensure_lexical_index()
+            known = lexical_index.snapshot() if lexical_index.complete else None
+        ids = await run_io(ids_matching, index, request.filter, known, request.namespace)
+    if len(ids) > BULK_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"{len(ids)} ids exceed BULK_MAX_IDS={BULK_MAX_IDS}")
+    return ids
+
+@app.post("/api/vectors/fetch")
+async def fetch_vectors(request: BulkFetchRequest):
+    """Terms for an id list or metadata filter: {"results": [{"id", "found", "term"}]} in id order."""
+    try:
+        fields = parse_fields(request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    index = await run_io(resources.get, "index")
+    ids = await bulk_target_ids(request, index)
+    results = await bulk_fetch(run_io, index, ids, fields, request.namespace)
+    return {"results": results, "found": sum(r["found"] for r in results)}
+
+@app.post("/api/vectors/delete")
+async def delete_vectors(request: BulkDeleteRequest):
+    """Delete by id list or metadata filter: {"results": [{"id", "status"}]} in id order."""
+    index = await run_io(resources.get, "index")
+    ids = await bulk_target_ids(request, index)
+    if request.dry_run:
+        return {"results": [{"id": vid, "status": "matched"} for vid in ids], "deleted": 0}
+
+    # multi-vector terms take their child vectors with them
+    known = lexical_index.metadata if not request.namespace else {}
+    ids = await run_io(family_ids, index, ids, known, request.namespace)
+    results = await bulk_delete(run_io, index, ids, request.namespace)
+    deleted = [r["id"] for r in results if r["status"] == "deleted"]
+    if deleted:
+        if not request.namespace:
+            lexical_index.remove_many(deleted)
+        await run_io(index_changed)
+    return {"results": results, "deleted": len(deleted)}
+
 @app.delete("/api/vectors/delete/{vector_id}")
 def delete_vector(vector_id: str):
     """
@@ -391,7 +1074,9 @@ def delete_vector(vector_id: str):
     - Set `delete_all=True` to wipe all vectors (optionally by namespace)
     """
     try:
-        index.delete(ids=vector_id)
+        resources.index.delete(ids=family_ids(resources.index, [vector_id], lexical_index.metadata))
+        lexical_index.remove(vector_id)
+        index_changed()
         return {"status": "success", "message": f"Deleted {len(vector_id)}"}
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,97 @@
+# batch_search.py
+#
+# Bulk term matching for POST /api/search/batch: many queries, no LLM.
+# - queries are embedded BATCH_SEARCH_CHUNK at a time in one encode call,
+#   and chunk N+1 is already encoding while chunk N is being searched
+# - a LocalIndex answers a chunk with LocalIndex.query_batch (one matrix
+#   product per block of rows); other indexes get one query per text,
+#   BATCH_SEARCH_CONCURRENCY of them in flight at once
+# - multi-vector hits are collapsed per term exactly as /api/search does
+# Results come back in input order, ready to stream as NDJSON or CSV.
+
+import asyncio
+import csv
+import io
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.multi_vector import MULTI_VECTOR_ENABLED, MULTI_VECTOR_FANOUT, collapse
+from services.telemetry import span
+
+BATCH_SEARCH_MAX_QUERIES = int(os.getenv("BATCH_SEARCH_MAX_QUERIES", "100000"))
+BATCH_SEARCH_CHUNK = int(os.getenv("BATCH_SEARCH_CHUNK", "256"))
+BATCH_SEARCH_CONCURRENCY = int(os.getenv("BATCH_SEARCH_CONCURRENCY", "16"))
+
+CSV_COLUMNS = ["query", "rank", "id", "name", "score", "parentGlossary"]
+
+# (id, score, metadata) per hit, best first
+Hits = List[Tuple[str, float, Dict[str, Any]]]
+
+
+def _hits(matches, top_k: int) -> Hits:
+    if any((m.metadata or {}).get("parent_id") for m in matches):
+        return collapse(matches, top_k)
+    return [(m.id, m.score, m.metadata or {}) for m in matches[:top_k]]
+
+
+async def search_vectors(run_cpu, run_io, index, vectors, top_k: int, filter: Optional[dict] = None) -> List[Hits]:
+    """Hits for every row of `vectors` (a float32 matrix), in order."""
+    fetch_k = top_k * MULTI_VECTOR_FANOUT if MULTI_VECTOR_ENABLED else top_k
+    kwargs = {"filter": filter} if filter else {}
+    query_batch = getattr(index, "query_batch", None)
+    if query_batch is not None:
+        with span("ann"):
+            responses = await run_cpu(query_batch, vectors, top_k=fetch_k, include_metadata=True, **kwargs)
+        return [_hits(r.matches, top_k) for r in responses]
+
+    semaphore = asyncio.Semaphore(BATCH_SEARCH_CONCURRENCY)
+
+    async def one(vector):
+        async with semaphore:
+            with span("ann"):
+                response = await run_io(
+                    lambda: index.query(vector=vector.tolist(), top_k=fetch_k, include_metadata=True, **kwargs)
+                )
+        return _hits(response.matches, top_k)
+
+    return await asyncio.gather(*(one(v) for v in vectors))
+
+
+async def iter_batch_search(
+    queries: Sequence[str],
+    encode: Callable[[List[str]], Any],
+    index,
+    run_cpu,
+    run_io,
+    top_k: int = 6,
+    filter: Optional[dict] = None,
+    chunk: int = BATCH_SEARCH_CHUNK,
+) -> AsyncIterator[Tuple[str, Hits]]:
+    """
+    Yield (query, hits) for every query in order. encode(texts) is blocking
+    and returns a float32 matrix; it runs on the CPU pool via run_cpu.
+    """
+    chunks = [list(queries[i:i + chunk]) for i in range(0, len(queries), chunk)]
+    pending = asyncio.ensure_future(run_cpu(encode, chunks[0])) if chunks else None
+    try:
+        for n, texts in enumerate(chunks):
+            vectors = await pending
+            pending = asyncio.ensure_future(run_cpu(encode, chunks[n + 1])) if n + 1 < len(chunks) else None
+            for text, hits in zip(texts, await search_vectors(run_cpu, run_io, index, vectors, top_k, filter)):
+                yield text, hits
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def csv_lines(query: str, results: List[Dict[str, Any]], header: bool = False) -> str:
+    """CSV text for one query's results (one row per result, CSV_COLUMNS); a query with no results gets an empty row."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for rank, result in enumerate(results, start=1):
+        writer.writerow([query, rank, result["id"], result["name"], result["score"], result.get("parentGlossary", "")])
+    if not results:
+        writer.writerow([query, "", "", "", "", ""])
+    return out.getvalue()
@@ -0,0 +1,102 @@
+# bulk.py
+#
+# Bulk fetch / delete by id list or metadata filter.
+# - ids_matching(): resolve a Pinecone-style filter to ids, from the
+#   lexical index's in-memory metadata when it is loaded, else by scanning
+#   the index with list_paginated + fetch
+# - bulk_fetch() / bulk_delete(): split ids into the index's batch limits and
+#   run the batches concurrently (at most BULK_CONCURRENCY in flight),
+#   returning one result per id
+# Pinecone serverless cannot delete by filter, so filters are always
+# resolved to ids first.
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from services.listing import LIST_CHUNK, list_page, project
+from services.local_index import matches_filter
+
+BULK_FETCH_BATCH_SIZE = int(os.getenv("BULK_FETCH_BATCH_SIZE", "100"))
+BULK_DELETE_BATCH_SIZE = int(os.getenv("BULK_DELETE_BATCH_SIZE", "1000"))  # Pinecone's delete limit
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "8"))
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "100000"))
+
+
+def chunks(items: Sequence[str], size: int) -> List[List[str]]:
+    return [list(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def dedupe(ids: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys(ids))
+
+
+def ids_matching(index, filter: Dict[str, Any], known_metadata: Optional[Dict[str, dict]] = None,
+                 namespace: str = "") -> List[str]:
+    """
+    Ids whose metadata matches filter. known_metadata (id -> metadata for the
+    whole namespace) skips the index scan; blocking, run it off the event loop.
+    """
+    if known_metadata:
+        return sorted(vid for vid, metadata in known_metadata.items() if matches_filter(metadata, filter))
+
+    matched, cursor = [], None
+    while True:
+        ids, cursor = list_page(index, LIST_CHUNK * 10, cursor, namespace)
+        for batch in chunks(ids, BULK_FETCH_BATCH_SIZE):
+            vectors = index.fetch(ids=batch, namespace=namespace).vectors
+            matched.extend(vid for vid in batch if vid in vectors and matches_filter(vectors[vid].metadata, filter))
+        if not cursor:
+            return matched
+
+
+async def _run_batches(run, fn, batches):
+    """fn(batch) for every batch via run(), BULK_CONCURRENCY at a time; returns (batch, result|exception) pairs."""
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def one(batch):
+        async with semaphore:
+            try:
+                return batch, await run(fn, batch)
+            except Exception as e:
+                return batch, e
+
+    return await asyncio.gather(*(one(batch) for batch in batches))
+
+
+async def bulk_fetch(run, index, ids: Sequence[str], fields: Sequence[str], namespace: str = "") -> List[Dict[str, Any]]:
+    """[{"id", "found", "term"}] in request order; "error" instead of "term" for ids whose batch failed."""
+    ids = dedupe(ids)
+    outcomes = await _run_batches(
+        run, lambda batch: index.fetch(ids=batch, namespace=namespace).vectors, chunks(ids, BULK_FETCH_BATCH_SIZE)
+    )
+    by_id = {}
+    for batch, outcome in outcomes:
+        for vid in batch:
+            if isinstance(outcome, Exception):
+                by_id[vid] = {"id": vid, "found": False, "error": str(outcome)}
+            elif vid in outcome:
+                by_id[vid] = {"id": vid, "found": True, "term": project(vid, outcome[vid].metadata, fields)}
+            else:
+                by_id[vid] = {"id": vid, "found": False}
+    return [by_id[vid] for vid in ids]
+
+
+async def bulk_delete(run, index, ids: Sequence[str], namespace: str = "") -> List[Dict[str, Any]]:
+    """
+    [{"id", "status"}] in request order, status "deleted" or "error" (with the
+    batch's error). Missing ids count as deleted: Pinecone deletes are no-ops
+    for them, and checking first would cost a fetch per batch.
+    """
+    ids = dedupe(ids)
+    outcomes = await _run_batches(
+        run, lambda batch: index.delete(ids=batch, namespace=namespace), chunks(ids, BULK_DELETE_BATCH_SIZE)
+    )
+    by_id = {}
+    for batch, outcome in outcomes:
+        for vid in batch:
+            if isinstance(outcome, Exception):
+                by_id[vid] = {"id": vid, "status": "error", "error": str(outcome)}
+            else:
+                by_id[vid] = {"id": vid, "status": "deleted"}
+    return [by_id[vid] for vid in ids]
@@ -0,0 +1,268 @@
+# clients.py
+#
+# One factory for the network clients every module shares, so they all reuse
+# the same keep-alive connection pools instead of each building its own.
+# - OpenAI: one httpx.Client with bounded keep-alive pool and timeouts; the
+#   SDK's own retries (jittered exponential backoff on 408/409/429/5xx)
+# - Pinecone: pool_threads sized from the env, index handles wrapped so every
+#   call is timed and retried with jittered backoff on 429/5xx
+# client_stats counts calls, retries, errors, latency and new connections per
+# service; /api/clients/stats exposes it.
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "32"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "16"))
+PINECONE_TIMEOUT = float(os.getenv("PINECONE_TIMEOUT", "30"))
+PINECONE_MAX_RETRIES = int(os.getenv("PINECONE_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ClientStats:
+    """Thread-safe per-service counters plus a window of recent call latencies."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._services: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _service(self, service: str) -> Dict[str, Any]:
+        entry = self._services.get(service)
+        if entry is None:
+            entry = self._services[service] = {
+                "calls": 0, "errors": 0, "retries": 0, "connections_opened": 0,
+                "latencies": deque(maxlen=self.window),
+            }
+        return entry
+
+    def record_call(self, service: str, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            entry = self._service(service)
+            entry["calls"] += 1
+            entry["latencies"].append(seconds)
+            if not ok:
+                entry["errors"] += 1
+
+    def record_retry(self, service: str) -> None:
+        with self._lock:
+            self._service(service)["retries"] += 1
+
+    def record_connection(self, service: str) -> None:
+        with self._lock:
+            self._service(service)["connections_opened"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for service, entry in self._services.items():
+                latencies = sorted(entry["latencies"])
+                pick = lambda pct: round(latencies[int((len(latencies) - 1) * pct)] * 1000, 1) if latencies else None
+                calls, opened = entry["calls"], entry["connections_opened"]
+                out[service] = {
+                    "calls": calls,
+                    "errors": entry["errors"],
+                    "retries": entry["retries"],
+                    "connections_opened": opened,
+                    # share of calls served on an already-open keep-alive connection
+                    "connection_reuse": round(max(calls - opened, 0) / calls, 3) if calls else None,
+                    "p50_ms": pick(0.5),
+                    "p95_ms": pick(0.95),
+                    "max_ms": pick(1.0),
+                }
+            return out
+
+
+client_stats = ClientStats()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(max, base * 2**attempt)]."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def error_status(e: Exception):
+    """HTTP status carried by a Pinecone/OpenAI/httpx exception, if any."""
+    status = getattr(e, "status", None) or getattr(e, "status_code", None)
+    response = getattr(e, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(service: str, fn, *args, max_retries: int = PINECONE_MAX_RETRIES, **kwargs):
+    """Run fn, timing every attempt and retrying 429/5xx responses with jittered backoff."""
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            client_stats.record_call(service, time.perf_counter() - start, ok=False)
+            if attempt >= max_retries or error_status(e) not in RETRY_STATUSES:
+                raise
+            client_stats.record_retry(service)
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        client_stats.record_call(service, time.perf_counter() - start)
+        return result
+
+
+# -- OpenAI
+
+_http_client = None
+_http_lock = threading.Lock()
+
+
+def _trace_openai(event_name: str, info) -> None:
+    # httpcore emits connect_tcp only when the pool has no idle connection to reuse
+    if event_name == "connection.connect_tcp.complete":
+        client_stats.record_connection("openai")
+
+
+def _on_request(request) -> None:
+    request.extensions["trace"] = _trace_openai
+    request.extensions["started_at"] = time.perf_counter()
+    # the SDK numbers its attempts in this header, so a retry is counted only once it is sent
+    if request.headers.get("x-stainless-retry-count", "0") not in ("", "0"):
+        client_stats.record_retry("openai")
+
+
+def _on_response(response) -> None:
+    started_at = response.request.extensions.get("started_at")
+    if started_at is not None:
+        client_stats.record_call("openai", time.perf_counter() - started_at, ok=response.status_code < 400)
+
+
+def shared_http_client():
+    """The process-wide pooled httpx.Client used by every OpenAI client."""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            import httpx
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                event_hooks={"request": [_on_request], "response": [_on_response]},
+            )
+        return _http_client
+
+
+def make_openai_client(api_key: str):
+    from openai import OpenAI
+    return OpenAI(
+        api_key=api_key,
+        http_client=shared_http_client(),
+        max_retries=OPENAI_MAX_RETRIES,
+        timeout=HTTP_TIMEOUT,
+    )
+
+
+# -- Pinecone
+
+def make_pinecone_client(api_key: str):
+    from pinecone import Pinecone
+    return Pinecone(api_key=api_key, pool_threads=PINECONE_POOL_THREADS)
+
+
+def _count_connections(index, service: str = "pinecone") -> None:
+    """
+    Swap the HTTPS pool class of the index handle's urllib3 PoolManager for
+    one that records every new connection. Pools are created on the first
+    request, so this must run before the handle is used; handles without a
+    reachable pool manager are left alone (connections_opened stays 0).
+    """
+    api = getattr(index, "_vector_api", None)
+    rest = getattr(getattr(api, "api_client", None), "rest_client", None)
+    manager = getattr(rest, "pool_manager", None)
+    if manager is None or not hasattr(manager, "pool_classes_by_scheme"):
+        return
+    from urllib3 import HTTPSConnectionPool
+
+    class CountingPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            client_stats.record_connection(service)
+            return super()._new_conn()
+
+    manager.pool_classes_by_scheme = dict(manager.pool_classes_by_scheme, https=CountingPool)
+
+
+class InstrumentedIndex:
+    """
+    Wraps a Pinecone index handle: data-plane calls get a request timeout, are
+    timed into client_stats and retried on 429/5xx. Everything else passes through.
+    """
+
+    WRAPPED = ("query", "fetch", "upsert", "delete", "list", "list_paginated", "describe_index_stats", "update")
+
+    def __init__(self, index, service: str = "pinecone"):
+        self._index = index
+        self._service = service
+
+    def __getattr__(self, name):
+        attr = getattr(self._index, name)
+        if name not in self.WRAPPED:
+            return attr
+        if name == "list":
+            # a generator: retry each page fetch rather than the whole iteration
+            return lambda **kwargs: self._list(**kwargs)
+
+        if name == "upsert":
+            return lambda *args, **kwargs: self._upsert(attr, *args, **kwargs)
+
+        def call(*args, **kwargs):
+            kwargs.setdefault("_request_timeout", PINECONE_TIMEOUT)
+            return call_with_retry(self._service, attr, *args, **kwargs)
+        return call
+
+    def _upsert(self, upsert, vectors, **kwargs):
+        # ingest hands over float32 ndarray rows; the Pinecone client wants lists
+        vectors = [
+            dict(v, values=v["values"].tolist()) if isinstance(v, dict) and hasattr(v["values"], "tolist") else v
+            for v in vectors
+        ]
+        kwargs.setdefault("_request_timeout", PINECONE_TIMEOUT)
+        return call_with_retry(self._service, upsert, vectors=vectors, **kwargs)
+
+    def _list(self, **kwargs):
+        token = kwargs.pop("pagination_token", None)
+        while True:
+            page = self.list_paginated(pagination_token=token, **kwargs)
+            ids = [v.id for v in page.vectors]
+            if ids:
+                yield ids
+            token = page.pagination.next if page.pagination else None
+            if not token:
+                return
+
+
+def open_pinecone_index(pc, index_name: str):
+    index = pc.Index(index_name, pool_threads=PINECONE_POOL_THREADS)
+    _count_connections(index)
+    return InstrumentedIndex(index)
@@ -0,0 +1,58 @@
+# embedding_backends.py
+#
+# Selectable CPU inference backend for the SentenceTransformer embedding model.
+#   EMBEDDING_BACKEND=torch      fp32 PyTorch (default, what main.py always used)
+#   EMBEDDING_BACKEND=onnx       ONNX Runtime, fp32
+#   EMBEDDING_BACKEND=onnx-int8  ONNX Runtime with int8 dynamic quantization;
+#                                exported once under ONNX_EXPORT_DIR and reused
+# Every backend returns a SentenceTransformer, so callers keep using
+# model.encode(). EMBEDDING_MODEL_NAME picks the model; a small one such as
+# BAAI/bge-small-en-v1.5 (384 dims) needs EMBEDDING_DIMENSION and an index of
+# that dimension. benchmarks/bench_embedding_backends.py checks parity and speed.
+
+import os
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", "onnx_models")
+# avx2 / avx512 / avx512_vnni / arm64: the int8 kernels to quantize for
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx2")
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _export_dir(model_name: str) -> str:
+    return os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "__"))
+
+
+def load_embedding_model(model_name: str, backend: str = EMBEDDING_BACKEND, device: str = None):
+    if backend not in BACKENDS:
+        raise ValueError(f"EMBEDDING_BACKEND must be one of {BACKENDS}, got {backend!r}")
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx")
+
+    export_dir, file_name = ensure_int8_export(model_name)
+    return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def ensure_int8_export(model_name: str):
+    """(directory, file name) of the int8 ONNX model, exporting it on first use."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    export_dir = _export_dir(model_name)
+    file_name = f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        # exports the fp32 graph to ONNX on the way, then writes the int8 file next to it
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save(export_dir)
+        export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION, export_dir)
+        print(f"Exported int8 ONNX model for {model_name} to {export_dir}")
+    return export_dir, file_name
+
+
+def cache_key(model_name: str, backend: str = EMBEDDING_BACKEND) -> str:
+    """Name for embedding caches/stores: quantized vectors must not mix with fp32 ones."""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
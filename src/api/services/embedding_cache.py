@@ -0,0 +1,145 @@
+# embedding_cache.py
+#
+# Shared query/text embedding cache keyed by (model name, normalized text):
+# whitespace is collapsed, and case is folded only for models in
+# UNCASED_MODELS, whose tokenizer lower-cases the input anyway.
+# A bounded in-memory LRU sits in front of an optional sqlite file
+# (EMBEDDING_CACHE_PATH) so cached embeddings survive restarts.
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+UNCASED_MODELS = {
+    name.strip() for name in os.getenv(
+        "UNCASED_MODELS", "BAAI/bge-large-en-v1.5,BAAI/bge-base-en-v1.5,BAAI/bge-small-en-v1.5"
+    ).split(",") if name.strip()
+}
+
+
+def normalize_text(text: str, model: str = "") -> str:
+    text = " ".join(str(text).split())
+    # cache keys may carry an "@backend" suffix (services.embedding_backends.cache_key)
+    return text.lower() if model.split("@", 1)[0] in UNCASED_MODELS else text
+
+
+class EmbeddingCache:
+    def __init__(self, maxsize: int = EMBEDDING_CACHE_SIZE, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path or None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                # keys used to be case-folded for every model; rows from then live in the
+                # old "embeddings" table and are not read
+                "CREATE TABLE IF NOT EXISTS text_embeddings ("
+                " model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text))"
+            )
+            self._db.commit()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        key = (model, normalize_text(text, model))
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM text_embeddings WHERE model = ? AND text = ?", key
+                ).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def set_many(self, model: str, texts: List[str], vectors) -> None:
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model, normalize_text(text, model))
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key[0], key[1], vector.tobytes()))
+            if self._db is not None and rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO text_embeddings (model, text, vector) VALUES (?, ?, ?)", rows
+                )
+                self._db.commit()
+
+    def set(self, model: str, text: str, vector) -> None:
+        self.set_many(model, [text], [vector])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM text_embeddings")
+                self._db.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._memory),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "persistent": self._db is not None,
+        }
+
+
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH)
+
+
+def encode_cached(
+    model: str,
+    texts: List[str],
+    encode: Callable[[List[str]], "np.ndarray"],
+    cache: EmbeddingCache = embedding_cache,
+) -> np.ndarray:
+    """
+    Return a (len(texts), dim) float32 matrix, calling encode(list) once for
+    the texts that are not cached yet.
+    """
+    found = [cache.get(model, text) for text in texts]
+    missing = [i for i, vector in enumerate(found) if vector is None]
+
+    if missing:
+        # encode each distinct normalized text once
+        unique = {}
+        for i in missing:
+            unique.setdefault(normalize_text(texts[i], model), texts[i])
+        encoded = np.asarray(encode(list(unique.values())), dtype=np.float32)
+        cache.set_many(model, list(unique.values()), encoded)
+        by_key = dict(zip(unique.keys(), encoded))
+        for i in missing:
+            found[i] = by_key[normalize_text(texts[i], model)]
+
+    return np.vstack(found) if found else np.empty((0, 0), dtype=np.float32)
@@ -0,0 +1,258 @@
+# embedding_store.py
+#
+# Content-addressed store of document embeddings keyed by (model, sha256 of
+# the exact text), so ingest only calls a model for text it has never seen.
+# Each model gets a directory under EMBEDDING_STORE_PATH holding
+#   vectors.bin  append-only float32/float16 matrix, read through np.memmap
+#   keys.txt     one text hash per line; line n is row n of vectors.bin
+#   meta.json    dimension and dtype
+# Both files are only ever appended to, vectors before keys; after a crash
+# mid-write both are cut back to the last whole row on load.
+# Unlike services.embedding_cache (a bounded LRU for queries), nothing is evicted.
+# Disabled (every text is encoded) unless EMBEDDING_STORE_PATH names a
+# directory, e.g. EMBEDDING_STORE_PATH=embedding_store.
+#
+# copy_index() rebuilds one index from another using stored vectors only:
+#     python -m services.embedding_store --to local   # Pinecone -> local backend
+#     python -m services.embedding_store --to local --pipeline llama
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from services.multi_vector import vector_text
+
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", "")
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float32")
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def _dirname(model: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in model)
+
+
+class _ModelStore:
+    def __init__(self, path: str, dtype: str):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.dimension: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._map = None
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dimension, self.dtype = meta["dimension"], np.dtype(meta["dtype"])
+            self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.bin")
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.path, "keys.txt")
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    def _load(self):
+        keys = []
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path) as f:
+                keys = f.read().split()
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        count = min(len(keys), size // self._row_bytes)
+        if count != len(keys) or count * self._row_bytes != size:
+            # an interrupted write left one file ahead of the other: cut both back to the whole rows
+            with open(self._keys_path, "w") as f:
+                f.write("".join(key + "\n" for key in keys[:count]))
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(count * self._row_bytes)
+        self.rows = {key: row for row, key in enumerate(keys[:count])}
+
+    def _matrix(self):
+        if self._map is None or self._map.shape[0] < len(self.rows):
+            self._map = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(len(self.rows), self.dimension))
+        return self._map
+
+    def get(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        if not self.rows:
+            return [None] * len(keys)
+        matrix = self._matrix()
+        return [
+            np.asarray(matrix[self.rows[key]], dtype=np.float32) if key in self.rows else None
+            for key in keys
+        ]
+
+    def put(self, keys: List[str], vectors) -> None:
+        vectors = np.asarray(vectors)
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            with open(os.path.join(self.path, "meta.json"), "w") as f:
+                json.dump({"dimension": self.dimension, "dtype": self.dtype.name}, f)
+        new = {}
+        for key, vector in zip(keys, vectors):
+            if key not in self.rows:
+                new.setdefault(key, vector)
+        if not new:
+            return
+        # vectors first: a key line only ever points at bytes already on disk
+        with open(self._vectors_path, "ab") as f:
+            f.write(np.asarray(list(new.values()), dtype=self.dtype).tobytes())
+        with open(self._keys_path, "a") as f:
+            f.write("".join(key + "\n" for key in new))
+        start = len(self.rows)
+        for row, key in enumerate(new, start):
+            self.rows[key] = row
+
+
+class EmbeddingStore:
+    def __init__(self, path: Optional[str] = EMBEDDING_STORE_PATH, dtype: str = EMBEDDING_STORE_DTYPE):
+        self.path = path or None
+        self.dtype = dtype
+        self.hits = 0
+        self.misses = 0
+        self._models: Dict[str, _ModelStore] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _model(self, model: str) -> _ModelStore:
+        store = self._models.get(model)
+        if store is None:
+            store = self._models[model] = _ModelStore(os.path.join(self.path, _dirname(model)), self.dtype)
+        return store
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            found = self._model(model).get([text_key(t) for t in texts])
+            hits = sum(v is not None for v in found)
+            self.hits += hits
+            self.misses += len(found) - hits
+            return found
+
+    def put_many(self, model: str, texts: List[str], vectors) -> None:
+        with self._lock:
+            self._model(model).put([text_key(t) for t in texts], vectors)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "dtype": self.dtype,
+                "models": {name: len(store.rows) for name, store in self._models.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+embedding_store = EmbeddingStore()
+
+
+def encode_stored(
+    model: str,
+    texts: List[str],
+    encode: Callable[[List[str]], "np.ndarray"],
+    store: EmbeddingStore = embedding_store,
+) -> np.ndarray:
+    """
+    Return a (len(texts), dim) float32 matrix, calling encode(list) only for
+    texts the store has not seen, once per distinct text, and storing the result.
+    """
+    if not store.enabled:
+        return np.asarray(encode(list(texts)), dtype=np.float32)
+
+    found = store.get_many(model, texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, found) if v is None))
+    if missing:
+        encoded = np.asarray(encode(missing), dtype=np.float32)
+        store.put_many(model, missing, encoded)
+        by_text = dict(zip(missing, encoded))
+        found = [v if v is not None else by_text[t] for t, v in zip(texts, found)]
+    return np.vstack(found) if found else np.empty((0, 0), dtype=np.float32)
+
+
+def copy_index(source, target, model: str,
+               text_of: Callable[[str, Dict[str, Any]], Optional[str]] = vector_text,
+               store: EmbeddingStore = embedding_store, namespace: str = "", batch_size: int = 100) -> Dict[str, int]:
+    """
+    Upsert every vector of `source` into `target` with its metadata, taking the
+    values from the store by text_of(id, metadata): the exact text the
+    pipeline that wrote `source` embedded (default: the bge ingest's, children
+    included). Ids whose text can't be rebuilt (no_text) or isn't stored
+    (skipped) are counted, never copied with another text's vector.
+    """
+    copied = skipped = no_text = 0
+    for ids in source.list(namespace=namespace, limit=batch_size):
+        fetched = source.fetch(ids=ids, namespace=namespace).vectors
+        vids, texts, metadatas = [], [], []
+        for vid in ids:
+            if vid not in fetched:
+                continue
+            meta = fetched[vid].metadata or {}
+            text = text_of(vid, meta)
+            if text is None:
+                no_text += 1
+                continue
+            vids.append(vid)
+            texts.append(text)
+            metadatas.append(meta)
+        vectors = store.get_many(model, texts)
+        batch = [
+            {"id": vid, "values": vector.tolist(), "metadata": meta}
+            for vid, vector, meta in zip(vids, vectors, metadatas) if vector is not None
+        ]
+        if batch:
+            target.upsert(vectors=batch, namespace=namespace)
+        copied += len(batch)
+        skipped += len(vids) - len(batch)
+    return {"copied": copied, "skipped": skipped, "no_text": no_text}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.resources import EMBEDDING_CACHE_KEY
+    from services.vector_store import flush_index, get_local_index
+
+    parser = argparse.ArgumentParser(description="Rebuild the local index from Pinecone, or Pinecone from the local index, using stored embeddings only.")
+    parser.add_argument("--to", choices=["local", "pinecone"], required=True)
+    # the ingest pipeline that wrote the source index: decides the model and the embedded text
+    parser.add_argument("--pipeline", choices=["bge", "openai", "llama"], default="bge")
+    parser.add_argument("--model", default=None, help="store model key; defaults to the pipeline's model")
+    args = parser.parse_args()
+    if not embedding_store.enabled:
+        parser.error("EMBEDDING_STORE_PATH is not set; copy_index only uses stored embeddings")
+
+    if args.pipeline == "bge":
+        model, text_of = EMBEDDING_CACHE_KEY, vector_text
+    elif args.pipeline == "openai":
+        from services.upsert_from_csv import EMBEDDING_MODEL as model, embedded_text as text_of
+    else:
+        # imported lazily: this module pulls in LlamaIndex
+        from services.upsert_from_csv_llama import EMBEDDING_MODEL as model, embedded_text as text_of
+
+    from services.clients import make_pinecone_client, open_pinecone_index
+    from services.resources import PINECONE_API_KEY, PINECONE_INDEX_NAME
+
+    # opened directly: resources.pinecone is None when VECTOR_BACKEND=local
+    pinecone_index = open_pinecone_index(make_pinecone_client(PINECONE_API_KEY), PINECONE_INDEX_NAME)
+    local = get_local_index()
+    source, target = (pinecone_index, local) if args.to == "local" else (local, pinecone_index)
+    print(copy_index(source, target, args.model or model, text_of))
+    flush_index(local)
@@ -0,0 +1,312 @@
+# embedding_workers.py
+#
+# Multi-process embedding service: EMBEDDING_WORKERS processes each hold their
+# own copy of the model, so encoding no longer competes with the API process
+# for the GIL.
+# - requests are queued with a priority (INTERACTIVE queries before BULK
+#   ingest) and micro-batched: once a worker is idle, the dispatcher waits up
+#   to EMBEDDING_MAX_WAIT_MS for more texts and sends up to
+#   EMBEDDING_MAX_BATCH of them as one encode call
+# - texts go to a worker over its own queue; the worker writes the vectors
+#   into a shared-memory buffer it owns and only a short "done" message
+#   comes back, so embeddings are never pickled
+# - EmbeddingPool.encode() mirrors SentenceTransformer.encode(), so it can
+#   stand in for the model object anywhere
+
+import heapq
+import importlib
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+EMBEDDING_WORKER_START_TIMEOUT = float(os.getenv("EMBEDDING_WORKER_START_TIMEOUT", "600"))
+
+INTERACTIVE = 0
+BULK = 1
+
+
+def _load_model(model_name: str, factory: Optional[str]):
+    """factory is "module:callable" called with model_name; default the EMBEDDING_BACKEND model on CPU."""
+    if factory:
+        module, attr = factory.split(":")
+        return getattr(importlib.import_module(module), attr)(model_name)
+    from services.embedding_backends import load_embedding_model
+    return load_embedding_model(model_name, device="cpu")
+
+
+def _worker_main(worker_id, model_name, factory, max_batch, threads, jobs, results):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    model = _load_model(model_name, factory)
+    get_dimension = getattr(model, "get_sentence_embedding_dimension", None)
+    dimension = (get_dimension() if get_dimension else None) or len(model.encode(["probe"], convert_to_numpy=True)[0])
+
+    shm = shared_memory.SharedMemory(create=True, size=max_batch * dimension * 4)
+    out = np.ndarray((max_batch, dimension), dtype=np.float32, buffer=shm.buf)
+    results.put(("ready", worker_id, dimension, shm.name))
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            batch_id, texts = job
+            try:
+                out[:len(texts)] = model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+                results.put(("done", worker_id, batch_id, None))
+            except Exception as e:
+                results.put(("done", worker_id, batch_id, repr(e)))
+    finally:
+        del out
+        shm.close()
+        shm.unlink()
+
+
+class _Request:
+    def __init__(self, count: int, dimension: int):
+        self.out = np.empty((count, dimension), dtype=np.float32)
+        self.remaining = 0
+        self.future: Future = Future()
+
+
+class EmbeddingPool:
+    def __init__(
+        self,
+        model_name: str,
+        workers: int = EMBEDDING_WORKERS,
+        max_batch: int = EMBEDDING_MAX_BATCH,
+        max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+        factory: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.texts = 0
+
+        if factory is None:
+            from services.embedding_backends import EMBEDDING_BACKEND, ensure_int8_export
+            if EMBEDDING_BACKEND == "onnx-int8":
+                # export once here rather than racing in every worker
+                ensure_int8_export(model_name)
+
+        ctx = mp.get_context("spawn")
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self._results = ctx.Queue()
+        self._jobs = [ctx.Queue() for _ in range(workers)]
+        self._processes = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, model_name, factory, max_batch, threads, self._jobs[i], self._results),
+                name=f"embedding-worker-{i}",
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._buffers: Dict[int, np.ndarray] = {}
+        self._shms = []
+        deadline = time.monotonic() + EMBEDDING_WORKER_START_TIMEOUT
+        while len(self._buffers) < workers:
+            try:
+                _, worker_id, dimension, shm_name = self._results.get(timeout=1)
+            except queue.Empty:
+                if time.monotonic() > deadline or not all(p.is_alive() for p in self._processes):
+                    for process in self._processes:
+                        process.terminate()
+                    raise RuntimeError("embedding workers failed to start")
+                continue
+            shm = shared_memory.SharedMemory(name=shm_name)
+            self._shms.append(shm)
+            self._buffers[worker_id] = np.ndarray((max_batch, dimension), dtype=np.float32, buffer=shm.buf)
+            self.dimension = dimension
+
+        self._heap = []  # (priority, seq, request, offset, texts)
+        self._queued = 0
+        self._seq = itertools.count()
+        self._batch_ids = itertools.count()
+        self._idle = list(range(workers))
+        self._in_flight: Dict[int, tuple] = {}  # worker -> (batch_id, [(request, offset, start, count)])
+        self._cond = threading.Condition()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-dispatch", daemon=True)
+        self._collector = threading.Thread(target=self._collect, name="embedding-collect", daemon=True)
+        self._dispatcher.start()
+        self._collector.start()
+
+    # -- client side
+
+    def submit(self, texts: List[str], priority: int = BULK) -> Future:
+        """Future of a (len(texts), dimension) float32 matrix."""
+        request = _Request(len(texts), self.dimension)
+        if not texts:
+            request.future.set_result(request.out)
+            return request.future
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("embedding pool is closed")
+            if not self._alive():
+                raise RuntimeError("no embedding worker is alive")
+            for offset in range(0, len(texts), self.max_batch):
+                piece = list(texts[offset:offset + self.max_batch])
+                request.remaining += 1
+                heapq.heappush(self._heap, (priority, next(self._seq), request, offset, piece))
+                self._queued += len(piece)
+            self._cond.notify_all()
+        return request.future
+
+    def encode(self, sentences, batch_size: int = None, convert_to_numpy: bool = True,
+               priority: int = BULK, **kwargs) -> np.ndarray:
+        """SentenceTransformer.encode() lookalike; batch_size is ignored, batching is the pool's job."""
+        single = isinstance(sentences, str)
+        vectors = self.submit([sentences] if single else list(sentences), priority).result()
+        return vectors[0] if single else vectors
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    # -- dispatcher / collector threads
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._closed and not (self._heap and self._idle):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # micro-batch window: give concurrent callers a few ms to fill the batch
+                deadline = time.monotonic() + self.max_wait
+                while not self._closed and self._queued < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+
+                parts, texts = [], []
+                while self._heap and len(texts) < self.max_batch:
+                    priority, seq, request, offset, piece = heapq.heappop(self._heap)
+                    room = self.max_batch - len(texts)
+                    if len(piece) > room:
+                        # send what fits; the rest keeps its place in the queue
+                        heapq.heappush(self._heap, (priority, seq, request, offset + room, piece[room:]))
+                        request.remaining += 1
+                        piece = piece[:room]
+                    parts.append((request, offset, len(texts), len(piece)))
+                    texts.extend(piece)
+                self._queued -= len(texts)
+                worker_id = self._idle.pop()
+                batch_id = next(self._batch_ids)
+                self._in_flight[worker_id] = (batch_id, parts)
+                self.batches += 1
+                self.texts += len(texts)
+            self._jobs[worker_id].put((batch_id, texts))
+
+    def _collect(self):
+        while True:
+            try:
+                message = self._results.get(timeout=1)
+            except queue.Empty:
+                self._reap_dead_workers()
+                continue
+            if message is None:
+                return
+            _, worker_id, batch_id, error = message
+            with self._cond:
+                flight = self._in_flight.pop(worker_id, None)
+            if flight is None:
+                # already failed by _reap_dead_workers
+                continue
+            buffer = self._buffers[worker_id]
+            finished, failed = [], []
+            for request, offset, start, count in flight[1]:
+                if not error:
+                    request.out[offset:offset + count] = buffer[start:start + count]
+            with self._cond:
+                # _dispatch bumps remaining under this lock when it splits a piece
+                for request, *_ in flight[1]:
+                    if error:
+                        failed.append(request)
+                        continue
+                    request.remaining -= 1
+                    if request.remaining == 0:
+                        finished.append(request)
+                self._idle.append(worker_id)
+                self._cond.notify_all()
+            for request in finished:
+                if not request.future.done():
+                    request.future.set_result(request.out)
+            self._fail(failed, f"embedding worker {worker_id}: {error}")
+
+    def _alive(self) -> bool:
+        return any(p.is_alive() for p in self._processes)
+
+    @staticmethod
+    def _fail(requests, message: str) -> None:
+        # futures are only ever resolved on the collector thread, so done() can't race
+        for request in requests:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError(message))
+
+    def _reap_dead_workers(self):
+        failed, stranded = [], []
+        with self._cond:
+            for worker_id, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                flight = self._in_flight.pop(worker_id, None)
+                if flight is not None:
+                    failed.append((worker_id, [request for request, *_ in flight[1]]))
+                if worker_id in self._idle:
+                    self._idle.remove(worker_id)
+            if not self._alive() and self._heap:
+                # nobody is left to take the queue: fail it instead of letting encode() wait forever
+                stranded = [request for _, _, request, _, _ in self._heap]
+                self._heap.clear()
+                self._queued = 0
+        for worker_id, requests in failed:
+            self._fail(requests, f"embedding worker {worker_id} died")
+        self._fail(stranded, "no embedding worker is alive")
+
+    # -- lifecycle
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": len(self._processes),
+                "alive": sum(p.is_alive() for p in self._processes),
+                "idle": len(self._idle),
+                "queued_texts": self._queued,
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+        self._results.put(None)
+        self._buffers.clear()
+        for shm in self._shms:
+            shm.close()
@@ -0,0 +1,106 @@
+# facets.py
+#
+# Structured search filters and facet counts.
+# - build_filter(): turns the search API's {"field": value | [values]}
+#   shorthand (plus an optional raw Pinecone filter) into one Pinecone-style
+#   metadata filter, which search passes to index.query(filter=...) so the
+#   index does the filtering
+# - FacetIndex: value -> ids postings for FACET_FIELDS, kept current by the
+#   lexical index (which mirrors every term's metadata), so facet counts for
+#   any $eq / $in filter come from set intersections, never from the index
+
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Set, Union
+
+from services.local_index import equality_clauses, matches_filter
+
+FACET_FIELDS = tuple(
+    f.strip() for f in os.getenv("FACET_FIELDS", "ParentGlossary,Stewards,TermEntityType,Status").split(",") if f.strip()
+)
+# values per facet in a response, most frequent first
+FACET_LIMIT = int(os.getenv("FACET_LIMIT", "50"))
+
+
+def build_filter(filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+                 filter: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    {"ParentGlossary": ["HR", "Finance"], "Status": "Approved"} ->
+    {"$and": [{"ParentGlossary": {"$in": [...]}}, {"Status": {"$eq": "Approved"}}]},
+    and-ed with `filter` when both are given. Empty value lists are ignored.
+    """
+    clauses = []
+    for field, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            values = [v for v in value if v not in (None, "")]
+            if values:
+                clauses.append({field: {"$in": values}} if len(values) > 1 else {field: {"$eq": values[0]}})
+        elif value not in (None, ""):
+            clauses.append({field: {"$eq": value}})
+    if filter:
+        clauses.append(filter)
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class FacetIndex:
+    def __init__(self, fields: Sequence[str] = FACET_FIELDS):
+        self.fields = tuple(fields)
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[Any, Set[str]]] = {field: defaultdict(set) for field in self.fields}
+        self._values: Dict[str, Dict[str, Any]] = {}  # id -> {field: value}
+
+    def add(self, vector_id: str, metadata: dict) -> None:
+        with self._lock:
+            self.remove(vector_id)
+            values = {}
+            for field in self.fields:
+                value = (metadata or {}).get(field)
+                if value not in (None, "") and not isinstance(value, (list, dict)):
+                    values[field] = value
+                    self._postings[field][value].add(vector_id)
+            self._values[vector_id] = values
+
+    def remove(self, vector_id: str) -> None:
+        with self._lock:
+            for field, value in self._values.pop(vector_id, {}).items():
+                ids = self._postings[field].get(value)
+                if ids is not None:
+                    ids.discard(vector_id)
+                    if not ids:
+                        del self._postings[field][value]
+
+    def matching_ids(self, filter: Optional[dict], metadata: Dict[str, dict]) -> Optional[Set[str]]:
+        """Ids passing the filter; None means every id."""
+        if not filter:
+            return None
+        clauses = equality_clauses(filter)
+        if clauses is None or any(
+            field not in self._postings or values & {None, ""} for field, values in clauses
+        ):
+            return {vid for vid, meta in metadata.items() if matches_filter(meta, filter)}
+        matched = None
+        for field, values in clauses:
+            ids = set().union(*(self._postings[field].get(v, ()) for v in values))
+            matched = ids if matched is None else matched & ids
+        return matched
+
+    def counts(self, filter: Optional[dict] = None, metadata: Optional[Dict[str, dict]] = None,
+               limit: int = FACET_LIMIT) -> Dict[str, Dict[str, int]]:
+        """
+        {field: {value: terms}} over the terms matching `filter`; metadata
+        (id -> metadata) is only read for filters the postings can't answer.
+        """
+        with self._lock:
+            matched = self.matching_ids(filter, metadata or {})
+            facets = {}
+            for field in self.fields:
+                counts = {
+                    value: len(ids) if matched is None else len(ids & matched)
+                    for value, ids in self._postings[field].items()
+                }
+                ranked = sorted(((v, c) for v, c in counts.items() if c), key=lambda item: (-item[1], str(item[0])))
+                facets[field] = dict(ranked[:limit])
+            return facets
@@ -1,25 +1,15 @@
 # fetch_data.py
 
 from fastapi import FastAPI, HTTPException
-from pinecone import Pinecone
-from dotenv import load_dotenv
-import os
 from contextlib import asynccontextmanager
-
-# Load .env variables
-load_dotenv()
-
-# Initialize Pinecone
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-index_name = os.getenv("PINECONE_INDEX_NAME")
-index = pc.Index(index_name)
+from services.resources import PINECONE_INDEX_NAME as index_name, resources
 
 # Lifespan for startup and shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print(f"Starting FastAPI app, connected to Pinecone index: {index_name}")
     try:
-        stats = index.describe_index_stats()
+        stats = resources.index.describe_index_stats()
         print(f"Index stats (check namespaces and vector count): {stats}")
         yield
     except Exception as e:
@@ -32,15 +22,16 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 
-def get_all_vectors(limit=100, namespace="default"):
+def get_all_vectors(limit=100, namespace="default", max_items=100):
+    """The first max_items terms in the namespace, `limit` ids per list page; max_items=None returns every term."""
     all_data = []
     try:
         print(f"Fetching from index: {index_name}, namespace: {namespace}, limit per page: {limit}")
-        for page in index.list(limit=limit, namespace=namespace):
+        for page in resources.index.list(limit=limit, namespace=namespace):
             ids = page
             print(f"Page retrieved {len(ids)} IDs: {ids[:5]}...")
             if ids:
-                fetch_resp = index.fetch(ids=ids, namespace=namespace)
+                fetch_resp = resources.index.fetch(ids=ids, namespace=namespace)
                 print(f"Fetched {len(fetch_resp.vectors)} vectors")
                 for vid, vec in fetch_resp.vectors.items():
                     metadata = vec.metadata if vec.metadata else {}
@@ -59,7 +50,7 @@ def get_all_vectors(limit=100, namespace="default"):
                         "term_entity_type": metadata.get("TermEntityType", ""),
                         "text": metadata.get("text", "")
                     })
-                    if len(all_data) == 100:
+                    if max_items is not None and len(all_data) >= max_items:
                         return all_data
         print(f"Total items retrieved: {len(all_data)}")
         if len(all_data) == 0:
@@ -73,7 +64,7 @@ def get_vector_by_id(vector_id: str, namespace="default"):
     all_data = []
     try:
         print(f"Fetching vector ID: {vector_id} from index: {index_name}, namespace: {namespace}")
-        fetch_resp = index.fetch(ids=[vector_id], namespace=namespace)
+        fetch_resp = resources.index.fetch(ids=[vector_id], namespace=namespace)
         print(f"Fetched {len(fetch_resp.vectors)} vectors")
         for vid, vec in fetch_resp.vectors.items():
             metadata = vec.metadata if vec.metadata else {}
@@ -104,13 +95,13 @@ def delete_vector_by_id(vector_id: str, namespace="default"):
     try:
         print(f"Deleting vector ID: {vector_id} from index: {index_name}, namespace: {namespace}")
         # Check if the vector exists
-        fetch_resp = index.fetch(ids=[vector_id], namespace=namespace)
+        fetch_resp = resources.index.fetch(ids=[vector_id], namespace=namespace)
         if not fetch_resp.vectors:
             print(f"Vector ID {vector_id} not found in namespace {namespace}")
             raise HTTPException(status_code=404, detail=f"Vector with ID {vector_id} not found")
         
         # Delete the vector
-        index.delete(ids=[vector_id], namespace=namespace)
+        resources.index.delete(ids=[vector_id], namespace=namespace)
         print(f"Successfully deleted vector ID: {vector_id}")
         return {"status": "success", "message": f"Vector with ID {vector_id} deleted"}
     except Exception as e: 
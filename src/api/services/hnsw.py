@@ -0,0 +1,153 @@
+# hnsw.py
+#
+# Minimal HNSW (hierarchical navigable small world) graph used by the local
+# vector index for large glossaries. The graph only stores row numbers; the
+# vectors live in the caller's matrix and are passed in on every call, with
+# rows already normalized so similarity is a plain dot product.
+
+import heapq
+import json
+import math
+import os
+import random
+
+import numpy as np
+
+
+class HNSWGraph:
+    def __init__(self, M: int = 16, ef_construction: int = 100, ef_search: int = 64, seed: int = 0):
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.ml = 1 / math.log(M)
+        self.rng = random.Random(seed)
+        self.levels = []     # row -> top level of that node
+        self.layers = [{}]   # level -> {row: [neighbor rows]}
+        self.layer0 = None   # memory-mapped (rows x M0) neighbor matrix after load()
+        self.entry = None
+        self.max_level = -1
+
+    def __len__(self):
+        return len(self.levels)
+
+    def _neighbors(self, level: int, node: int):
+        if level == 0 and self.layer0 is not None and node < len(self.layer0):
+            row = self.layer0[node]
+            return row[row >= 0].tolist()
+        return self.layers[level].get(node, [])
+
+    def _thaw(self):
+        """Move a loaded, memory-mapped layer 0 back into lists before mutating it."""
+        if self.layer0 is None:
+            return
+        layer = self.layers[0]
+        for node in range(len(self.layer0)):
+            if node not in layer:
+                row = self.layer0[node]
+                layer[node] = row[row >= 0].tolist()
+        self.layer0 = None
+
+    def _search_layer(self, q, entry_points, ef: int, level: int, vectors):
+        visited = set(entry_points)
+        sims = vectors[entry_points] @ q
+        candidates = [(-float(s), n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        results = [(float(s), n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_sim < results[0][0]:
+                break
+            fresh = [n for n in self._neighbors(level, node) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for s, n in zip(vectors[fresh] @ q, fresh):
+                s = float(s)
+                if len(results) < ef or s > results[0][0]:
+                    heapq.heappush(candidates, (-s, n))
+                    heapq.heappush(results, (s, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return results
+
+    def _descend(self, q, level_floor: int, vectors):
+        ep = [self.entry]
+        for level in range(self.max_level, level_floor, -1):
+            ep = [max(self._search_layer(q, ep, 1, level, vectors))[1]]
+        return ep
+
+    def add(self, node: int, vectors) -> None:
+        """Insert row `node`; rows must be added in order 0, 1, 2, ..."""
+        self._thaw()
+        level = int(-math.log(1.0 - self.rng.random()) * self.ml)
+        self.levels.append(level)
+        while len(self.layers) <= level:
+            self.layers.append({})
+        for lvl in range(level + 1):
+            self.layers[lvl][node] = []
+
+        if self.entry is None:
+            self.entry, self.max_level = node, level
+            return
+
+        q = vectors[node]
+        ep = self._descend(q, level, vectors)
+        for lvl in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(q, ep, self.ef_construction, lvl, vectors)
+            neighbors = [n for _, n in heapq.nlargest(self.M, found)]
+            self.layers[lvl][node] = neighbors
+            max_links = self.M0 if lvl == 0 else self.M
+            for n in neighbors:
+                links = self.layers[lvl][n]
+                links.append(node)
+                if len(links) > max_links:
+                    sims = vectors[links] @ vectors[n]
+                    keep = np.argsort(-sims)[:max_links]
+                    self.layers[lvl][n] = [links[i] for i in keep]
+            ep = [n for _, n in found]
+
+        if level > self.max_level:
+            self.entry, self.max_level = node, level
+
+    def search(self, q, k: int, vectors, ef: int = None):
+        """Return up to max(ef, k) (similarity, row) pairs, best first."""
+        if self.entry is None:
+            return []
+        ef = max(ef or self.ef_search, k)
+        ep = self._descend(q, 0, vectors)
+        return sorted(self._search_layer(q, ep, ef, 0, vectors), reverse=True)
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        n = len(self.levels)
+        layer0 = np.full((n, self.M0), -1, dtype=np.int32)
+        for node in range(n):
+            links = self._neighbors(0, node)[: self.M0]
+            layer0[node, : len(links)] = links
+        np.save(os.path.join(path, "hnsw_layer0.npy"), layer0)
+        upper = [{str(k): v for k, v in layer.items()} for layer in self.layers[1:]]
+        with open(os.path.join(path, "hnsw.json"), "w") as f:
+            json.dump({
+                "M": self.M, "ef_construction": self.ef_construction, "ef_search": self.ef_search,
+                "levels": self.levels, "upper": upper, "entry": self.entry, "max_level": self.max_level,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str):
+        meta_path = os.path.join(path, "hnsw.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        graph = cls(meta["M"], meta["ef_construction"], meta["ef_search"])
+        graph.levels = meta["levels"]
+        graph.layers = [{}] + [{int(k): v for k, v in layer.items()} for layer in meta["upper"]]
+        graph.entry = meta["entry"]
+        graph.max_level = meta["max_level"]
+        graph.layer0 = np.load(os.path.join(path, "hnsw_layer0.npy"), mmap_mode="r")
+        return graph
@@ -0,0 +1,311 @@
+# ingest.py
+
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Sequence, Set
+from uuid import UUID, uuid5
+
+import numpy as np
+import pandas as pd
+
+from services.embedding_store import encode_stored
+from services.multi_vector import MULTI_VECTOR_ENABLED, child_ids, expand_terms, mode_tag, with_children
+from services.telemetry import span
+
+# Rows encoded per forward pass / vectors sent per Pinecone upsert request
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+# Rows pulled from the uploaded CSV per read in streaming mode
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "2000"))
+# Ids per fetch when looking up the stored content hashes of a chunk
+HASH_FETCH_BATCH_SIZE = int(os.getenv("HASH_FETCH_BATCH_SIZE", "100"))
+
+# uuid5 namespace for term ids; changing it re-keys every term
+TERM_ID_NAMESPACE = UUID("6f1c2a8e-3b7d-5e2a-9c41-8d0e5b7a2f13")
+
+
+def read_csv_chunks(fileobj, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV file object lazily in frames of chunk_rows rows.
+    The first chunk is read eagerly so a missing Name column fails before
+    any work is done.
+    """
+    reader = pd.read_csv(fileobj, chunksize=chunk_rows)
+    first = next(reader, None)
+    if first is None:
+        return iter(())
+    if "Name" not in first.columns:
+        raise ValueError("CSV must contain a 'Name' column.")
+    return itertools.chain([first], reader)
+
+
+def prepare_frame(df: pd.DataFrame, source: str):
+    """
+    Build the (names, metadata) pair for a CSV frame column-wise.
+    Produces the same values the old iterrows() loop did: every column is
+    str()'d and stripped, and rows with an empty Name are dropped.
+    """
+    cleaned = df.astype(str).apply(lambda col: col.str.strip())
+    cleaned = cleaned[cleaned["Name"] != ""]
+    cleaned = cleaned.assign(source=source)
+
+    names = cleaned["Name"].tolist()
+    metadata = cleaned.to_dict(orient="records")
+    return names, metadata
+
+
+def _field(metadata: Dict[str, Any], key: str) -> str:
+    value = str(metadata.get(key, "") or "").strip()
+    return "" if value.lower() == "nan" else value
+
+
+def term_id(metadata: Dict[str, Any]) -> str:
+    """
+    Deterministic id for a glossary row: from its Key when it has one, else
+    from Name + ParentGlossary (case-insensitive), so re-uploads overwrite
+    instead of duplicating.
+    """
+    key = _field(metadata, "Key")
+    if key:
+        return str(uuid5(TERM_ID_NAMESPACE, f"key:{key}"))
+    name, parent = _field(metadata, "Name").lower(), _field(metadata, "ParentGlossary").lower()
+    return str(uuid5(TERM_ID_NAMESPACE, f"name:{name}\x1f{parent}"))
+
+
+def content_hash(metadata: Dict[str, Any]) -> str:
+    """
+    Hash of every metadata field except source and content_hash itself, so
+    the same row uploaded under another filename is still unchanged.
+    """
+    payload = json.dumps(
+        {k: v for k, v in metadata.items() if k not in ("content_hash", "source")}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def stamp(metadata: List[Dict[str, Any]]) -> List[str]:
+    """Add content_hash to each metadata dict in place; returns their term ids."""
+    for meta in metadata:
+        meta["content_hash"] = content_hash(meta)
+    return [term_id(meta) for meta in metadata]
+
+
+def stored_vectors(index, ids: List[str], namespace: str = "") -> Dict[str, Any]:
+    """id -> fetched vector for the ids already in the index."""
+    found = {}
+    for i in range(0, len(ids), HASH_FETCH_BATCH_SIZE):
+        found.update(index.fetch(ids=ids[i:i + HASH_FETCH_BATCH_SIZE], namespace=namespace).vectors)
+    return found
+
+
+def stored_metadata(index, ids: List[str], namespace: str = "") -> Dict[str, dict]:
+    """id -> metadata for the ids already in the index."""
+    return {vid: vec.metadata or {} for vid, vec in stored_vectors(index, ids, namespace).items()}
+
+
+def changed_rows(index, ids: List[str], metadata: List[Dict[str, Any]], namespace: str = "",
+                 fields: Sequence[str] = ()) -> List[int]:
+    """
+    Positions of the rows whose id is new or whose stored content_hash
+    differs; `fields` names metadata outside the hash (e.g. source) that
+    must match as well.
+    """
+    stored = stored_metadata(index, list(dict.fromkeys(ids)), namespace)
+    return [
+        i for i, (vid, meta) in enumerate(zip(ids, metadata))
+        if vid not in stored or any(stored[vid].get(k) != meta.get(k) for k in ("content_hash",) + tuple(fields))
+    ]
+
+
+def relabeled_vectors(index, ids: List[str], source: str, namespace: str = "") -> List[Dict[str, Any]]:
+    """
+    Upsert payload that moves the unchanged terms among ids which are stored
+    under another source (and their multi-vector children) to `source`,
+    reusing their stored values instead of re-embedding them.
+    """
+    moved = {
+        vid: vec for vid, vec in stored_vectors(index, list(dict.fromkeys(ids)), namespace).items()
+        if (vec.metadata or {}).get("source") != source
+    }
+    moved.update(stored_vectors(index, [c for vec in list(moved.values()) for c in child_ids(vec.metadata)], namespace))
+    return [
+        {"id": vid, "values": np.asarray(vec.values, dtype=np.float32), "metadata": dict(vec.metadata or {}, source=source)}
+        for vid, vec in moved.items()
+    ]
+
+
+def delete_missing(index, source: str, seen_ids: Set[str], known_metadata: Optional[Dict[str, dict]] = None,
+                   namespace: str = "") -> List[str]:
+    """Delete the vectors from `source` that the latest upload of it no longer contains; returns their ids."""
+    from services.bulk import BULK_DELETE_BATCH_SIZE, ids_matching
+
+    stale = [vid for vid in ids_matching(index, {"source": source}, known_metadata, namespace) if vid not in seen_ids]
+    if known_metadata:
+        # a snapshot only lists terms; their multi-vector children go with them
+        stale = [vid for vid in with_children(stale, known_metadata) if vid not in seen_ids]
+    for i in range(0, len(stale), BULK_DELETE_BATCH_SIZE):
+        index.delete(ids=stale[i:i + BULK_DELETE_BATCH_SIZE], namespace=namespace)
+    return stale
+
+
+def build_vectors(embeddings, metadata: List[Dict[str, Any]], ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Values stay rows of one contiguous float32 array: the local index copies
+    them straight in, and only the Pinecone client turns them into lists.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    return [
+        {"id": vid, "values": vector, "metadata": meta}
+        for vid, vector, meta in zip(ids, embeddings, metadata)
+    ]
+
+
+def upsert_vectors(index, vectors: List[Dict[str, Any]], batch_size: int = UPSERT_BATCH_SIZE, on_upsert=None):
+    if not vectors:
+        return
+    for i in range(0, len(vectors), batch_size):
+        with span("upsert"):
+            index.upsert(vectors=vectors[i:i + batch_size])
+    if on_upsert:
+        on_upsert(vectors)
+
+
+def iter_chunks(frames: Iterable[pd.DataFrame], source: str, batch_size: int):
+    """Re-slice any sequence of frames into (names, metadata) chunks of batch_size rows."""
+    for df in frames:
+        names, metadata = prepare_frame(df, source)
+        for i in range(0, len(names), batch_size):
+            yield names[i:i + batch_size], metadata[i:i + batch_size]
+
+
+def ingest_frames(
+    frames: Iterable[pd.DataFrame],
+    source: str,
+    encode: Callable[[List[str]], Any],
+    index,
+    batch_size: int = EMBED_BATCH_SIZE,
+    upsert_batch_size: int = UPSERT_BATCH_SIZE,
+    on_upsert: Callable[[List[Dict[str, Any]]], None] = None,
+    delta: bool = True,
+    prune: bool = False,
+    on_delete: Callable[[List[str]], None] = None,
+    metadata_snapshot: Callable[[], Dict[str, dict]] = None,
+    multi_vector: bool = MULTI_VECTOR_ENABLED,
+) -> Iterator[Dict[str, int]]:
+    """
+    Encode and upsert frames chunk by chunk under deterministic term ids.
+    Encoding of chunk N+1 runs on the calling thread while chunk N is being
+    upserted on a single background thread, so at most two chunks of vectors
+    are alive at any time. Yields a progress dict after every upserted chunk;
+    on_upsert(vectors), if given, sees each chunk once it is in the index.
+
+    With delta, rows whose stored content_hash is unchanged are not
+    re-embedded; those stored under another source are re-upserted with their
+    stored values and the new source, the rest are skipped. With prune, vectors from `source` that the
+    frames no longer contain are deleted at the end (on_delete(ids) sees
+    them); metadata_snapshot() can supply id -> metadata to avoid scanning
+    the index for them.
+
+    With multi_vector, each row becomes its Name vector plus the child
+    vectors of services.multi_vector, all encoded in the chunk's one encode
+    call; children an updated row no longer has are deleted.
+    """
+    rows_done = rows_unchanged = vectors_done = 0
+    seen: Set[str] = set()
+
+    def progress():
+        # rows_processed counts every row handled, upserted or skipped as unchanged
+        return {
+            "rows_processed": rows_done + rows_unchanged,
+            "rows_upserted": rows_done,
+            "rows_unchanged": rows_unchanged,
+            "vectors_upserted": vectors_done,
+        }
+
+    def write(vectors, stale_children):
+        upsert_vectors(index, vectors, upsert_batch_size, on_upsert)
+        if stale_children:
+            index.delete(ids=stale_children)
+            if on_delete:
+                on_delete(stale_children)
+
+    with ThreadPoolExecutor(max_workers=1) as upserter:
+        pending = None
+        pending_rows = pending_vectors = 0
+
+        for names, metadata in iter_chunks(frames, source, batch_size):
+            if multi_vector:
+                for meta in metadata:
+                    meta["vector_mode"] = mode_tag()
+            ids = stamp(metadata)
+            stored = stored_metadata(index, list(dict.fromkeys(ids))) if delta or multi_vector else {}
+            if multi_vector:
+                texts, vector_ids, vector_metadata = expand_terms(names, metadata, ids)
+            else:
+                texts, vector_ids, vector_metadata = names, ids, metadata
+            seen.update(vector_ids)
+
+            relabeled = []
+            if delta:
+                keep = {
+                    vid for vid, meta in zip(ids, metadata)
+                    if stored.get(vid, {}).get("content_hash") != meta["content_hash"]
+                }
+                # rows, not distinct ids: a chunk may repeat a term
+                unchanged = [vid for vid in ids if vid not in keep]
+                rows_unchanged += len(unchanged)
+                moved = [vid for vid in unchanged if stored[vid].get("source") != source]
+                if moved:
+                    relabeled = relabeled_vectors(index, moved, source)
+                if len(keep) < len(ids):
+                    kept = [
+                        i for i, (vid, meta) in enumerate(zip(vector_ids, vector_metadata))
+                        if meta.get("parent_id", vid) in keep
+                    ]
+                    texts = [texts[i] for i in kept]
+                    vector_ids = [vector_ids[i] for i in kept]
+                    vector_metadata = [vector_metadata[i] for i in kept]
+                    ids = [vid for vid in ids if vid in keep]
+            stale_children = []
+            if multi_vector:
+                fresh = set(vector_ids)
+                stale_children = [c for vid in ids for c in child_ids(stored.get(vid)) if c not in fresh]
+            vectors = build_vectors(encode(texts), vector_metadata, vector_ids) if texts else []
+            vectors += relabeled
+
+            if pending is not None:
+                pending.result()
+                rows_done += pending_rows
+                vectors_done += pending_vectors
+                yield progress()
+
+            pending = upserter.submit(write, vectors, stale_children)
+            pending_rows, pending_vectors = len(ids), len(vectors)
+
+        if pending is not None:
+            pending.result()
+            rows_done += pending_rows
+            vectors_done += pending_vectors
+            yield progress()
+
+    if prune:
+        deleted = delete_missing(index, source, seen, metadata_snapshot() if metadata_snapshot else None)
+        if deleted and on_delete:
+            on_delete(deleted)
+        yield dict(progress(), rows_deleted=len(deleted))
+
+
+def sentence_transformer_encoder(model, batch_size: int = EMBED_BATCH_SIZE, model_name: Optional[str] = None):
+    """
+    One model.encode(list) call per chunk instead of one per row. With
+    model_name, texts already in the embedding store are not re-encoded.
+    """
+    def encode(names: List[str]):
+        with span("encode"):
+            return model.encode(names, batch_size=batch_size, convert_to_numpy=True)
+    if model_name is None:
+        return encode
+    return lambda names: encode_stored(model_name, names, encode)
@@ -0,0 +1,139 @@
+# jobs.py
+#
+# Background ingest jobs: uploads are spooled to disk, a job id is returned
+# straight away and a worker pool runs the embed + upsert pipeline.
+
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from uuid import uuid4
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs kept around for GET /api/jobs/{id}
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "100"))
+
+# runner(csv_path, progress) -> message; progress(rows_processed) raises JobCancelled
+Runner = Callable[[str, Callable[[int], None]], str]
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, filename: str, path: str, pipeline: str):
+        self.id = str(uuid4())
+        self.filename = filename
+        self.path = path
+        self.pipeline = pipeline
+        self.status = "queued"
+        self.rows_processed = 0
+        self.message = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    def report(self, rows_processed: int):
+        """Progress callback handed to the runner; also the cancellation point."""
+        self.rows_processed = rows_processed
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "pipeline": self.pipeline,
+            "status": self.status,
+            "rows_processed": self.rows_processed,
+            "rows_per_sec": round(self.rows_processed / elapsed, 2) if elapsed else 0.0,
+            "elapsed_sec": round(elapsed, 3) if elapsed is not None else None,
+            "message": self.message,
+            "error": self.error,
+        }
+
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="ingest-job")
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def spool_upload(fileobj, filename: str) -> str:
+    """Copy an upload to UPLOAD_DIR so the request can return before ingest runs."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{uuid4()}-{os.path.basename(filename or 'upload.csv')}")
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(fileobj, buffer)
+    return path
+
+
+def _run(job: Job, runner: Runner):
+    job.started_at = time.time()
+    try:
+        if job._cancel.is_set():
+            raise JobCancelled()
+        job.status = "running"
+        job.message = runner(job.path, job.report)
+        job.status = "done"
+    except JobCancelled:
+        job.status = "cancelled"
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = time.time()
+        if os.path.exists(job.path):
+            os.remove(job.path)
+
+
+def _trim_history():
+    finished = [j for j in _jobs.values() if j.status in ("done", "failed", "cancelled")]
+    for job in finished[:max(0, len(finished) - JOB_HISTORY)]:
+        _jobs.pop(job.id, None)
+
+
+def submit_job(path: str, filename: str, pipeline: str, runner: Runner) -> Job:
+    job = Job(filename, path, pipeline)
+    with _lock:
+        _trim_history()
+        _jobs[job.id] = job
+    job._future = _executor.submit(_run, job, runner)
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
+
+
+def list_jobs():
+    return list(_jobs.values())
+
+
+def cancel_job(job_id: str) -> Optional[Job]:
+    """
+    Queued jobs are cancelled immediately; running jobs stop at their next
+    progress report, after the chunk in flight has been upserted.
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+    job._cancel.set()
+    if job.status == "queued" and job._future is not None and job._future.cancel():
+        job.status = "cancelled"
+        job.finished_at = time.time()
+        if os.path.exists(job.path):
+            os.remove(job.path)
+    return job
@@ -0,0 +1,274 @@
+# lexical_index.py
+#
+# In-memory inverted index over the glossary's Name / Aliases /
+# Abbreviations / Definition fields, kept next to the vector index.
+# - exact_lookup(): O(1) dictionary hit on a whole Name, alias or abbreviation
+# - search(): BM25 over the field-weighted token counts
+# - facets: services.facets.FacetIndex over the same terms, for facet counts
+# Updated incrementally as vectors are upserted or deleted, and optionally
+# persisted to LEXICAL_INDEX_PATH as JSON; save_later() coalesces the writes
+# of LEXICAL_SAVE_DELAY seconds into one rewrite of the file.
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.facets import FacetIndex
+
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "")
+LEXICAL_SAVE_DELAY = float(os.getenv("LEXICAL_SAVE_DELAY", "30"))
+
+FIELD_WEIGHTS = {"Name": 3.0, "Aliases": 2.0, "Abbreviations": 2.0, "Definition": 1.0}
+# fields whose individual entries are matched as whole phrases by exact_lookup
+EXACT_FIELDS = ("Name", "Aliases", "Abbreviations")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SEPARATORS = re.compile(r"[,;|\n]")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(str(text).lower())
+
+
+def normalize_phrase(text: str) -> str:
+    """Case, spacing and punctuation-insensitive key: '401(k) Plan', '401K plan' -> '401kplan'."""
+    return "".join(tokenize(text))
+
+
+def split_entries(value: str) -> List[str]:
+    """'SSN; Social Sec No' -> ['SSN', 'Social Sec No']"""
+    value = str(value or "").strip()
+    if not value or value.lower() == "nan":
+        return []
+    return [part.strip() for part in _SEPARATORS.split(value) if part.strip()]
+
+
+class LexicalIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        # True once built from or loaded for the whole index, rather than
+        # holding only the writes seen since startup
+        self.complete = False
+        # id -> metadata (None once removed) for writes made while build_from_index runs
+        self._journal: Optional[Dict[str, Optional[dict]]] = None
+        self._builds = 0
+        self._reset()
+
+    def _reset(self):
+        self.metadata: Dict[str, dict] = {}
+        self._lengths: Dict[str, float] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._phrases: Dict[str, List[str]] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._exact: Dict[str, set] = defaultdict(set)
+        self._total_length = 0.0
+        self.facets = FacetIndex()
+
+    def __len__(self):
+        return len(self.metadata)
+
+    # -- updates
+
+    def add(self, vector_id: str, metadata: dict) -> None:
+        with self._lock:
+            self.remove(vector_id)
+            metadata = metadata or {}
+
+            terms = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(metadata.get(field, "")):
+                    terms[token] += weight
+
+            phrases = []
+            for field in EXACT_FIELDS:
+                entries = [metadata.get(field, "")] if field == "Name" else split_entries(metadata.get(field, ""))
+                phrases += [p for p in (normalize_phrase(e) for e in entries) if p]
+
+            self.metadata[vector_id] = metadata
+            self._terms[vector_id] = terms
+            self._phrases[vector_id] = phrases
+            length = sum(terms.values())
+            self._lengths[vector_id] = length
+            self._total_length += length
+            for token, tf in terms.items():
+                self._postings[token][vector_id] = tf
+            for phrase in phrases:
+                self._exact[phrase].add(vector_id)
+            self.facets.add(vector_id, metadata)
+            if self._journal is not None:
+                self._journal[vector_id] = metadata
+
+    def add_many(self, vectors: Iterable[dict]) -> None:
+        """Accepts the upsert payload shape: [{"id", "metadata", ...}]; multi-vector children are skipped."""
+        with self._lock:
+            for vector in vectors:
+                metadata = vector.get("metadata") or {}
+                if not metadata.get("parent_id"):
+                    self.add(vector["id"], metadata)
+
+    def remove(self, vector_id: str) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal[vector_id] = None
+            if vector_id not in self.metadata:
+                return
+            for token in self._terms.pop(vector_id):
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(vector_id, None)
+                    if not postings:
+                        del self._postings[token]
+            for phrase in self._phrases.pop(vector_id):
+                ids = self._exact.get(phrase)
+                if ids is not None:
+                    ids.discard(vector_id)
+                    if not ids:
+                        del self._exact[phrase]
+            self._total_length -= self._lengths.pop(vector_id)
+            self.facets.remove(vector_id)
+            del self.metadata[vector_id]
+
+    def remove_many(self, vector_ids: Iterable[str]) -> None:
+        with self._lock:
+            for vector_id in vector_ids:
+                self.remove(vector_id)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Copy of id -> metadata for every indexed term."""
+        with self._lock:
+            return dict(self.metadata)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    # -- lookups
+
+    def facet_counts(self, filter: Optional[dict] = None) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return self.facets.counts(filter, self.metadata)
+
+    def exact_lookup(self, query: str) -> List[str]:
+        """Ids whose Name, an alias or an abbreviation equals the query under normalize_phrase()."""
+        return sorted(self._exact.get(normalize_phrase(query), ()))
+
+    def search(self, query: str, top_k: int = 20, filter: Optional[dict] = None) -> List[Tuple[str, float]]:
+        """BM25 top_k, only over the terms whose metadata passes `filter` when one is given."""
+        with self._lock:
+            n = len(self.metadata)
+            if not n:
+                return []
+            allowed = self.facets.matching_ids(filter, self.metadata)
+            avg_length = self._total_length / n or 1.0
+            scores = defaultdict(float)
+            for token in set(tokenize(query)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for vector_id, tf in postings.items():
+                    if allowed is not None and vector_id not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[vector_id] / avg_length)
+                    scores[vector_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    # -- building / persistence
+
+    def build_from_index(self, index, namespace: str = "", batch_size: int = 100) -> int:
+        """
+        (Re)build from every vector's metadata via index.list + index.fetch,
+        without holding the lock; adds and removes made meanwhile are journaled
+        and replayed onto the new state before it replaces the current one.
+        """
+        with self._lock:
+            if self._builds == 0:
+                self._journal = {}
+            self._builds += 1
+        try:
+            fresh = LexicalIndex(self.k1, self.b)
+            for ids in index.list(namespace=namespace, limit=batch_size):
+                fetched = index.fetch(ids=ids, namespace=namespace)
+                for vector_id, vector in fetched.vectors.items():
+                    if not (vector.metadata or {}).get("parent_id"):
+                        fresh.add(vector_id, vector.metadata or {})
+            with self._lock:
+                for vector_id, metadata in self._journal.items():
+                    if metadata is None:
+                        fresh.remove(vector_id)
+                    else:
+                        fresh.add(vector_id, metadata)
+                own = ("_lock", "_save_timer", "_journal", "_builds")
+                self.__dict__.update({k: v for k, v in fresh.__dict__.items() if k not in own})
+                self.complete = True
+                return len(self)
+        finally:
+            with self._lock:
+                self._builds -= 1
+                if self._builds == 0:
+                    self._journal = None
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = json.dumps(self.metadata)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> bool:
+        if not path or not os.path.exists(path):
+            return False
+        with open(path) as f:
+            metadata = json.load(f)
+        with self._lock:
+            self.clear()
+            for vector_id, meta in metadata.items():
+                self.add(vector_id, meta)
+            self.complete = True
+        return True
+
+    def save_later(self, path: str, delay: float = LEXICAL_SAVE_DELAY) -> None:
+        """save(path) in `delay` seconds, unless a save is already pending; it writes whatever is indexed by then."""
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(delay, self._save_due, args=(path,))
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_due(self, path: str) -> None:
+        with self._lock:
+            self._save_timer = None
+        self.save(path)
+
+    def save_pending(self, path: str) -> None:
+        """Write a save_later() that has not fired yet now; call at shutdown."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save(path)
+
+    def stats(self):
+        return {"documents": len(self.metadata), "terms": len(self._postings), "phrases": len(self._exact)}
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists; scores are normalized so rank 1 in every list scores 1.0."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, vector_id in enumerate(ranking, start=1):
+            scores[vector_id] += 1.0 / (k + rank)
+    best = len(rankings) / (k + 1)
+    return sorted(((vid, s / best) for vid, s in scores.items()), key=lambda item: item[1], reverse=True)
+
+
+lexical_index = LexicalIndex()
@@ -0,0 +1,111 @@
+# listing.py
+#
+# Cursor-paginated term listing built on index.list_paginated + batched
+# index.fetch, replacing the old zero-vector query (capped by top_k, with
+# meaningless scores).
+# - list_page(): one page of ids plus the cursor for the next one
+# - fetch_terms(): metadata for those ids, FETCH_BATCH_SIZE ids per fetch
+# - iter_pages(): async page iterator that lists and fetches page N+1 while
+#   the caller is still sending page N
+# Responses can be projected down to a subset of TERM_FIELDS. Multi-vector
+# child ids are skipped while a page is filled, so a term appears once.
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from services.multi_vector import is_child_id
+
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+MAX_LIST_PAGE_SIZE = int(os.getenv("MAX_LIST_PAGE_SIZE", "1000"))
+# list_paginated returns at most this many ids per call (Pinecone's own cap)
+LIST_CHUNK = 100
+FETCH_BATCH_SIZE = int(os.getenv("FETCH_BATCH_SIZE", "100"))
+
+# response key -> metadata key, in the shape /api/vectors has always returned
+TERM_FIELDS = {
+    "name": "Name",
+    "definition": "Definition",
+    "aliases": "Aliases",
+    "parentGlossary": "ParentGlossary",
+    "stewards": "Stewards",
+    "termEntityType": "TermEntityType",
+    "source": "source",
+}
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """'name, definition' -> ['name', 'definition']; None/'' means every field. Raises ValueError on unknown names."""
+    if not fields:
+        return list(TERM_FIELDS)
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in TERM_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; choose from {list(TERM_FIELDS)}")
+    return names
+
+
+def project(vector_id: str, metadata: dict, fields: Sequence[str]) -> Dict[str, Any]:
+    term = {"id": vector_id}
+    for field in fields:
+        term[field] = (metadata or {}).get(TERM_FIELDS[field], "")
+    return term
+
+
+def list_page(index, limit: int = LIST_PAGE_SIZE, cursor: Optional[str] = None,
+              namespace: str = "", prefix: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+    """
+    Up to `limit` term ids after `cursor`, and the cursor of the next page
+    (None when done). Child ids don't count towards the page, so it is only
+    short on the last page.
+    """
+    ids: List[str] = []
+    token = cursor
+    while len(ids) < limit:
+        page = index.list_paginated(
+            prefix=prefix, limit=min(LIST_CHUNK, limit - len(ids)), pagination_token=token, namespace=namespace
+        )
+        ids.extend(item.id for item in page.vectors if not is_child_id(item.id))
+        token = page.pagination.next if page.pagination else None
+        if not token:
+            break
+    return ids, token
+
+
+def fetch_terms(index, ids: Sequence[str], fields: Sequence[str], namespace: str = "") -> List[Dict[str, Any]]:
+    """Projected terms for ids, in the order given; ids deleted since they were listed are skipped."""
+    terms = []
+    for i in range(0, len(ids), FETCH_BATCH_SIZE):
+        batch = list(ids[i:i + FETCH_BATCH_SIZE])
+        vectors = index.fetch(ids=batch, namespace=namespace).vectors
+        for vector_id in batch:
+            vec = vectors.get(vector_id)
+            if vec is not None:
+                terms.append(project(vector_id, vec.metadata, fields))
+    return terms
+
+
+def load_page(index, limit: int, cursor: Optional[str], fields: Sequence[str],
+              namespace: str = "", prefix: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    ids, next_cursor = list_page(index, limit, cursor, namespace, prefix)
+    return fetch_terms(index, ids, fields, namespace), next_cursor
+
+
+async def iter_pages(run, index, fields: Sequence[str], limit: int = LIST_PAGE_SIZE, cursor: Optional[str] = None,
+                     namespace: str = "", prefix: Optional[str] = None) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield (terms, next_cursor) for every page from `cursor` on. `run` executes a
+    blocking call off the event loop (executors.run_io); the next page is
+    already loading while the caller consumes the current one.
+    """
+    pending = asyncio.ensure_future(run(load_page, index, limit, cursor, fields, namespace, prefix))
+    try:
+        while pending is not None:
+            terms, next_cursor = await pending
+            pending = None
+            if next_cursor:
+                pending = asyncio.ensure_future(run(load_page, index, limit, next_cursor, fields, namespace, prefix))
+            yield terms, next_cursor
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,745 @@
+# local_index.py
+#
+# In-process vector index with the same call signatures and response shape
+# as a Pinecone index (upsert / query / fetch / delete / list /
+# list_paginated / describe_index_stats), so it can stand in for pc.Index(...)
+# offline, in CI, or as a fast local copy of a glossary.
+#
+# Small namespaces are searched by a single NumPy matrix-vector product;
+# namespaces at or above `hnsw_threshold` vectors use an HNSW graph, built
+# on a background thread while queries keep using the exact scan.
+# With a `path`, each namespace is persisted as .npy files that are
+# memory-mapped on load.
+#
+# With `quantization` (float16 / int8 / binary, see services.quantization)
+# the brute-force scan runs over compact codes kept in RAM and only the best
+# top_k * `rescore` candidates are rescored exactly in float32; after a flush
+# the float32 vectors are served from the memory-mapped file.
+
+import bisect
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from services import quantization as quant
+from services.hnsw import HNSWGraph
+
+# ---------------------------------------------------------------- responses
+
+
+class _Response:
+    """Attribute and item access, like the Pinecone client's response models."""
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        def convert(value):
+            if isinstance(value, _Response):
+                return value.to_dict()
+            if isinstance(value, list):
+                return [convert(v) for v in value]
+            if isinstance(value, dict):
+                return {k: convert(v) for k, v in value.items()}
+            return value
+        return {k: convert(v) for k, v in vars(self).items()}
+
+
+class ScoredVector(_Response):
+    def __init__(self, id: str, score: float, values=None, metadata=None):
+        self.id = id
+        self.score = score
+        self.values = values if values is not None else []
+        self.metadata = metadata
+
+
+class Vector(_Response):
+    def __init__(self, id: str, values, metadata=None):
+        self.id = id
+        self.values = values
+        self.metadata = metadata
+
+
+class QueryResponse(_Response):
+    def __init__(self, matches: List[ScoredVector], namespace: str):
+        self.matches = matches
+        self.namespace = namespace
+
+
+class FetchResponse(_Response):
+    def __init__(self, vectors: Dict[str, Vector], namespace: str):
+        self.vectors = vectors
+        self.namespace = namespace
+
+
+class ListItem(_Response):
+    def __init__(self, id: str):
+        self.id = id
+
+
+class Pagination(_Response):
+    def __init__(self, next: Optional[str]):
+        self.next = next
+
+
+class ListResponse(_Response):
+    def __init__(self, vectors: List[ListItem], pagination: Optional[Pagination], namespace: str):
+        self.vectors = vectors
+        self.pagination = pagination
+        self.namespace = namespace
+
+
+# ---------------------------------------------------------------- filtering
+
+def _compare(value, op: str, operand) -> bool:
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if op == "$exists":
+        return (value is not None) == bool(operand)
+    if value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def matches_filter(metadata: Optional[dict], filter: Optional[dict]) -> bool:
+    """Evaluate a Pinecone metadata filter ($eq, $ne, $in, $nin, $gt(e), $lt(e), $exists, $and, $or)."""
+    if not filter:
+        return True
+    metadata = metadata or {}
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, f) for f in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, f) for f in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def equality_clauses(filter: Optional[dict]) -> Optional[List[tuple]]:
+    """
+    [(field, values)] when the filter is a conjunction of $eq / $in on
+    scalar values (plain values and $and included), i.e. answerable from a
+    value -> ids posting index; None for anything else.
+    """
+    clauses = []
+    for key, condition in (filter or {}).items():
+        if key == "$and":
+            for part in condition:
+                nested = equality_clauses(part)
+                if nested is None:
+                    return None
+                clauses += nested
+        elif key.startswith("$"):
+            return None
+        elif isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$eq" and not isinstance(operand, (list, dict)):
+                    clauses.append((key, {operand}))
+                elif op == "$in" and isinstance(operand, list) and not any(isinstance(v, (list, dict)) for v in operand):
+                    clauses.append((key, set(operand)))
+                else:
+                    return None
+        elif isinstance(condition, list):
+            return None
+        else:
+            clauses.append((key, {condition}))
+    return clauses
+
+
+# ---------------------------------------------------------------- storage
+
+class _Namespace:
+    def __init__(self, dimension: int, scheme: str = "none"):
+        self.ids: List[Optional[str]] = []      # row -> id, None once deleted
+        self.metadata: List[Optional[dict]] = []
+        self.rows: Dict[str, int] = {}          # id -> live row
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.scheme = scheme
+        self.codes: Optional[np.ndarray] = None   # quantized scan copy of vectors
+        self.scales: Optional[np.ndarray] = None  # per-row int8 scales
+        if scheme != "none":
+            width, dtype = quant.code_shape(scheme, dimension)
+            self.codes = np.zeros((0, width), dtype=dtype)
+            if scheme == "int8":
+                self.scales = np.zeros(0, dtype=np.float32)
+        self.live = np.zeros(0, dtype=bool)
+        self.graph: Optional[HNSWGraph] = None
+        self.graph_building = False  # a background build is under way
+        self.sorted_ids: Optional[List[str]] = None  # cached for list(), reset on writes
+        # field -> value -> rows, built on the first filter on that field and
+        # kept current by upserts; deleted rows are masked out by `live`
+        self.postings: Dict[str, Dict[Any, List[int]]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _grow(array: np.ndarray, capacity: int, size: int) -> np.ndarray:
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:size] = array[:size]
+        return grown
+
+    def _ensure_capacity(self, extra: int):
+        needed = self.size + extra
+        if needed <= len(self.vectors) and self.vectors.flags.writeable and (
+            self.codes is None or self.codes.flags.writeable
+        ):
+            return
+        capacity = max(needed, 2 * len(self.vectors), 1024)
+        self.vectors = self._grow(self.vectors, capacity, self.size)
+        self.norms = self._grow(self.norms, capacity, self.size)
+        self.live = self._grow(self.live, capacity, self.size)
+        if self.codes is not None:
+            self.codes = self._grow(self.codes, capacity, self.size)
+        if self.scales is not None:
+            self.scales = self._grow(self.scales, capacity, self.size)
+
+    def field_postings(self, field: str) -> Dict[Any, List[int]]:
+        postings = self.postings.get(field)
+        if postings is None:
+            postings = self.postings[field] = {}
+            for row, metadata in enumerate(self.metadata):
+                if metadata is not None:
+                    self.post(postings, row, metadata.get(field))
+        return postings
+
+    @staticmethod
+    def post(postings: Dict[Any, List[int]], row: int, value):
+        if value is not None and not isinstance(value, (list, dict)):
+            postings.setdefault(value, []).append(row)
+
+    def encode_rows(self, start: int, end: int):
+        if self.codes is None:
+            return
+        codes, scales = quant.encode(self.vectors[start:end], self.scheme)
+        self.codes[start:end] = codes
+        if self.scales is not None:
+            self.scales[start:end] = scales
+
+
+
+class LocalIndex:
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        path: Optional[str] = None,
+        ann: str = "auto",
+        hnsw_threshold: int = 20000,
+        hnsw_m: int = 16,
+        hnsw_ef_search: int = 64,
+        quantization: str = "none",
+        rescore: int = 4,
+    ):
+        if metric not in ("cosine", "dotproduct"):
+            raise ValueError("LocalIndex supports the 'cosine' and 'dotproduct' metrics")
+        if ann not in ("auto", "brute", "hnsw"):
+            raise ValueError("ann must be one of 'auto', 'brute', 'hnsw'")
+        if quantization not in quant.SCHEMES:
+            raise ValueError(f"quantization must be one of {quant.SCHEMES}")
+        self.dimension = dimension
+        self.metric = metric
+        self.path = path
+        self.ann = ann
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.quantization = quantization
+        self.rescore = max(1, rescore)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+        if path:
+            self._load()
+
+    # -- helpers
+
+    def _ns(self, namespace: str, create: bool = False) -> Optional[_Namespace]:
+        ns = self._namespaces.get(namespace or "")
+        if ns is None and create:
+            ns = self._namespaces[namespace or ""] = _Namespace(self.dimension, self.quantization)
+        return ns
+
+    def _prepare(self, values) -> tuple:
+        vector = np.asarray(values, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimension:
+            raise ValueError(f"Vector dimension {vector.shape[0]} does not match index dimension {self.dimension}")
+        norm = float(np.linalg.norm(vector))
+        if self.metric == "cosine" and norm:
+            vector = vector / norm
+        return vector, norm
+
+    def _values(self, ns: _Namespace, row: int) -> List[float]:
+        vector = ns.vectors[row]
+        if self.metric == "cosine":
+            vector = vector * ns.norms[row]
+        return vector.tolist()
+
+    def _use_graph(self, ns: _Namespace) -> bool:
+        if self.ann == "hnsw":
+            return True
+        return self.ann == "auto" and len(ns.rows) >= self.hnsw_threshold
+
+    def _start_graph_build(self, ns: _Namespace):
+        # callers hold self._lock; searches keep the exact scan until the graph is installed
+        if ns.graph is not None or ns.graph_building:
+            return
+        ns.graph_building = True
+        threading.Thread(target=self._build_graph, args=(ns,), name="hnsw-build", daemon=True).start()
+
+    def _build_graph(self, ns: _Namespace):
+        """
+        Build ns.graph without holding the index lock. Rows are only ever
+        appended, so rows below a snapshot of ns.size never change; each pass
+        inserts the rows added since the last one and the graph is installed
+        once it has caught up. A namespace replaced meanwhile (compaction,
+        delete_all) is abandoned.
+        """
+        graph = HNSWGraph(M=self.hnsw_m, ef_search=self.hnsw_ef_search)
+        built = 0
+        try:
+            while True:
+                with self._lock:
+                    if all(current is not ns for current in self._namespaces.values()):
+                        return
+                    vectors, size = ns.vectors, ns.size
+                    if built == size:
+                        ns.graph = graph
+                        return
+                for row in range(built, size):
+                    graph.add(row, vectors)
+                built = size
+        finally:
+            ns.graph_building = False
+
+    def _remove_row(self, ns: _Namespace, row: int):
+        ns.sorted_ids = None
+        ns.rows.pop(ns.ids[row], None)
+        ns.ids[row] = None
+        ns.metadata[row] = None
+        ns.live[row] = False
+
+    # -- Pinecone index API
+
+    def upsert(self, vectors, namespace: str = "", **kwargs) -> Dict[str, int]:
+        with self._lock:
+            ns = self._ns(namespace, create=True)
+            ns._ensure_capacity(len(vectors))
+            first = ns.size
+            for item in vectors:
+                if isinstance(item, dict):
+                    vid, values, metadata = item["id"], item["values"], item.get("metadata")
+                else:
+                    vid, values = item[0], item[1]
+                    metadata = item[2] if len(item) > 2 else None
+                vector, norm = self._prepare(values)
+
+                # updates append a fresh row so the graph never points at a changed vector
+                old = ns.rows.get(vid)
+                if old is not None:
+                    self._remove_row(ns, old)
+
+                row = ns.size
+                ns.vectors[row] = vector
+                ns.norms[row] = norm
+                ns.live[row] = True
+                ns.ids.append(vid)
+                ns.metadata.append(dict(metadata) if metadata else {})
+                ns.rows[vid] = row
+                ns.sorted_ids = None
+                for field, postings in ns.postings.items():
+                    ns.post(postings, row, ns.metadata[row].get(field))
+                if ns.graph is not None:
+                    ns.graph.add(row, ns.vectors)
+
+            ns.encode_rows(first, ns.size)
+            self._dirty.add(namespace or "")
+            return {"upserted_count": len(vectors)}
+
+    def _candidate_rows(self, ns: _Namespace, filter: Optional[dict]) -> np.ndarray:
+        mask = ns.live[: ns.size].copy()
+        if not filter:
+            return mask
+        clauses = equality_clauses(filter)
+        if clauses is not None:
+            # $eq / $in filters: intersect posting lists instead of testing every row
+            for field, values in clauses:
+                postings = ns.field_postings(field)
+                allowed = np.zeros(ns.size, dtype=bool)
+                for value in values:
+                    allowed[postings.get(value, [])] = True
+                mask &= allowed
+            return mask
+        for row in np.flatnonzero(mask):
+            if not matches_filter(ns.metadata[row], filter):
+                mask[row] = False
+        return mask
+
+    def _search(self, ns: _Namespace, q: np.ndarray, top_k: int, filter: Optional[dict]):
+        """Return [(score, row)] best first."""
+        if ns.graph is None and self._use_graph(ns):
+            self._start_graph_build(ns)
+
+        if ns.graph is not None:
+            ef = max(self.hnsw_ef_search, top_k * 4)
+            hits = [
+                (s, row) for s, row in ns.graph.search(q, top_k, ns.vectors, ef=ef)
+                if ns.live[row] and (not filter or matches_filter(ns.metadata[row], filter))
+            ]
+            if len(hits) >= min(top_k, len(ns.rows)):
+                return hits[:top_k]
+            # selective filter or many deletions: fall through to an exact scan
+
+        mask = self._candidate_rows(ns, filter)
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return []
+        if ns.codes is not None:
+            # first pass over the compact codes, then exact float32 scores for the survivors
+            scales = ns.scales[rows] if ns.scales is not None else None
+            approx = quant.approximate_scores(ns.codes[rows], scales, q, ns.scheme)
+            keep = min(top_k * self.rescore, rows.size)
+            if keep < rows.size:
+                rows = np.sort(rows[np.argpartition(-approx, keep - 1)[:keep]])
+        scores = ns.vectors[rows] @ q
+        k = min(top_k, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(rows[i])) for i in top]
+
+    def query(
+        self,
+        vector=None,
+        id: Optional[str] = None,
+        top_k: int = 10,
+        namespace: str = "",
+        filter: Optional[dict] = None,
+        include_values: bool = False,
+        include_metadata: bool = False,
+        **kwargs,
+    ) -> QueryResponse:
+        with self._lock:
+            ns = self._ns(namespace)
+            if ns is None or not ns.rows:
+                return QueryResponse([], namespace)
+            if id is not None:
+                row = ns.rows.get(id)
+                if row is None:
+                    return QueryResponse([], namespace)
+                q = ns.vectors[row]
+            else:
+                q, _ = self._prepare(vector)
+
+            hits = self._search(ns, q, top_k, filter)
+            return QueryResponse(self._matches(ns, hits, include_values, include_metadata), namespace)
+
+    def _matches(self, ns: _Namespace, hits, include_values: bool, include_metadata: bool) -> List[ScoredVector]:
+        return [
+            ScoredVector(
+                id=ns.ids[row],
+                score=score,
+                values=self._values(ns, row) if include_values else [],
+                metadata=dict(ns.metadata[row]) if include_metadata else None,
+            )
+            for score, row in hits
+        ]
+
+    def query_batch(
+        self,
+        vectors,
+        top_k: int = 10,
+        namespace: str = "",
+        filter: Optional[dict] = None,
+        include_values: bool = False,
+        include_metadata: bool = False,
+    ) -> List[QueryResponse]:
+        """
+        query() for many vectors at once (not part of the Pinecone API). On the
+        brute-force float32 path every query is scored by one matrix product per
+        block of rows; graph and quantized namespaces search query by query.
+        """
+        queries = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        if self.metric == "cosine":
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.where(norms == 0, 1, norms)
+        with self._lock:
+            ns = self._ns(namespace)
+            if ns is None or not ns.rows:
+                return [QueryResponse([], namespace) for _ in queries]
+            if ns.graph is None and self._use_graph(ns):
+                self._start_graph_build(ns)
+            if ns.graph is not None or ns.codes is not None:
+                hits = [self._search(ns, q, top_k, filter) for q in queries]
+            else:
+                hits = self._search_many(ns, queries, top_k, filter)
+            return [QueryResponse(self._matches(ns, h, include_values, include_metadata), namespace) for h in hits]
+
+    def _search_many(self, ns: _Namespace, queries: np.ndarray, top_k: int, filter: Optional[dict],
+                     block_rows: int = 8192):
+        rows = np.flatnonzero(self._candidate_rows(ns, filter))
+        if rows.size == 0:
+            return [[] for _ in queries]
+        k = min(top_k, rows.size)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, rows.size, block_rows):
+            block = rows[start:start + block_rows]
+            scores = np.concatenate([best_scores, queries @ ns.vectors[block].T], axis=1)
+            candidates = np.concatenate([best_rows, np.broadcast_to(block, (len(queries), block.size))], axis=1)
+            if scores.shape[1] > k:
+                # keep a running top-k per query so memory stays at one block
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                candidates = np.take_along_axis(candidates, keep, axis=1)
+            best_scores, best_rows = scores, candidates
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [
+            [(float(s), int(r)) for s, r in zip(scores, candidates)]
+            for scores, candidates in zip(best_scores, best_rows)
+        ]
+
+    def fetch(self, ids: List[str], namespace: str = "", **kwargs) -> FetchResponse:
+        with self._lock:
+            ns = self._ns(namespace)
+            vectors = {}
+            if ns is not None:
+                for vid in ids:
+                    row = ns.rows.get(vid)
+                    if row is not None:
+                        vectors[vid] = Vector(vid, self._values(ns, row), dict(ns.metadata[row]))
+            return FetchResponse(vectors, namespace)
+
+    def delete(self, ids=None, delete_all: bool = False, namespace: str = "", filter: Optional[dict] = None, **kwargs):
+        with self._lock:
+            ns = self._ns(namespace)
+            if ns is None:
+                return {}
+            if delete_all:
+                self._namespaces.pop(namespace or "", None)
+            else:
+                if isinstance(ids, str):
+                    ids = [ids]
+                rows = [ns.rows[vid] for vid in (ids or []) if vid in ns.rows]
+                if filter:
+                    rows += [row for row in ns.rows.values() if matches_filter(ns.metadata[row], filter)]
+                for row in set(rows):
+                    self._remove_row(ns, row)
+                # reclaim space once most rows are tombstones
+                if ns.size > 1024 and len(ns.rows) < ns.size // 2:
+                    self._compact(namespace or "")
+            self._dirty.add(namespace or "")
+            return {}
+
+    def _compact(self, name: str):
+        old = self._namespaces[name]
+        ns = self._namespaces[name] = _Namespace(self.dimension, self.quantization)
+        rows = sorted(old.rows.values())
+        ns._ensure_capacity(len(rows))
+        for new_row, row in enumerate(rows):
+            ns.vectors[new_row] = old.vectors[row]
+            ns.norms[new_row] = old.norms[row]
+            ns.live[new_row] = True
+            ns.ids.append(old.ids[row])
+            ns.metadata.append(old.metadata[row])
+            ns.rows[old.ids[row]] = new_row
+        if old.codes is not None:
+            ns.codes[: len(rows)] = old.codes[rows]
+        if old.scales is not None:
+            ns.scales[: len(rows)] = old.scales[rows]
+        if old.graph is not None or old.graph_building:
+            self._start_graph_build(ns)
+
+    def _live_ids(self, namespace: str, prefix: Optional[str]) -> List[str]:
+        ns = self._ns(namespace)
+        if ns is None:
+            return []
+        if ns.sorted_ids is None:
+            ns.sorted_ids = sorted(ns.rows)
+        if not prefix:
+            return ns.sorted_ids
+        start = bisect.bisect_left(ns.sorted_ids, prefix)
+        end = start
+        while end < len(ns.sorted_ids) and ns.sorted_ids[end].startswith(prefix):
+            end += 1
+        return ns.sorted_ids[start:end]
+
+    def list_paginated(
+        self,
+        prefix: Optional[str] = None,
+        limit: int = 100,
+        pagination_token: Optional[str] = None,
+        namespace: str = "",
+        **kwargs,
+    ) -> ListResponse:
+        """Ids in sorted order; the pagination token is the last id of the previous page."""
+        with self._lock:
+            ids = self._live_ids(namespace, prefix)
+        start = bisect.bisect_right(ids, pagination_token) if pagination_token else 0
+        page = ids[start:start + limit]
+        has_more = start + limit < len(ids)
+        return ListResponse(
+            [ListItem(vid) for vid in page],
+            Pagination(page[-1]) if has_more and page else None,
+            namespace,
+        )
+
+    def list(self, prefix: Optional[str] = None, limit: int = 100, namespace: str = "", **kwargs) -> Iterator[List[str]]:
+        token = None
+        while True:
+            page = self.list_paginated(prefix=prefix, limit=limit, pagination_token=token, namespace=namespace)
+            if page.vectors:
+                yield [item.id for item in page.vectors]
+            if page.pagination is None:
+                return
+            token = page.pagination.next
+
+    def describe_index_stats(self, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = {name: {"vector_count": len(ns.rows)} for name, ns in self._namespaces.items()}
+        return {
+            "dimension": self.dimension,
+            "index_fullness": 0.0,
+            "namespaces": namespaces,
+            "total_vector_count": sum(n["vector_count"] for n in namespaces.values()),
+        }
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Bytes the brute-force scan reads per query: the codes if quantized, else the float32 rows."""
+        with self._lock:
+            rows = sum(ns.size for ns in self._namespaces.values())
+        per_vector = quant.bytes_per_vector(self.quantization, self.dimension)
+        return {
+            "quantization": self.quantization,
+            "rescore": self.rescore,
+            "rows": rows,
+            "bytes_per_vector": per_vector,
+            "scan_bytes": per_vector * rows,
+            "float32_bytes": 4 * self.dimension * rows,
+            "mb_per_million": round(per_vector * 1_000_000 / 2**20, 1),
+        }
+
+    # -- persistence
+
+    @staticmethod
+    def _dirname(namespace: str) -> str:
+        return namespace or "__default__"
+
+    @staticmethod
+    def _save(path: str, array: np.ndarray) -> None:
+        # write-then-rename: the previous file may still be memory-mapped by `array`
+        tmp = path + ".tmp.npy"
+        np.save(tmp, array)
+        os.replace(tmp, path)
+
+    def flush(self) -> None:
+        """Write changed namespaces to `path` (no-op for in-memory indexes)."""
+        if not self.path:
+            return
+        with self._lock:
+            for name in list(self._dirty):
+                ns_dir = os.path.join(self.path, self._dirname(name))
+                ns = self._namespaces.get(name)
+                if ns is None:
+                    for file in ("vectors.npy", "norms.npy", "codes.npy", "scales.npy", "meta.json",
+                                 "hnsw.json", "hnsw_layer0.npy"):
+                        if os.path.exists(os.path.join(ns_dir, file)):
+                            os.remove(os.path.join(ns_dir, file))
+                    continue
+                os.makedirs(ns_dir, exist_ok=True)
+                self._save(os.path.join(ns_dir, "vectors.npy"), ns.vectors[: ns.size])
+                self._save(os.path.join(ns_dir, "norms.npy"), ns.norms[: ns.size])
+                for file, array in (("codes.npy", ns.codes), ("scales.npy", ns.scales)):
+                    if array is not None:
+                        self._save(os.path.join(ns_dir, file), array[: ns.size])
+                    elif os.path.exists(os.path.join(ns_dir, file)):
+                        os.remove(os.path.join(ns_dir, file))
+                with open(os.path.join(ns_dir, "meta.json"), "w") as f:
+                    json.dump({"namespace": name, "ids": ns.ids, "metadata": ns.metadata}, f)
+                if ns.graph is not None:
+                    ns.graph.save(ns_dir)
+                elif os.path.exists(os.path.join(ns_dir, "hnsw.json")):
+                    os.remove(os.path.join(ns_dir, "hnsw.json"))
+                if ns.codes is not None and ns.size:
+                    # only the codes need to stay in RAM; rescoring pages float32 rows in from disk
+                    ns.vectors = np.load(os.path.join(ns_dir, "vectors.npy"), mmap_mode="r")
+                    ns.norms = np.load(os.path.join(ns_dir, "norms.npy"), mmap_mode="r")
+                    ns.live = ns.live[: ns.size].copy()
+                    ns.codes = ns.codes[: ns.size].copy()
+                    if ns.scales is not None:
+                        ns.scales = ns.scales[: ns.size].copy()
+            self._dirty.clear()
+            with open(os.path.join(self.path, "index.json"), "w") as f:
+                json.dump({"dimension": self.dimension, "metric": self.metric, "quantization": self.quantization}, f)
+
+    def _load(self) -> None:
+        if not os.path.isdir(self.path):
+            return
+        stored_scheme = "none"
+        if os.path.exists(os.path.join(self.path, "index.json")):
+            with open(os.path.join(self.path, "index.json")) as f:
+                stored_scheme = json.load(f).get("quantization", "none")
+        for entry in os.listdir(self.path):
+            ns_dir = os.path.join(self.path, entry)
+            meta_path = os.path.join(ns_dir, "meta.json")
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path) as f:
+                meta = json.load(f)
+            ns = _Namespace(self.dimension, self.quantization)
+            # read-only memory maps; copied into RAM on the first write
+            ns.vectors = np.load(os.path.join(ns_dir, "vectors.npy"), mmap_mode="r")
+            ns.norms = np.load(os.path.join(ns_dir, "norms.npy"), mmap_mode="r")
+            ns.ids = meta["ids"]
+            ns.metadata = meta["metadata"]
+            ns.live = np.array([vid is not None for vid in ns.ids], dtype=bool)
+            if ns.codes is not None:
+                codes_path = os.path.join(ns_dir, "codes.npy")
+                if stored_scheme == self.quantization and os.path.exists(codes_path):
+                    ns.codes = np.load(codes_path)
+                    if ns.scales is not None:
+                        ns.scales = np.load(os.path.join(ns_dir, "scales.npy"))
+                else:
+                    # written unquantized or with another scheme: re-encode from the float32 rows
+                    ns.codes = np.zeros((ns.size,) + ns.codes.shape[1:], dtype=ns.codes.dtype)
+                    if ns.scales is not None:
+                        ns.scales = np.zeros(ns.size, dtype=np.float32)
+                    for start in range(0, ns.size, 65536):
+                        ns.encode_rows(start, min(start + 65536, ns.size))
+                    self._dirty.add(meta["namespace"])
+            ns.rows = {vid: row for row, vid in enumerate(ns.ids) if vid is not None}
+            ns.graph = HNSWGraph.load(ns_dir)
+            self._namespaces[meta["namespace"]] = ns
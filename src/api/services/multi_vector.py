@@ -0,0 +1,162 @@
+# multi_vector.py
+#
+# Multi-vector term embeddings. With INGEST_VECTOR_MODE=multi a glossary row
+# is stored as several vectors linked to one parent term:
+#   <term id>               the Name (the term's own vector, as in single mode)
+#   <term id>#definition    the plain-text Definition
+#   <term id>#alias-<n>     each entry of Aliases / Abbreviations
+# All of a chunk's texts go through one batched encode call. Child vectors
+# carry a copy of the parent's metadata plus parent_id / vector_field, and the
+# parent lists its children in child_ids so deletes can cascade.
+# Search over-fetches by MULTI_VECTOR_FANOUT and collapse() folds the hits
+# back to one result per parent, scored by the max or a weighted sum.
+
+import html
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.lexical_index import split_entries
+
+INGEST_VECTOR_MODE = os.getenv("INGEST_VECTOR_MODE", "single").lower()
+MULTI_VECTOR_ENABLED = INGEST_VECTOR_MODE == "multi"
+# which extra vectors to make besides the Name: definition, aliases
+MULTI_VECTOR_FIELDS = tuple(
+    f.strip() for f in os.getenv("MULTI_VECTOR_FIELDS", "definition,aliases").lower().split(",") if f.strip()
+)
+# max: a term scores as its best-matching vector
+# weighted: sum of MULTI_VECTOR_WEIGHTS[field] * score over its matching vectors
+MULTI_VECTOR_SCORING = os.getenv("MULTI_VECTOR_SCORING", "max").lower()
+MULTI_VECTOR_WEIGHTS = {
+    field: float(weight)
+    for field, weight in (
+        pair.split(":") for pair in os.getenv("MULTI_VECTOR_WEIGHTS", "name:1.0,alias:0.9,definition:0.6").split(",")
+    )
+}
+# index matches fetched per wanted result, so collapsing still leaves top_k terms
+MULTI_VECTOR_FANOUT = int(os.getenv("MULTI_VECTOR_FANOUT", "3"))
+
+CHILD_SEPARATOR = "#"
+_TAG = re.compile(r"<[^>]+>")
+
+
+def plain_text(value: Any) -> str:
+    """HTML-free, whitespace-collapsed text of a metadata value."""
+    text = str(value or "")
+    if text.lower() == "nan":
+        return ""
+    return " ".join(html.unescape(_TAG.sub(" ", text)).split())
+
+
+def is_child_id(vector_id: str) -> bool:
+    return CHILD_SEPARATOR in vector_id
+
+
+def child_ids(metadata: Optional[Dict[str, Any]]) -> List[str]:
+    return list((metadata or {}).get("child_ids") or [])
+
+
+def mode_tag(fields: Sequence[str] = MULTI_VECTOR_FIELDS) -> str:
+    """Stored with each multi-mode row so its content hash changes when the vector layout does."""
+    return "multi:" + ",".join(sorted(fields))
+
+
+def child_texts(metadata: Dict[str, Any], fields: Sequence[str] = MULTI_VECTOR_FIELDS) -> List[Tuple[str, str, str]]:
+    """[(suffix, vector_field, text)] for a row's extra vectors."""
+    texts = []
+    if "definition" in fields:
+        definition = plain_text(metadata.get("Definition"))
+        if definition:
+            texts.append(("definition", "definition", definition))
+    if "aliases" in fields:
+        entries = split_entries(metadata.get("Aliases", "")) + split_entries(metadata.get("Abbreviations", ""))
+        for n, alias in enumerate(dict.fromkeys(entries)):
+            texts.append((f"alias-{n}", "alias", alias))
+    return texts
+
+
+def expand_terms(names: Sequence[str], metadata: Sequence[Dict[str, Any]], ids: Sequence[str],
+                 fields: Sequence[str] = MULTI_VECTOR_FIELDS) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    (texts, vector ids, vector metadata) for every vector of the given rows,
+    parents first in each group. Sets child_ids on the parents' metadata.
+    """
+    texts, vector_ids, vector_metadata = [], [], []
+    for name, meta, parent in zip(names, metadata, ids):
+        children = child_texts(meta, fields)
+        meta["child_ids"] = [f"{parent}{CHILD_SEPARATOR}{suffix}" for suffix, _, _ in children]
+        texts.append(name)
+        vector_ids.append(parent)
+        vector_metadata.append(meta)
+        shared = {k: v for k, v in meta.items() if k != "child_ids"}
+        for vid, (_, field, text) in zip(meta["child_ids"], children):
+            texts.append(text)
+            vector_ids.append(vid)
+            vector_metadata.append(dict(shared, parent_id=parent, vector_field=field))
+    return texts, vector_ids, vector_metadata
+
+
+def vector_text(vector_id: str, metadata: Dict[str, Any]) -> Optional[str]:
+    """
+    The text ingest embedded for a vector: the Name for a term, the plain
+    Definition / n-th alias for its children (None if it can't be rebuilt).
+    """
+    if not is_child_id(vector_id):
+        return str(metadata.get("Name", "")) or None
+    suffix = vector_id.split(CHILD_SEPARATOR, 1)[1]
+    for child_suffix, _, text in child_texts(metadata, ("definition", "aliases")):
+        if child_suffix == suffix:
+            return text
+    return None
+
+
+def parent_of(match) -> str:
+    return (match.metadata or {}).get("parent_id") or match.id
+
+
+def collapse(matches: Iterable[Any], top_k: int, scoring: str = MULTI_VECTOR_SCORING,
+             weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+    """
+    [(parent id, score, parent metadata)] best first, one per parent term.
+    A hit without parent_id is its own parent, so single-mode and mixed indexes work too.
+    """
+    weights = MULTI_VECTOR_WEIGHTS if weights is None else weights
+    scores: Dict[str, float] = {}
+    metadata: Dict[str, Dict[str, Any]] = {}
+    for match in matches:
+        meta = match.metadata or {}
+        parent = parent_of(match)
+        if scoring == "weighted":
+            field = meta.get("vector_field", "name")
+            scores[parent] = scores.get(parent, 0.0) + weights.get(field, 1.0) * match.score
+        else:
+            scores[parent] = max(scores.get(parent, float("-inf")), match.score)
+        if parent not in metadata or "parent_id" not in meta:
+            # prefer the parent's own metadata (it has child_ids, children don't)
+            metadata[parent] = {k: v for k, v in meta.items() if k not in ("parent_id", "vector_field")}
+    ranked = sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+    return [(parent, round(score, 4), metadata[parent]) for parent, score in ranked]
+
+
+def with_children(ids: Sequence[str], metadata_by_id: Dict[str, Dict[str, Any]]) -> List[str]:
+    """ids plus the child vector ids of those that are multi-vector parents."""
+    expanded = list(ids)
+    for vid in ids:
+        expanded.extend(child_ids(metadata_by_id.get(vid)))
+    return list(dict.fromkeys(expanded))
+
+
+def family_ids(index, ids: Sequence[str], known_metadata: Dict[str, Dict[str, Any]],
+               namespace: str = "", batch_size: int = 100) -> List[str]:
+    """
+    with_children() for a delete. Parents missing from known_metadata are
+    fetched, but only in multi mode: otherwise no term can have children.
+    Blocking; run it off the event loop.
+    """
+    known = {vid: known_metadata[vid] for vid in ids if vid in known_metadata}
+    missing = [vid for vid in ids if vid not in known and not is_child_id(vid)]
+    if missing and MULTI_VECTOR_ENABLED:
+        for i in range(0, len(missing), batch_size):
+            fetched = index.fetch(ids=missing[i:i + batch_size], namespace=namespace).vectors
+            known.update((vid, vec.metadata or {}) for vid, vec in fetched.items())
+    return with_children(ids, known)
@@ -0,0 +1,63 @@
+# quantization.py
+#
+# Compact codes for the local index's first-pass scan. Every scheme scores
+# candidates approximately; LocalIndex then rescores the best
+# top_k * rescore of them exactly against the float32 vectors.
+#   float16  2 bytes/dim, dot product in float32
+#   int8     1 byte/dim + one float32 scale per vector (symmetric, per row)
+#   binary   1 bit/dim (sign), Hamming distance via a popcount table
+# Bytes per vector: bytes_per_vector(); the float32 originals stay on disk
+# (memory-mapped) and are only paged in for rescoring.
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+SCHEMES = ("none", "float16", "int8", "binary")
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def code_shape(scheme: str, dimension: int) -> Tuple[int, np.dtype]:
+    if scheme == "float16":
+        return dimension, np.dtype(np.float16)
+    if scheme == "int8":
+        return dimension, np.dtype(np.int8)
+    if scheme == "binary":
+        return (dimension + 7) // 8, np.dtype(np.uint8)
+    raise ValueError(f"quantization must be one of {SCHEMES}")
+
+
+def bytes_per_vector(scheme: str, dimension: int) -> int:
+    """In-memory bytes per vector for the scan codes (float32 for "none")."""
+    if scheme == "none":
+        return dimension * 4
+    width, dtype = code_shape(scheme, dimension)
+    return width * dtype.itemsize + (4 if scheme == "int8" else 0)
+
+
+def encode(vectors: np.ndarray, scheme: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """(codes, scales) for a (n, dim) float32 block; scales only for int8."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if scheme == "float16":
+        return vectors.astype(np.float16), None
+    if scheme == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    if scheme == "binary":
+        return np.packbits(vectors > 0, axis=1), None
+    raise ValueError(f"quantization must be one of {SCHEMES}")
+
+
+def approximate_scores(codes: np.ndarray, scales: Optional[np.ndarray], q: np.ndarray, scheme: str) -> np.ndarray:
+    """Higher is better, comparable only within one scheme."""
+    if scheme == "float16":
+        return codes.astype(np.float32) @ q
+    if scheme == "int8":
+        return (codes.astype(np.float32) @ q) * scales
+    if scheme == "binary":
+        query_bits = np.packbits(q > 0)
+        return -_POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=1, dtype=np.int32)
+    raise ValueError(f"quantization must be one of {SCHEMES}")
@@ -0,0 +1,115 @@
+# reranker.py
+#
+# Optional second stage for /api/search: the index returns RERANK_CANDIDATES
+# matches by Name-embedding cosine, a local cross-encoder scores every
+# (query, Name + Aliases + Definition) pair in one batched forward pass, and
+# the best top_k by that score are returned. Reasons are only generated for
+# those final results.
+# The stage is bounded by RERANK_BUDGET_MS: if scoring (or loading the model)
+# doesn't finish in time, the candidates keep their ANN order.
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.executors import run_cpu
+from services.multi_vector import plain_text
+
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() in ("1", "true", "yes")
+RERANK_MODEL_NAME = os.getenv("RERANK_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "50"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "300"))
+# tokens per (query, term) pair; longer definitions are truncated
+RERANK_MAX_LENGTH = int(os.getenv("RERANK_MAX_LENGTH", "256"))
+
+
+def load_reranker(model_name: str = RERANK_MODEL_NAME, max_length: int = RERANK_MAX_LENGTH):
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(model_name, max_length=max_length, device="cpu")
+
+
+def term_text(metadata: Dict[str, Any]) -> str:
+    """What the cross-encoder reads for a term: Name, its aliases, then the plain-text Definition."""
+    parts = [str(metadata.get("Name") or "")]
+    aliases = ", ".join(str(metadata.get(f) or "") for f in ("Aliases", "Abbreviations") if metadata.get(f))
+    if aliases:
+        parts.append(f"({aliases})")
+    definition = plain_text(metadata.get("Definition"))
+    if definition:
+        parts.append(f": {definition}")
+    return " ".join(parts)
+
+
+def score_pairs(model, query: str, metadatas: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """One batched forward pass over every candidate (blocking, run on the CPU pool)."""
+    pairs = [(query, term_text(m)) for m in metadatas]
+    return np.asarray(model.predict(pairs, batch_size=len(pairs), show_progress_bar=False), dtype=np.float32)
+
+
+class RerankStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reranked = 0
+        self.over_budget = 0
+        self.not_loaded = 0
+        self.errors = 0
+        self._latencies: List[float] = []
+
+    def record(self, outcome: str, seconds: Optional[float] = None):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if seconds is not None:
+                self._latencies.append(seconds)
+                del self._latencies[:-1000]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._latencies)
+            pick = lambda pct: round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 2) if ordered else None
+            return {
+                "enabled": RERANK_ENABLED,
+                "model": RERANK_MODEL_NAME,
+                "candidates": RERANK_CANDIDATES,
+                "budget_ms": RERANK_BUDGET_MS,
+                "reranked": self.reranked,
+                "over_budget": self.over_budget,
+                "not_loaded": self.not_loaded,
+                "errors": self.errors,
+                "p50_ms": pick(0.5),
+                "p95_ms": pick(0.95),
+            }
+
+
+rerank_stats = RerankStats()
+
+
+async def rerank(model, query: str, matches: Sequence[Any], top_k: int,
+                 budget_ms: float = RERANK_BUDGET_MS) -> Tuple[List[Tuple[Any, float]], bool]:
+    """
+    ([(match, score)] best first, reranked?). Scores are cross-encoder scores
+    when reranked; on timeout or error they are the matches' own ANN scores.
+    A timed-out forward pass still finishes on the CPU pool; its result is dropped.
+    """
+    fallback = [(m, m.score) for m in matches[:top_k]], False
+    if not matches:
+        return fallback
+    start = time.perf_counter()
+    try:
+        scores = await asyncio.wait_for(
+            run_cpu(score_pairs, model, query, [m.metadata or {} for m in matches]),
+            timeout=budget_ms / 1000,
+        )
+    except asyncio.TimeoutError:
+        rerank_stats.record("over_budget")
+        return fallback
+    except Exception as e:
+        print(f"Rerank failed, keeping ANN order: {e}")
+        rerank_stats.record("errors")
+        return fallback
+    rerank_stats.record("reranked", time.perf_counter() - start)
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [(matches[i], round(float(scores[i]), 4)) for i in order], True
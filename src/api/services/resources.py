@@ -0,0 +1,192 @@
+# resources.py
+#
+# Process-wide registry for the expensive clients the API needs: the
+# Pinecone client and index handle, the OpenAI client, the
+# SentenceTransformer model and the optional cross-encoder reranker. Every module shares these, and with them the
+# pooled connections from services.clients. Nothing is created at import time; each
+# resource is built on first use (once, thread-safe) and main.py's lifespan
+# can warm them in the background so the app starts serving immediately.
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from dotenv import load_dotenv
+
+from services.clients import make_openai_client, make_pinecone_client
+from services.embedding_backends import cache_key, load_embedding_model
+from services.reranker import RERANK_ENABLED, load_reranker
+from services.vector_store import open_index, use_pinecone
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+PINECONE_ENV = os.getenv("PINECONE_ENV")  # e.g., "us-east-1"
+PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "BAAI/bge-large-en-v1.5")
+# what embedding caches and the embedding store file this model's vectors under
+EMBEDDING_CACHE_KEY = cache_key(EMBEDDING_MODEL_NAME)
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "1024"))
+
+# background: start serving at once and load everything in a thread (default)
+# blocking:   load everything before the app accepts requests
+# lazy:       load each resource on first use only
+WARMUP_MODE = os.getenv("WARMUP_MODE", "background").lower()
+WARM_RESOURCES = ("index", "embedding_model", "openai") + (("reranker",) if RERANK_ENABLED else ())
+
+
+class Resources:
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._factories: Dict[str, Callable[[], Any]] = {
+            "pinecone": self._create_pinecone,
+            "index": self._create_index,
+            "openai": self._create_openai,
+            "embedding_model": self._create_embedding_model,
+            "reranker": load_reranker,
+        }
+        # one lock per resource so a slow model load doesn't block the index
+        self._locks = {name: threading.Lock() for name in self._factories}
+
+    # -- factories
+
+    def _create_pinecone(self):
+        if not use_pinecone():
+            return None
+        return make_pinecone_client(PINECONE_API_KEY)
+
+    def _create_index(self):
+        pc = self.get("pinecone")
+        if pc is not None and PINECONE_INDEX_NAME not in pc.list_indexes().names():
+            from pinecone import ServerlessSpec
+            pc.create_index(
+                name=PINECONE_INDEX_NAME,
+                dimension=EMBEDDING_DIMENSION,
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
+            )
+        return open_index(pc, PINECONE_INDEX_NAME)
+
+    def _create_openai(self):
+        return make_openai_client(OPENAI_API_KEY)
+
+    def _create_embedding_model(self):
+        from services.embedding_workers import EMBEDDING_WORKERS
+        if EMBEDDING_WORKERS > 0:
+            # same encode() interface, but the model runs in worker processes
+            from services.embedding_workers import EmbeddingPool
+            return EmbeddingPool(EMBEDDING_MODEL_NAME, EMBEDDING_WORKERS)
+        return load_embedding_model(EMBEDDING_MODEL_NAME)
+
+    # -- access
+
+    def get(self, name: str):
+        if name in self._values:
+            return self._values[name]
+        with self._locks[name]:
+            if name not in self._values:
+                start = time.perf_counter()
+                try:
+                    self._values[name] = self._factories[name]()
+                    self._errors.pop(name, None)
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_seconds[name] = round(time.perf_counter() - start, 3)
+                print(f"Loaded {name} in {self._load_seconds[name]}s")
+            return self._values[name]
+
+    def set(self, name: str, value) -> None:
+        """Install a ready-made resource instead of building it, e.g. the local stand-ins in benchmarks.fakes."""
+        with self._locks[name]:
+            self._values[name] = value
+            self._load_seconds[name] = 0.0
+            self._errors.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def reset(self, name: str) -> None:
+        """Drop a resource so the next get() rebuilds it, e.g. after an index was recreated."""
+        with self._locks[name]:
+            self._values.pop(name, None)
+            self._load_seconds.pop(name, None)
+
+    def ensure_pinecone_index(self, dimension: int, recreate: bool = False) -> None:
+        """
+        Make PINECONE_INDEX_NAME a `dimension`-dim index: created if missing,
+        deleted and recreated only when `recreate` is set. An existing index of
+        another dimension raises ValueError rather than being dropped.
+        """
+        from pinecone import ServerlessSpec
+        pc = self.pinecone
+        if PINECONE_INDEX_NAME in pc.list_indexes().names():
+            if not recreate:
+                existing = pc.describe_index(PINECONE_INDEX_NAME).dimension
+                if existing != dimension:
+                    raise ValueError(
+                        f"Pinecone index {PINECONE_INDEX_NAME!r} has dimension {existing}, not {dimension}; "
+                        "pass reset=True to recreate it"
+                    )
+                return
+            pc.delete_index(PINECONE_INDEX_NAME)
+        pc.create_index(
+            name=PINECONE_INDEX_NAME,
+            dimension=dimension,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
+        )
+        # the shared handle may point at the index we just deleted
+        self.reset("index")
+
+    @property
+    def pinecone(self):
+        return self.get("pinecone")
+
+    @property
+    def index(self):
+        return self.get("index")
+
+    @property
+    def openai(self):
+        return self.get("openai")
+
+    @property
+    def embedding_model(self):
+        return self.get("embedding_model")
+
+    @property
+    def reranker(self):
+        return self.get("reranker")
+
+    # -- warm-up / readiness
+
+    def warm(self, names=WARM_RESOURCES) -> None:
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+
+    def warm_in_background(self, names=WARM_RESOURCES) -> threading.Thread:
+        thread = threading.Thread(target=self.warm, args=(names,), name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "loaded": name in self._values,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name),
+            }
+            for name in self._factories
+        }
+
+
+resources = Resources()
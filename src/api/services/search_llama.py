@@ -1,26 +1,24 @@
-import os
 from dotenv import load_dotenv
-from pinecone import Pinecone
 from llama_index.vector_stores.pinecone import PineconeVectorStore
 from llama_index.core import StorageContext, VectorStoreIndex
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.core.query_engine import RetrieverQueryEngine
+from services.clients import OPENAI_MAX_RETRIES, shared_http_client
+from services.resources import OPENAI_API_KEY, resources
 
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENV = os.getenv("PINECONE_ENV")
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
-
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(PINECONE_INDEX_NAME)
+# Shared, pooled index handle (see services.clients)
+index = resources.index
 
 # Wrap Pinecone in LlamaIndex
 vector_store = PineconeVectorStore(pinecone_index=index)
 storage_context = StorageContext.from_defaults(vector_store=vector_store)
 
-embedding_model = OpenAIEmbedding(model="text-embedding-3-large", api_key=OPENAI_API_KEY)
+embedding_model = OpenAIEmbedding(
+    model="text-embedding-3-large", api_key=OPENAI_API_KEY,
+    http_client=shared_http_client(), max_retries=OPENAI_MAX_RETRIES
+)
 
 # Load existing index
 vector_index = VectorStoreIndex.from_vector_store(
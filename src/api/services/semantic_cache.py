@@ -0,0 +1,103 @@
+# semantic_cache.py
+#
+# Opt-in cache in front of index.query for near-duplicate queries: if a new
+# query embedding is within SEMANTIC_CACHE_THRESHOLD cosine similarity of a
+# recently served query, that query's matches and reasons are reused.
+
+import os
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "600"))
+
+
+class SemanticCache:
+    """
+    Fixed-size ring of (unit query vector, key, payload) entries.
+    Lookup is one matrix-vector product over the ring, so it stays cheap at
+    a few hundred entries. `key` separates queries whose results are not
+    interchangeable (e.g. different filters or top_k). Payloads are shared
+    between requests: copy them before changing them and store() the result.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 maxsize: int = SEMANTIC_CACHE_SIZE, ttl: float = SEMANTIC_CACHE_TTL):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # bumped by invalidate(); results computed under an older one are not stored
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._reset(dim=None)
+
+    def _reset(self, dim):
+        self._matrix = None if dim is None else np.zeros((self.maxsize, dim), dtype=np.float32)
+        self._keys = [None] * self.maxsize
+        self._payloads = [None] * self.maxsize
+        self._expires = np.zeros(self.maxsize, dtype=np.float64)
+        self._next = 0
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector, key: Hashable = None) -> Optional[Any]:
+        with self._lock:
+            if self._matrix is None:
+                self.misses += 1
+                return None
+            sims = self._matrix @ self._unit(vector)
+            sims[self._expires < time.monotonic()] = -1.0
+            for slot in np.argsort(-sims):
+                if sims[slot] < self.threshold:
+                    break
+                if self._keys[slot] == key:
+                    self.hits += 1
+                    return self._payloads[slot]
+            self.misses += 1
+            return None
+
+    def store(self, vector, payload: Any, key: Hashable = None, generation: Optional[int] = None) -> None:
+        """generation: self.generation read before the payload was computed; stale payloads are dropped."""
+        unit = self._unit(vector)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if self._matrix is None or self._matrix.shape[1] != unit.shape[0]:
+                self._reset(dim=unit.shape[0])
+            slot = self._next
+            self._matrix[slot] = unit
+            self._keys[slot] = key
+            self._payloads[slot] = payload
+            self._expires[slot] = time.monotonic() + self.ttl
+            self._next = (slot + 1) % self.maxsize
+
+    def invalidate(self) -> None:
+        """Drop every entry; call whenever the underlying index changes."""
+        with self._lock:
+            self._reset(dim=None)
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self):
+        return {
+            "enabled": SEMANTIC_CACHE_ENABLED,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+semantic_cache = SemanticCache()
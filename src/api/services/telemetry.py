@@ -0,0 +1,397 @@
+# telemetry.py
+#
+# Request tracing and latency metrics, cheap enough to leave on in production
+# (no dependencies; a span is two perf_counter() calls and one locked bucket
+# increment).
+# - span(stage): times a block into the stage_seconds{stage} histogram and,
+#   inside an HTTP request, into that request's trace. Spans sit where the
+#   work happens (model encode, index query, each LLM call, upsert), so they
+#   also work in pool threads: services.executors carries the trace across.
+# - metrics: Prometheus-style counters and fixed-bucket histograms rendered in
+#   the text exposition format for GET /metrics. Counters other modules
+#   already keep (cache hits, client calls) are read at scrape time through
+#   collectors rather than counted twice.
+# - TracingMiddleware: one trace per HTTP request; adds X-Request-ID and a
+#   Server-Timing header (visible in browser devtools), records
+#   request_seconds{method,route,status}, and prints the span breakdown of
+#   requests slower than TRACE_SLOW_MS (the last TRACE_SLOW_KEEP are kept
+#   for GET /api/traces/slow).
+# - SlowRequestProfiler (PROFILE_SLOW_REQUESTS=1): while requests are in
+#   flight, samples every thread's stack each PROFILE_INTERVAL_MS; when a
+#   request turns out slow, the samples taken during it are written to
+#   PROFILE_DIR as collapsed stacks (flamegraph.pl / speedscope input).
+#   Samples are process-wide, so concurrent requests show up too.
+
+import os
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") == "1"
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))
+TRACE_SLOW_KEEP = int(os.getenv("TRACE_SLOW_KEEP", "100"))
+METRICS_PREFIX = os.getenv("METRICS_PREFIX", "glossary")
+
+PROFILE_SLOW_REQUESTS = os.getenv("PROFILE_SLOW_REQUESTS", "0") == "1"
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# samples older than this are dropped, so a longer request gets a truncated profile
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+PROFILE_MAX_DEPTH = 64
+
+# seconds; from an exact-hit lookup to a cold model load
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escape = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by (name, labels)."""
+
+    def __init__(self, prefix: str = METRICS_PREFIX, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        # per label set: [count per bucket (last one is +Inf), sum]
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = defaultdict(dict)
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]] = []
+
+    def describe(self, name: str, kind: str, help: str) -> None:
+        self._help[name] = (kind, help)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _labels(labels)
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms[name]
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[slot] += 1
+            counts[-1] += seconds
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def add_collector(self, collect: Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]) -> None:
+        """collect() yields (counter name, labels, current total) at every scrape."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        collected: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        for collect in self._collectors:
+            try:
+                for name, labels, value in collect():
+                    collected[name][_labels(labels)] = value
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self._histograms.items()}
+        for name, series in collected.items():
+            counters.setdefault(name, {}).update(series)
+
+        lines = []
+
+        def header(name: str, kind: str):
+            full = f"{self.prefix}_{name}"
+            help = self._help.get(name, (kind, ""))[1]
+            if help:
+                lines.append(f"# HELP {full} {help}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for name in sorted(counters):
+            full = header(name, "counter")
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{full}{_format_labels(labels)} {_format_value(value)}")
+        for name in sorted(histograms):
+            full = header(name, "histogram")
+            for labels, counts in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{full}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+                lines.append(f"{full}_sum{_format_labels(labels)} {_format_value(counts[-1])}")
+                lines.append(f"{full}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("request_seconds", "histogram", "HTTP request latency, until the last body byte is sent.")
+metrics.describe("stage_seconds", "histogram",
+                 "Latency of request stages: encode (model), ann (index query), llm (one reason call), "
+                 "upsert (one index batch), and the other spans.")
+metrics.describe("llm_tokens_total", "counter", "OpenAI chat tokens used, by kind (prompt / completion).")
+
+
+# -- tracing
+
+class Trace:
+    __slots__ = ("id", "method", "path", "start", "spans")
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.start = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []  # (stage, offset s, seconds)
+
+    def add(self, stage: str, start: float, seconds: float) -> None:
+        # list.append is atomic, and spans may finish on pool threads
+        self.spans.append((stage, start - self.start, seconds))
+
+    def totals(self) -> Dict[str, Tuple[float, int]]:
+        """stage -> (total seconds, spans); concurrent spans (e.g. LLM calls) add up past wall time."""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for stage, _, seconds in list(self.spans):
+            total, count = totals.get(stage, (0.0, 0))
+            totals[stage] = (total + seconds, count + 1)
+        return totals
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{stage};dur={total * 1000:.1f}" + (f';desc="x{count}"' if count > 1 else "")
+            for stage, (total, count) in self.totals().items()
+        )
+
+    def to_dict(self, seconds: float, status: int, route: str) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": route,
+            "path": self.path,
+            "status": status,
+            "ms": round(seconds * 1000, 1),
+            "spans": [
+                {"stage": stage, "start_ms": round(offset * 1000, 1), "ms": round(s * 1000, 1)}
+                for stage, offset, s in list(self.spans)
+            ],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block into stage_seconds{stage} and the current request's trace, if any."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe("stage_seconds", seconds, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(stage, start, seconds)
+
+
+def record_llm_usage(usage) -> None:
+    """Count the tokens of an OpenAI response's usage block (None when the API sent none)."""
+    if usage is None:
+        return
+    metrics.inc("llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+    metrics.inc("llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
+
+def route_template(scope) -> str:
+    """/api/vectors/{vector_id} rather than one label value per id."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    path = scope.get("path", "")
+    for name, value in (scope.get("path_params") or {}).items():
+        path = path.replace(str(value), "{" + name + "}")
+    return path if scope.get("endpoint") is not None else "unmatched"
+
+
+# -- slow-request profiler
+
+class SlowRequestProfiler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, directory: str = PROFILE_DIR,
+                 max_seconds: float = PROFILE_MAX_SECONDS):
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.max_seconds = max_seconds
+        self._samples: deque = deque()  # (time, thread name, stack)
+        self._dumps: deque = deque()  # (trace id, route, start, end)
+        self._active = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._frame_names: Dict[Any, str] = {}
+
+    def begin(self) -> None:
+        with self._lock:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def end(self, trace: Trace, route: str, slow: bool) -> None:
+        with self._lock:
+            self._active -= 1
+            if slow:
+                self._dumps.append((trace.id, route, trace.start, time.perf_counter()))
+        if slow:
+            self._wake.set()
+
+    def _frame_name(self, code) -> str:
+        name = self._frame_names.get(code)
+        if name is None:
+            name = self._frame_names[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return name
+
+    def _sample(self, now: float) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            # parked on a lock, queue or selector: idle, not part of anyone's latency
+            if os.path.basename(frame.f_code.co_filename) in ("threading.py", "queue.py", "selectors.py"):
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self._samples.append((now, tuple(reversed(stack))))
+        while self._samples and self._samples[0][0] < now - self.max_seconds:
+            self._samples.popleft()
+
+    def _dump(self, trace_id: str, route: str, start: float, end: float) -> None:
+        folded: Dict[Tuple[str, ...], int] = defaultdict(int)
+        for at, stack in list(self._samples):
+            if start <= at <= end:
+                folded[stack] += 1
+        if not folded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{trace_id}.folded")
+        with open(path, "w") as f:
+            for stack, count in sorted(folded.items(), key=lambda item: -item[1]):
+                f.write(";".join(s.replace(";", ":") for s in stack) + f" {count}\n")
+        print(f"Profile of slow request {trace_id} ({sum(folded.values())} samples) written to {path}")
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                active = self._active
+                dumps = list(self._dumps)
+                self._dumps.clear()
+            for dump in dumps:
+                try:
+                    self._dump(*dump)
+                except Exception as e:
+                    print(f"Profile dump failed: {e}")
+            if not active:
+                self._samples.clear()
+                self._wake.clear()
+                # re-check after clearing so a begin() in between isn't missed
+                with self._lock:
+                    idle = not self._active and not self._dumps
+                if idle:
+                    self._wake.wait()
+                continue
+            self._sample(time.perf_counter())
+            time.sleep(self.interval)
+
+
+profiler = SlowRequestProfiler() if PROFILE_SLOW_REQUESTS else None
+slow_traces: deque = deque(maxlen=TRACE_SLOW_KEEP)
+
+
+# -- ASGI middleware
+
+class TracingMiddleware:
+    """Pure ASGI, so streaming responses are timed to their last chunk and nothing is buffered."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(scope["method"], scope["path"])
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", trace.id.encode()))
+                # spans finished before the first byte; for streams that is the part before streaming
+                timing = trace.server_timing()
+                if timing:
+                    headers.append((b"server-timing", timing.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        if profiler is not None:
+            profiler.begin()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            seconds = time.perf_counter() - trace.start
+            route = route_template(scope)
+            metrics.observe("request_seconds", seconds, method=trace.method, route=route, status=status)
+            slow = seconds * 1000 >= TRACE_SLOW_MS
+            if slow:
+                slow_traces.append(trace.to_dict(seconds, status, route))
+                breakdown = ", ".join(
+                    f"{stage}={total * 1000:.0f}ms" + (f" x{count}" if count > 1 else "")
+                    for stage, (total, count) in trace.totals().items()
+                )
+                print(f"Slow request {trace.id}: {trace.method} {trace.path} {status} in "
+                      f"{seconds * 1000:.0f} ms ({breakdown or 'no spans'})")
+            if profiler is not None:
+                profiler.end(trace, route, slow)
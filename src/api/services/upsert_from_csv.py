@@ -2,65 +2,110 @@
 
 import os
 import pandas as pd
-from uuid import uuid4
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
-from langchain_openai import OpenAIEmbeddings
+from services.embedding_store import encode_stored
+from services.ingest import build_vectors, changed_rows, delete_missing, relabeled_vectors, stamp
+from services.resources import resources
+from services.vector_store import flush_index, use_pinecone
 
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENV = os.getenv("PINECONE_ENV")
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "2000"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+OPENAI_EMBED_BATCH_SIZE = int(os.getenv("OPENAI_EMBED_BATCH_SIZE", "1000"))
+EMBEDDING_MODEL = "text-embedding-3-small"
 
-embedding = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=OPENAI_API_KEY)
-pc = Pinecone(api_key=PINECONE_API_KEY)
 
-def upsert_from_csv_file(csv_path: str):
-    if PINECONE_INDEX_NAME in pc.list_indexes().names():
-        pc.delete_index(PINECONE_INDEX_NAME)
+def embed_documents(texts):
+    """text-embedding-3-small through the shared OpenAI client, OPENAI_EMBED_BATCH_SIZE inputs per request."""
+    vectors = []
+    for i in range(0, len(texts), OPENAI_EMBED_BATCH_SIZE):
+        response = resources.openai.embeddings.create(
+            model=EMBEDDING_MODEL, input=texts[i:i+OPENAI_EMBED_BATCH_SIZE]
+        )
+        vectors.extend(item.embedding for item in response.data)
+    return vectors
 
-    pc.create_index(
-        name=PINECONE_INDEX_NAME,
-        dimension=1536,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
-    )
 
-    index = pc.Index(PINECONE_INDEX_NAME)
-    df = pd.read_csv(csv_path)
-    vectors = []
+def row_metadata(row, name: str, source: str):
+    return {
+        "Key": str(row.get("Key", "")).strip(),
+        "Name": name,
+        "Status": str(row.get("Status", "")).strip(),
+        "Definition": str(row.get("Definition", "")).strip(),
+        "Abbreviations": str(row.get("Abbreviations", "")).strip(),
+        "Aliases": str(row.get("Aliases", "")).strip(),
+        "AdditionalNotes": str(row.get("AdditionalNotes", "")).strip(),
+        "Stewards": str(row.get("Stewards", "")).strip(),
+        "RelatedGlossaries": str(row.get("RelatedGlossaries", "")).strip(),
+        "TermEntityType": str(row.get("TermEntityType", "")).strip(),
+        "ParentGlossary": str(row.get("ParentGlossary", "")).strip(),
+        "text": name,
+        "source": source
+    }
+
+
+def embedded_text(vector_id: str, metadata: dict):
+    """The text this pipeline embedded for a stored vector (see services.embedding_store.copy_index)."""
+    return metadata.get("text") or metadata.get("Name") or None
+
+
+def upsert_from_csv_file(csv_path: str, progress=None, source: str = None,
+                         delta: bool = True, prune: bool = False, reset: bool = False):
+    """
+    Upsert every row of csv_path under deterministic term ids.
+    The CSV is processed in chunks of CSV_CHUNK_ROWS rows with one batched
+    embedding request per chunk; progress(rows_processed), if given, is called
+    after each chunk is upserted (and may raise to cancel the run).
+    The index is only recreated when reset is set; an existing index of another
+    dimension raises ValueError.
+    delta skips rows whose content hash is unchanged (moving them to `source`
+    with their stored values when needed); prune deletes terms from
+    `source` that the file no longer contains.
+    """
+    if use_pinecone():
+        resources.ensure_pinecone_index(1536, recreate=reset)
+
+    index = resources.index
+    if reset and not use_pinecone():
+        index.delete(delete_all=True)
+    source = source or os.path.basename(csv_path)
+    total = unchanged = 0
+    seen = set()
+
+    for df in pd.read_csv(csv_path, chunksize=CSV_CHUNK_ROWS):
+        names, metadata = [], []
+        for _, row in df.iterrows():
+            name = str(row.get("Name", "")).strip()
+            if not name:
+                continue
+            names.append(name)
+            metadata.append(row_metadata(row, name, source))
+
+        ids = stamp(metadata)
+        seen.update(ids)
+        if delta and ids:
+            keep = changed_rows(index, ids, metadata)
+            unchanged += len(ids) - len(keep)
+            kept = set(keep)
+            moved = relabeled_vectors(index, [vid for i, vid in enumerate(ids) if i not in kept], source)
+            for i in range(0, len(moved), UPSERT_BATCH_SIZE):
+                index.upsert(vectors=moved[i:i+UPSERT_BATCH_SIZE])
+            names, metadata, ids = [names[i] for i in keep], [metadata[i] for i in keep], [ids[i] for i in keep]
+
+        if names:
+            embeddings = encode_stored(EMBEDDING_MODEL, names, embed_documents)
+            vectors = build_vectors(embeddings, metadata, ids)
+
+            for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+                index.upsert(vectors=vectors[i:i+UPSERT_BATCH_SIZE])
+            total += len(vectors)
+
+        if progress:
+            progress(total + unchanged)
 
-    for _, row in df.iterrows():
-        name = str(row.get("Name", "")).strip()
-        if not name:
-            continue
-
-        vector = embedding.embed_query(name)
-        metadata = {
-            "Key": str(row.get("Key", "")).strip(),
-            "Name": name,
-            "Status": str(row.get("Status", "")).strip(),
-            "Definition": str(row.get("Definition", "")).strip(),
-            "Abbreviations": str(row.get("Abbreviations", "")).strip(),
-            "Aliases": str(row.get("Aliases", "")).strip(),
-            "AdditionalNotes": str(row.get("AdditionalNotes", "")).strip(),
-            "Stewards": str(row.get("Stewards", "")).strip(),
-            "RelatedGlossaries": str(row.get("RelatedGlossaries", "")).strip(),
-            "TermEntityType": str(row.get("TermEntityType", "")).strip(),
-            "ParentGlossary": str(row.get("ParentGlossary", "")).strip(),
-            "text": name,
-            "source": os.path.basename(csv_path)
-        }
-
-        vectors.append({
-            "id": str(uuid4()),
-            "values": vector,
-            "metadata": metadata
-        })
-
-    for i in range(0, len(vectors), 100):
-        index.upsert(vectors=vectors[i:i+100])
-
-    return f"Upserted {len(vectors)} records from {csv_path}"
+    message = f"Upserted {total} records from {csv_path}, {unchanged} unchanged"
+    if prune:
+        message += f", deleted {len(delete_missing(index, source, seen))} no longer in the file"
+    flush_index(index)
+    return message
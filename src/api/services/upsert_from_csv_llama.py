@@ -1,81 +1,118 @@
 import os
 import pandas as pd
-from uuid import uuid4
 from dotenv import load_dotenv
-from pinecone import Pinecone, ServerlessSpec
 from llama_index.vector_stores.pinecone import PineconeVectorStore
 from llama_index.core import Document, StorageContext, VectorStoreIndex
+from llama_index.core.schema import MetadataMode
 from llama_index.embeddings.openai import OpenAIEmbedding
+from services.clients import OPENAI_MAX_RETRIES, shared_http_client
+from services.embedding_store import encode_stored
+from services.ingest import changed_rows, delete_missing, stamp
+from services.resources import OPENAI_API_KEY, resources
+from services.vector_store import flush_index, use_pinecone
 
 load_dotenv()
 
-# 🔑 Keys
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENV = os.getenv("PINECONE_ENV")
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
+EMBEDDING_MODEL = "text-embedding-3-large"
 
-# Init Pinecone
-pc = Pinecone(api_key=PINECONE_API_KEY)
+# Embedding model
+embedding_model = OpenAIEmbedding(
+    model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY,
+    http_client=shared_http_client(), max_retries=OPENAI_MAX_RETRIES
+)
 
-# Create / Reset index
-if PINECONE_INDEX_NAME in pc.list_indexes().names():
-    pc.delete_index(PINECONE_INDEX_NAME)
 
-pc.create_index(
-    name=PINECONE_INDEX_NAME,
-    dimension=3072,   # ✅ "text-embedding-3-large" has 3072 dims
-    metric="cosine",
-    spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
-)
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "2000"))
+# ✅ "text-embedding-3-large" has 3072 dims
+DIMENSION = 3072
 
-index = pc.Index(PINECONE_INDEX_NAME)
+# row metadata, in the order the embedded text lists it
+ROW_FIELDS = ["Key", "Name", "Status", "Definition", "Abbreviations", "Aliases", "AdditionalNotes",
+              "Stewards", "RelatedGlossaries", "TermEntityType", "ParentGlossary"]
 
-# Embedding model
-embedding_model = OpenAIEmbedding(
-    model="text-embedding-3-large", api_key=OPENAI_API_KEY
-)
 
-# LlamaIndex wrapper
-vector_store = PineconeVectorStore(pinecone_index=index)
-storage_context = StorageContext.from_defaults(vector_store=vector_store)
-
-
-def upsert_from_csv_file(csv_path: str):
-    df = pd.read_csv(csv_path)
-    docs = []
-
-    for _, row in df.iterrows():
-        name = str(row.get("Name", "")).strip()
-        if not name:
-            continue
-
-        # Use Name + Definition as main text
-        content = f"{name} - {row.get('Definition', '')}"
-
-        metadata = {
-            "Key": str(row.get("Key", "")).strip(),
-            "Name": name,
-            "Status": str(row.get("Status", "")).strip(),
-            "Definition": str(row.get("Definition", "")).strip(),
-            "Abbreviations": str(row.get("Abbreviations", "")).strip(),
-            "Aliases": str(row.get("Aliases", "")).strip(),
-            "AdditionalNotes": str(row.get("AdditionalNotes", "")).strip(),
-            "Stewards": str(row.get("Stewards", "")).strip(),
-            "RelatedGlossaries": str(row.get("RelatedGlossaries", "")).strip(),
-            "TermEntityType": str(row.get("TermEntityType", "")).strip(),
-            "ParentGlossary": str(row.get("ParentGlossary", "")).strip(),
-            "source": os.path.basename(csv_path)
-        }
-
-        docs.append(Document(text=content, metadata=metadata))
-
-    # Build index & insert docs
-    VectorStoreIndex.from_documents(
-        docs, storage_context=storage_context, embed_model=embedding_model
+def term_document(vector_id: str, metadata: dict) -> Document:
+    """One row's node: "Name - Definition" plus the row metadata (content_hash isn't embedded)."""
+    return Document(
+        id_=vector_id, text=f"{metadata['Name']} - {metadata['Definition']}", metadata=metadata,
+        excluded_embed_metadata_keys=["content_hash"], excluded_llm_metadata_keys=["content_hash"],
     )
 
-    return f"Upserted {len(docs)} records from {csv_path}"
+
+def embedded_text(vector_id: str, metadata: dict):
+    """
+    The text this pipeline embedded for a stored node, rebuilt from the row
+    fields of its metadata (see services.embedding_store.copy_index).
+    """
+    if not metadata.get("Name"):
+        return None
+    row = {k: str(metadata.get(k, "")) for k in ROW_FIELDS + ["source", "content_hash"]}
+    return term_document(vector_id, row).get_content(metadata_mode=MetadataMode.EMBED)
+
+
+def upsert_from_csv_file(csv_path: str, progress=None, source: str = None,
+                         delta: bool = True, prune: bool = False, reset: bool = False):
+    """
+    Insert every row of csv_path through LlamaIndex.
+    Documents are built and inserted per CSV_CHUNK_ROWS chunk; progress(rows_processed),
+    if given, is called after each chunk (and may raise to cancel the run).
+    Each row becomes one node whose id is its deterministic term id, so the
+    index is only recreated when reset is set (another dimension raises ValueError);
+    delta / prune as in services.upsert_from_csv.
+    """
+    if use_pinecone():
+        resources.ensure_pinecone_index(DIMENSION, recreate=reset)
+    index = resources.index
+    if reset and not use_pinecone():
+        index.delete(delete_all=True)
+    # LlamaIndex wrapper
+    vector_store = PineconeVectorStore(pinecone_index=index)
+    storage_context = StorageContext.from_defaults(vector_store=vector_store)
+
+    source = source or os.path.basename(csv_path)
+    total = unchanged = 0
+    seen = set()
+
+    for df in pd.read_csv(csv_path, chunksize=CSV_CHUNK_ROWS):
+        metadatas = []
+
+        for _, row in df.iterrows():
+            name = str(row.get("Name", "")).strip()
+            if not name:
+                continue
+            metadata = {field: str(row.get(field, "")).strip() for field in ROW_FIELDS}
+            metadata["source"] = source
+            metadatas.append(metadata)
+
+        ids = stamp(metadatas)
+        seen.update(ids)
+        # source is part of the embedded text here, so a renamed file is re-embedded
+        keep = changed_rows(index, ids, metadatas, fields=("source",)) if delta and ids else range(len(ids))
+        unchanged += len(ids) - len(keep)
+        # Name + Definition as main text
+        docs = [term_document(ids[i], metadatas[i]) for i in keep]
+
+        if docs:
+            # embed through the local store; LlamaIndex keeps embeddings that are already set
+            texts = [doc.get_content(metadata_mode=MetadataMode.EMBED) for doc in docs]
+            vectors = encode_stored(EMBEDDING_MODEL, texts, embedding_model.get_text_embedding_batch)
+            for doc, vector in zip(docs, vectors):
+                doc.embedding = vector.tolist()
+
+            # Build index & insert docs; no transformations, so each document is stored as one node under its own id
+            VectorStoreIndex.from_documents(
+                docs, storage_context=storage_context, embed_model=embedding_model, transformations=[]
+            )
+            total += len(docs)
+
+        if progress:
+            progress(total + unchanged)
+
+    message = f"Upserted {total} records from {csv_path}, {unchanged} unchanged"
+    if prune:
+        message += f", deleted {len(delete_missing(index, source, seen))} no longer in the file"
+    flush_index(index)
+    return message
 
 
 if __name__ == "__main__":
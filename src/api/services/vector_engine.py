@@ -1,32 +1,20 @@
-import os
-from dotenv import load_dotenv
 # from langchain.embeddings import OpenAIEmbeddings
-from pinecone import Pinecone, ServerlessSpec
-from openai import OpenAI
+from services.embedding_cache import encode_cached
+from services.resources import resources
 
-load_dotenv()
-
-# === Step 1: Initialize API Keys ===
-# Load environment variables
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-PINECONE_ENV = os.getenv("PINECONE_ENVIRONMENT")
-INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
-
-# === Step 2: Initialize OpenAI client ===
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-# === Step 3: Initialize Pinecone client ===
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(INDEX_NAME)
+# === Steps 1-3: OpenAI client and index handle ===
+# Shared with the rest of the app through services.resources (pooled, created on first use)
 
 # === Step 4: Generate Embeddings and Upsert ===
-def get_embedding(text):
-    response = openai_client.embeddings.create(
+def get_embeddings(texts):
+    response = resources.openai.embeddings.create(
         model="text-embedding-3-small",
-        input=text
+        input=texts
     )
-    return response.data[0].embedding
+    return [item.embedding for item in response.data]
+
+def get_embedding(text):
+    return encode_cached("text-embedding-3-small", [text], get_embeddings)[0].tolist()
 
 def generate_reason(query, match):
     prompt = f"""
@@ -34,7 +22,7 @@ def generate_reason(query, match):
     The best match found is: "{match['metadata'].get('Name')}" with description: "{match['metadata'].get('Definition')}".
     Explain briefly why this is a relevant match.
     """
-    response = openai_client.chat.completions.create(
+    response = resources.openai.chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=50
@@ -44,7 +32,7 @@ def generate_reason(query, match):
 # === Step 5: Query by semantic search ===
 def semantic_search(query, top_k=2):
     query_embedding = get_embedding(query)
-    results = index.query(vector=query_embedding, top_k=top_k, include_metadata=True)
+    results = resources.index.query(vector=query_embedding, top_k=top_k, include_metadata=True)
 
     formatted_results = []
     for match in results.matches:
@@ -0,0 +1,66 @@
+# vector_store.py
+#
+# Picks the vector index backend behind index.query / fetch / upsert / delete / list.
+#   VECTOR_BACKEND=pinecone  (default) pc.Index(PINECONE_INDEX_NAME)
+#   VECTOR_BACKEND=local     in-process services.local_index.LocalIndex,
+#                            persisted under LOCAL_INDEX_PATH
+# Every module asks open_index() for its handle, so all of them share one
+# LocalIndex in local mode; Pinecone handles come wrapped by services.clients.
+
+import os
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "local_index")
+LOCAL_INDEX_DIMENSION = int(os.getenv("LOCAL_INDEX_DIMENSION", "1024"))
+LOCAL_INDEX_METRIC = os.getenv("LOCAL_INDEX_METRIC", "cosine")
+# auto: brute force below LOCAL_INDEX_HNSW_THRESHOLD vectors, HNSW graph above
+LOCAL_INDEX_ANN = os.getenv("LOCAL_INDEX_ANN", "auto")
+LOCAL_INDEX_HNSW_THRESHOLD = int(os.getenv("LOCAL_INDEX_HNSW_THRESHOLD", "20000"))
+# none / float16 / int8 / binary codes for the brute-force scan; the best
+# top_k * LOCAL_INDEX_RESCORE candidates are rescored in float32
+LOCAL_INDEX_QUANTIZATION = os.getenv("LOCAL_INDEX_QUANTIZATION", "none").lower()
+LOCAL_INDEX_RESCORE = int(os.getenv("LOCAL_INDEX_RESCORE", "4"))
+
+_local_index = None
+_lock = threading.Lock()
+
+
+def use_pinecone() -> bool:
+    return VECTOR_BACKEND == "pinecone"
+
+
+def get_local_index():
+    global _local_index
+    with _lock:
+        if _local_index is None:
+            from services.local_index import LocalIndex
+            _local_index = LocalIndex(
+                dimension=LOCAL_INDEX_DIMENSION,
+                metric=LOCAL_INDEX_METRIC,
+                path=LOCAL_INDEX_PATH or None,
+                ann=LOCAL_INDEX_ANN,
+                hnsw_threshold=LOCAL_INDEX_HNSW_THRESHOLD,
+                quantization=LOCAL_INDEX_QUANTIZATION,
+                rescore=LOCAL_INDEX_RESCORE,
+            )
+        return _local_index
+
+
+def open_index(pc=None, index_name: str = None):
+    """Return the configured index handle; pc/index_name are only used for Pinecone."""
+    if use_pinecone():
+        from services.clients import open_pinecone_index
+        return open_pinecone_index(pc, index_name)
+    return get_local_index()
+
+
+def flush_index(index) -> None:
+    """Persist a local index after writes; Pinecone needs nothing."""
+    flush = getattr(index, "flush", None)
+    if flush is not None:
+        flush()
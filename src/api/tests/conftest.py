@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the services are imported as top-level packages from src/api
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
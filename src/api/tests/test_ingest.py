@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from services.ingest import changed_rows, content_hash, ingest_frames, stamp, term_id
+from services.local_index import LocalIndex
+
+
+def rows(*definitions, source="glossary.csv"):
+    return [{"Name": f"Term {i}", "Definition": d, "ParentGlossary": "Finance", "source": source}
+            for i, d in enumerate(definitions)]
+
+
+def fake_encoder(dimension=8):
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.random.default_rng(len(calls)).standard_normal((len(texts), dimension)).astype(np.float32)
+    return encode, calls
+
+
+def test_term_id_prefers_key_and_ignores_case():
+    assert term_id({"Key": "T-1", "Name": "Revenue"}) == term_id({"Key": "T-1", "Name": "Income"})
+    assert term_id({"Name": "Net Revenue", "ParentGlossary": "Finance"}) == \
+        term_id({"Name": "net revenue ", "ParentGlossary": "FINANCE"})
+    assert term_id({"Name": "Revenue", "ParentGlossary": "Finance"}) != \
+        term_id({"Name": "Revenue", "ParentGlossary": "Sales"})
+    assert term_id({"Key": "nan", "Name": "Revenue"}) == term_id({"Name": "Revenue"})
+
+
+def test_content_hash_ignores_source_and_itself():
+    a, = rows("Money in", source="a.csv")
+    b, = rows("Money in", source="b.csv")
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a) == content_hash(dict(a, content_hash="stale"))
+    assert content_hash(a) != content_hash(dict(a, Definition="Money out"))
+
+
+def test_changed_rows_reports_new_and_edited_rows():
+    index = LocalIndex(4)
+    stored = rows("one", "two")
+    ids = stamp(stored)
+    index.upsert([(vid, np.ones(4), meta) for vid, meta in zip(ids, stored)])
+
+    again = rows("one", "TWO", "three")
+    assert changed_rows(index, stamp(again), again) == [1, 2]
+
+    moved = rows("one", "two", source="renamed.csv")
+    assert changed_rows(index, stamp(moved), moved) == []
+    assert changed_rows(index, stamp(moved), moved, fields=("source",)) == [0, 1]
+
+
+def test_delta_ingest_skips_unchanged_rows_and_relabels_their_source():
+    index = LocalIndex(8)
+    encode, calls = fake_encoder()
+    frame = pd.DataFrame({"Name": ["Alpha", "Beta", "Alpha"], "Definition": ["a", "b", "a"]})
+
+    first = list(ingest_frames([frame], "a.csv", encode, index, multi_vector=False))[-1]
+    assert first["rows_upserted"] == 3 and first["rows_unchanged"] == 0
+
+    second = list(ingest_frames([frame], "b.csv", encode, index, multi_vector=False))[-1]
+    # rows, not distinct ids: "Alpha" appears twice
+    assert second["rows_unchanged"] == 3 and second["rows_upserted"] == 0
+    assert len(calls) == 1, "unchanged rows must not be re-embedded"
+    ids = [vid for page in index.list() for vid in page]
+    assert {v.metadata["source"] for v in index.fetch(ids=ids).vectors.values()} == {"b.csv"}
@@ -0,0 +1,97 @@
+import pytest
+
+from services.lexical_index import LexicalIndex, normalize_phrase, reciprocal_rank_fusion
+
+TERMS = {
+    "t1": {"Name": "Social Security Number", "Abbreviations": "SSN", "Aliases": "Social Sec No; SocSec",
+           "Definition": "Government issued identifier for a person.", "ParentGlossary": "HR"},
+    "t2": {"Name": "401(k) Plan", "Abbreviations": "", "Aliases": "",
+           "Definition": "Retirement savings plan sponsored by an employer.", "ParentGlossary": "HR"},
+    "t3": {"Name": "Net Revenue", "Abbreviations": "NR", "Aliases": "Net Sales",
+           "Definition": "Revenue after returns and discounts.", "ParentGlossary": "Finance"},
+    "t4": {"Name": "Gross Revenue", "Abbreviations": "", "Aliases": "",
+           "Definition": "Total revenue before deductions.", "ParentGlossary": "Finance"},
+}
+
+
+@pytest.fixture
+def index():
+    index = LexicalIndex()
+    for vid, metadata in TERMS.items():
+        index.add(vid, metadata)
+    return index
+
+
+def test_normalize_phrase():
+    assert normalize_phrase("401(k) Plan") == normalize_phrase("401K  plan") == "401kplan"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ssn", ["t1"]),
+    ("Social Sec No", ["t1"]),
+    ("socsec", ["t1"]),
+    ("401k plan", ["t2"]),
+    ("net sales", ["t3"]),
+    ("revenue", []),
+])
+def test_exact_lookup(index, query, expected):
+    assert index.exact_lookup(query) == expected
+
+
+def test_search_ranks_by_bm25_and_weights_names(index):
+    hits = index.search("revenue")
+    assert {vid for vid, _ in hits} == {"t3", "t4"}
+    assert index.search("retirement employer")[0][0] == "t2"
+    assert index.search("unrelated words") == []
+
+
+def test_search_filter_and_updates(index):
+    assert [vid for vid, _ in index.search("revenue", filter={"ParentGlossary": "HR"})] == []
+    index.remove("t3")
+    assert [vid for vid, _ in index.search("revenue")] == ["t4"]
+    assert index.exact_lookup("nr") == []
+    index.add("t4", dict(TERMS["t4"], Aliases="Top Line"))
+    assert index.exact_lookup("top line") == ["t4"]
+
+
+def test_children_are_not_indexed():
+    index = LexicalIndex()
+    index.add_many([
+        {"id": "t1", "metadata": TERMS["t1"]},
+        {"id": "t1#definition", "metadata": dict(TERMS["t1"], parent_id="t1")},
+    ])
+    assert len(index) == 1
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]])
+    assert [vid for vid, _ in fused[:2]] in (["a", "b"], ["b", "a"])
+    assert fused[0][1] == pytest.approx(fused[1][1])
+    assert {vid for vid, _ in fused} == {"a", "b", "c", "d"}
+    # first in every list scores 1.0
+    assert reciprocal_rank_fusion([["x"], ["x"]]) == [("x", pytest.approx(1.0))]
+    assert dict(fused)["c"] < dict(fused)["a"]
+
+
+def test_build_from_index_replays_writes_made_during_the_build():
+    from services.local_index import LocalIndex
+
+    store = LocalIndex(2)
+    store.upsert([{"id": vid, "values": [1.0, 0.0], "metadata": meta} for vid, meta in TERMS.items()])
+    index = LexicalIndex()
+
+    class WritesDuringFetch:
+        # stands in for the live index: requests add t5 and delete t1 mid-build
+        def list(self, **kwargs):
+            return store.list(**kwargs)
+
+        def fetch(self, **kwargs):
+            index.add("t5", {"Name": "Operating Margin"})
+            index.remove("t1")
+            return store.fetch(**kwargs)
+
+    assert index.build_from_index(WritesDuringFetch(), batch_size=2) == 4
+    assert index.complete
+    assert index.exact_lookup("operating margin") == ["t5"]
+    assert index.exact_lookup("ssn") == []
+    assert index._journal is None
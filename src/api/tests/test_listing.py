@@ -0,0 +1,48 @@
+import pytest
+
+from services.listing import fetch_terms, list_page
+from services.local_index import LocalIndex
+
+
+@pytest.fixture
+def index():
+    # every term has two children that sort right after it: t00, t00#aliases, t00#definition, t01, ...
+    index = LocalIndex(2)
+    vectors = []
+    for i in range(25):
+        vid = f"t{i:02d}"
+        vectors.append({"id": vid, "values": [1.0, 0.0], "metadata": {"Name": f"Term {i}"}})
+        for part in ("aliases", "definition"):
+            vectors.append({"id": f"{vid}#{part}", "values": [0.0, 1.0], "metadata": {"parent_id": vid}})
+    index.upsert(vectors)
+    return index
+
+
+def pages(index, limit):
+    cursor, out = None, []
+    while True:
+        ids, cursor = list_page(index, limit, cursor)
+        out.append(ids)
+        if cursor is None:
+            return out
+
+
+@pytest.mark.parametrize("limit", [1, 7, 10, 25, 100])
+def test_list_page_skips_children_and_fills_pages(index, limit):
+    listed = pages(index, limit)
+    assert [vid for page in listed for vid in page] == [f"t{i:02d}" for i in range(25)]
+    assert all(len(page) == limit for page in listed[:-1])
+    # the cursor may stop just before trailing children, leaving an empty last page
+    assert len(listed[-1]) <= limit
+
+
+def test_list_page_with_prefix(index):
+    ids, cursor = list_page(index, 10, prefix="t1")
+    assert ids == [f"t1{i}" for i in range(10)]
+    assert list_page(index, 10, cursor, prefix="t1") == ([], None)
+
+
+def test_fetch_terms_keeps_order_and_skips_deleted(index):
+    index.delete(ids=["t03"])
+    terms = fetch_terms(index, ["t04", "t03", "t01"], ["name"])
+    assert terms == [{"id": "t04", "name": "Term 4"}, {"id": "t01", "name": "Term 1"}]
@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+import pytest
+
+from services.local_index import LocalIndex
+
+DIMENSION = 16
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((600, DIMENSION)).astype(np.float32)
+    groups = rng.integers(0, 4, size=len(vectors))
+    ids = [f"v{i}" for i in range(len(vectors))]
+    metadata = [{"group": int(g), "rank": i} for i, g in enumerate(groups)]
+    return ids, vectors, metadata
+
+
+def brute_force(vectors, query, top_k, rows=None):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    rows = np.arange(len(vectors)) if rows is None else np.asarray(rows)
+    best = rows[np.argsort(-scores[rows])[:top_k]]
+    return [f"v{i}" for i in best]
+
+
+def load(ids, vectors, metadata, **kwargs):
+    index = LocalIndex(DIMENSION, **kwargs)
+    index.upsert([(vid, v, m) for vid, v, m in zip(ids, vectors, metadata)])
+    return index
+
+
+def test_query_matches_brute_force(data):
+    ids, vectors, metadata = data
+    index = load(ids, vectors, metadata, ann="brute")
+    query = vectors[3] + 0.1
+    result = index.query(vector=query, top_k=10)
+    assert [m.id for m in result.matches] == brute_force(vectors, query, 10)
+    scores = [m.score for m in result.matches]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("filter", [
+    {"group": 2},
+    {"group": {"$in": [0, 3]}},
+    {"rank": {"$gte": 300}},
+    {"$or": [{"group": 1}, {"rank": {"$lt": 50}}]},
+])
+def test_filtered_query_matches_brute_force(data, filter):
+    ids, vectors, metadata = data
+    index = load(ids, vectors, metadata, ann="brute")
+    rows = [i for i, m in enumerate(metadata) if _matches(m, filter)]
+    query = vectors[11]
+    result = index.query(vector=query, top_k=8, filter=filter)
+    assert [m.id for m in result.matches] == brute_force(vectors, query, 8, rows)
+
+
+def _matches(metadata, filter):
+    if "$or" in filter:
+        return any(_matches(metadata, f) for f in filter["$or"])
+    (field, cond), = filter.items()
+    value = metadata[field]
+    if not isinstance(cond, dict):
+        return value == cond
+    (op, operand), = cond.items()
+    return {"$in": lambda: value in operand, "$gte": lambda: value >= operand, "$lt": lambda: value < operand}[op]()
+
+
+def test_deleted_and_updated_vectors(data):
+    ids, vectors, metadata = data
+    index = load(ids, vectors, metadata, ann="brute")
+    query = vectors[5]
+    index.delete(ids=["v5"])
+    assert "v5" not in [m.id for m in index.query(vector=query, top_k=5).matches]
+    index.upsert([("v6", query, {"group": 9})])
+    top = index.query(vector=query, top_k=1, include_metadata=True).matches[0]
+    assert top.id == "v6" and top.metadata == {"group": 9}
+
+
+def test_query_batch_matches_query(data):
+    ids, vectors, metadata = data
+    index = load(ids, vectors, metadata, ann="brute")
+    queries = vectors[:5] + 0.05
+    batch = index.query_batch(queries, top_k=7, filter={"group": {"$in": [1, 2]}})
+    for query, response in zip(queries, batch):
+        single = index.query(vector=query, top_k=7, filter={"group": {"$in": [1, 2]}})
+        assert [m.id for m in response.matches] == [m.id for m in single.matches]
+
+
+def test_hnsw_is_exact_until_built_then_close_to_brute_force(data):
+    ids, vectors, metadata = data
+    index = load(ids, vectors, metadata, ann="hnsw")
+    queries = vectors[:20] + 0.05
+    # the first query starts the background build and is answered by the exact scan
+    first = index.query(vector=queries[0], top_k=10)
+    assert [m.id for m in first.matches] == brute_force(vectors, queries[0], 10)
+
+    namespace = index._ns("")
+    deadline = time.monotonic() + 30
+    while namespace.graph is None:
+        assert time.monotonic() < deadline, "HNSW graph was not built"
+        time.sleep(0.05)
+
+    recall = np.mean([
+        len(set(m.id for m in index.query(vector=q, top_k=10).matches) & set(brute_force(vectors, q, 10))) / 10
+        for q in queries
+    ])
+    assert recall >= 0.9
+
+
+@pytest.mark.parametrize("scheme", ["float16", "int8", "binary"])
+def test_quantized_scan_finds_the_neighbours_and_rescores_exactly(scheme):
+    # 60 clusters of 10: a query's neighbours are its cluster mates
+    dimension = 256
+    rng = np.random.default_rng(3)
+    centers = rng.standard_normal((60, dimension))
+    vectors = (np.repeat(centers, 10, axis=0) + 0.3 * rng.standard_normal((600, dimension))).astype(np.float32)
+    index = LocalIndex(dimension, ann="brute", quantization=scheme)
+    index.upsert([(f"v{i}", v) for i, v in enumerate(vectors)])
+
+    query = vectors[42] + 0.05
+    matches = index.query(vector=query, top_k=5).matches
+    assert [m.id for m in matches] == brute_force(vectors, query, 5)
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = {f"v{i}": s for i, s in enumerate(unit @ (query / np.linalg.norm(query)))}
+    assert all(abs(m.score - exact[m.id]) < 1e-5 for m in matches)